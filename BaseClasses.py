@@ -10,8 +10,8 @@ from argparse import Namespace
 from collections import Counter, deque, defaultdict
 from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, MutableSequence, Set
 from enum import IntEnum, IntFlag
-from typing import (AbstractSet, Any, ClassVar, Dict, List, Literal, NamedTuple,
-                    Optional, Protocol, Tuple, Union, TYPE_CHECKING, overload)
+from typing import (AbstractSet, Any, ClassVar, Dict, Generic, List, Literal, NamedTuple,
+                    Optional, Protocol, Tuple, TypeVar, Union, TYPE_CHECKING, overload)
 import dataclasses
 
 from typing_extensions import NotRequired, TypedDict
@@ -79,6 +79,8 @@ class MultiWorld():
     is_race: bool = False
     precollected_items: Dict[int, List[Item]]
     state: CollectionState
+    shared_spheres: Optional[Dict[bool, SphereIndex]] = None
+    """The SphereIndex per sendable flag, once sharing was started by share_spheres."""
 
     plando_options: PlandoOptions
     early_items: Dict[int, Dict[str, int]]
@@ -494,12 +496,17 @@ class MultiWorld():
     def push_precollected(self, item: Item):
         self.precollected_items[item.player].append(item)
         self.state.collect(item, True)
+        if self.shared_spheres:
+            for sphere_index in self.shared_spheres.values():
+                sphere_index.reset()
 
     def push_item(self, location: Location, item: Item, collect: bool = True):
         location.item = item
         item.location = location
         if collect:
             self.state.collect(item, location.advancement, location)
+        if self.shared_spheres:
+            self.invalidate_spheres((location,))
 
         logging.debug('Placed %s at %s', item, location)
 
@@ -582,6 +589,35 @@ class MultiWorld():
 
         return False
 
+    def share_spheres(self) -> None:
+        """
+        Starts sharing one lazily computed SphereIndex per kind of spheres between get_spheres, get_sendable_spheres,
+        fulfills_accessibility and the playthrough, instead of sweeping from scratch for each of them.
+        Item placements made afterwards have to go through push_item or Fill.swap_location_item, or be followed by
+        invalidate_spheres, to keep the shared indexes valid.
+        """
+        if self.shared_spheres is None:
+            self.shared_spheres = {}
+
+    def get_sphere_index(self, sendable: bool = False) -> SphereIndex:
+        """Returns the shared SphereIndex if spheres are shared, otherwise a new one for single use."""
+        if self.shared_spheres is None:
+            return SphereIndex(self, sendable)
+        sphere_index = self.shared_spheres.get(sendable)
+        if sphere_index is None:
+            sphere_index = self.shared_spheres[sendable] = SphereIndex(self, sendable)
+        return sphere_index
+
+    def invalidate_spheres(self, locations: Optional[Iterable[Location]] = None) -> None:
+        """Discards shared spheres affected by the items at locations changing, or all of them if None."""
+        if not self.shared_spheres:
+            return
+        for sphere_index in self.shared_spheres.values():
+            if locations is None:
+                sphere_index.reset()
+            else:
+                sphere_index.invalidate(locations)
+
     def get_spheres(self) -> Iterator[Set[Location]]:
         """
         yields a set of locations for each logical sphere
@@ -590,24 +626,7 @@ class MultiWorld():
         locations is followed by an empty set, and then a set of all of the
         unreachable locations.
         """
-        state = CollectionState(self)
-        locations = set(self.get_filled_locations())
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        yield from self.get_sphere_index().iter_spheres()
 
     def get_sendable_spheres(self) -> Iterator[Set[Location]]:
         """
@@ -616,46 +635,10 @@ class MultiWorld():
         If there are unreachable locations, the last sphere of reachable locations is followed by an empty set,
         and then a set of all of the unreachable locations.
         """
-        state = CollectionState(self)
-        locations: Set[Location] = set()
-        events: Set[Location] = set()
-        for location in self.get_filled_locations():
-            if type(location.item.code) is int and type(location.address) is int:
-                locations.add(location)
-            else:
-                events.add(location)
-
-        while locations:
-            sphere: Set[Location] = set()
-
-            # cull events out
-            done_events: Set[Union[Location, None]] = {None}
-            while done_events:
-                done_events = set()
-                for event in events:
-                    if event.can_reach(state):
-                        state.collect(event.item, True, event)
-                        done_events.add(event)
-                events -= done_events
-
-            for location in locations:
-                if location.can_reach(state):
-                    sphere.add(location)
-
-            yield sphere
-            if not sphere:
-                if locations:
-                    yield locations  # unreachable locations
-                break
-
-            for location in sphere:
-                state.collect(location.item, True, location)
-            locations -= sphere
+        yield from self.get_sphere_index(sendable=True).iter_spheres()
 
     def fulfills_accessibility(self, state: Optional[CollectionState] = None):
         """Check if accessibility rules are fulfilled with current or supplied state."""
-        if not state:
-            state = CollectionState(self)
         players: Dict[str, Set[int]] = {
             "minimal": set(),
             "items": set(),
@@ -685,6 +668,30 @@ class MultiWorld():
 
         locations = [location for location in self.get_locations() if location_relevant(location)]
 
+        if not state and locations:
+            # the spheres of filled locations are known, so only unfilled ones have to be checked against the state
+            # that has everything reachable collected, copied as checking it updates its reachable regions in place
+            sphere_index = self.get_sphere_index()
+            final_state = sphere_index.get_final_state().copy()
+            locations = [location for location in locations if location not in sphere_index.sphere_of
+                         and not location.can_reach(final_state)]
+            if self.has_beaten_game(final_state) and not any(location_condition(location) for location in locations):
+                return True
+            if not locations:
+                return False
+            if __debug__:
+                from Fill import FillError
+                raise FillError(
+                    f"Could not access required locations for accessibility check. Missing: {locations}",
+                    multiworld=self,
+                )
+            logging.warning(f"Could not access required locations for accessibility check."
+                            f" Missing: {locations}")
+            return False
+
+        if not state:
+            state = CollectionState(self)
+
         while locations:
             sphere: List[Location] = []
             for n in range(len(locations) - 1, -1, -1):
@@ -718,12 +725,60 @@ class MultiWorld():
 
 PathValue = Tuple[str, Optional["PathValue"]]
 
+_Layer = TypeVar("_Layer", Counter, set)
+_peek = dict.__getitem__
+"""Reads a player's layer from a (CopyOnWriteLayers) dict without claiming it. The layer must not be mutated."""
+
+
+class CopyOnWriteLayers(Dict[int, _Layer], Generic[_Layer]):
+    """
+    Maps each player to their layer of a CollectionState, such as their prog_items Counter.
+
+    Copying only copies the references, so layers are shared between a state and its copies. Both sides then
+    claim a private copy of a layer the first time it is accessed through [], since the caller may mutate it.
+    Code that only reads can use _peek to avoid claiming the layer.
+    """
+    __slots__ = ("owned",)
+
+    owned: Set[int]
+    """Players whose layer is not shared with any other state."""
+
+    def __init__(self, layers: Mapping[int, _Layer], owned: bool = True) -> None:
+        super().__init__(layers)
+        self.owned = set(self.keys()) if owned else set()
+
+    def __getitem__(self, player: int) -> _Layer:
+        layer = _peek(self, player)
+        if player not in self.owned:
+            layer = layer.copy()
+            dict.__setitem__(self, player, layer)
+            self.owned.add(player)
+        return layer
+
+    def __setitem__(self, player: int, layer: _Layer) -> None:
+        dict.__setitem__(self, player, layer)
+        self.owned.add(player)
+
+    def __reduce__(self) -> Tuple[type, Tuple[Dict[int, _Layer]]]:
+        return CopyOnWriteLayers, (dict(self),)
+
+    @staticmethod
+    def share(layers: Dict[int, _Layer]) -> CopyOnWriteLayers[_Layer]:
+        """Returns a copy of layers that shares every layer with the original until either side claims it."""
+        if isinstance(layers, CopyOnWriteLayers):
+            layers.owned = set()
+            return CopyOnWriteLayers(layers, owned=False)
+        # a plain dict, likely assigned by a test, can't detect mutation, so its layers are copied right away
+        return CopyOnWriteLayers({player: layer.copy() for player, layer in layers.items()})
+
 
 class CollectionState():
     prog_items: Dict[int, Counter[str]]
     multiworld: MultiWorld
     reachable_regions: Dict[int, Set[Region]]
     blocked_connections: Dict[int, Set[Entrance]]
+    """prog_items, reachable_regions and blocked_connections are CopyOnWriteLayers, shared with copies of the state
+    until a player's layer is accessed through []."""
     advancements: Set[Location]
     path: Dict[Union[Region, Entrance], PathValue]
     locations_checked: Set[Location]
@@ -734,10 +789,10 @@ class CollectionState():
 
     def __init__(self, parent: MultiWorld, allow_partial_entrances: bool = False):
         assert parent.worlds, "CollectionState created without worlds initialized in parent"
-        self.prog_items = {player: Counter() for player in parent.get_all_ids()}
+        self.prog_items = CopyOnWriteLayers({player: Counter() for player in parent.get_all_ids()})
         self.multiworld = parent
-        self.reachable_regions = {player: set() for player in parent.get_all_ids()}
-        self.blocked_connections = {player: set() for player in parent.get_all_ids()}
+        self.reachable_regions = CopyOnWriteLayers({player: set() for player in parent.get_all_ids()})
+        self.blocked_connections = CopyOnWriteLayers({player: set() for player in parent.get_all_ids()})
         self.advancements = set()
         self.path = {}
         self.locations_checked = set()
@@ -752,9 +807,13 @@ class CollectionState():
     def update_reachable_regions(self, player: int):
         self.stale[player] = False
         world: AutoWorld.World = self.multiworld.worlds[player]
+        start: Region = world.get_region(world.origin_region_name)
+        if player not in self.reachable_regions.owned and start in _peek(self.reachable_regions, player) \
+                and not self._can_pass_blocked_connection(player):
+            # the layers are still shared with another state and there is nothing to update, so don't claim them
+            return
         reachable_regions = self.reachable_regions[player]
         queue = deque(self.blocked_connections[player])
-        start: Region = world.get_region(world.origin_region_name)
 
         # init on first call - this can't be done on construction since the regions don't exist yet
         if start not in reachable_regions:
@@ -767,6 +826,14 @@ class CollectionState():
         else:
             self._update_reachable_regions_auto_indirect_conditions(player, queue)
 
+    def _can_pass_blocked_connection(self, player: int) -> bool:
+        """Returns True if any of the player's blocked connections would be passed or removed by a BFS."""
+        reachable_regions = _peek(self.reachable_regions, player)
+        for connection in _peek(self.blocked_connections, player):
+            if connection.connected_region in reachable_regions or connection.can_reach(self):
+                return True
+        return False
+
     def _update_reachable_regions_explicit_indirect_conditions(self, player: int, queue: deque[Entrance]):
         reachable_regions = self.reachable_regions[player]
         blocked_connections = self.blocked_connections[player]
@@ -821,16 +888,19 @@ class CollectionState():
             queue.extend(blocked_connections)
 
     def copy(self) -> CollectionState:
-        ret = CollectionState(self.multiworld)
-        ret.prog_items = {player: counter.copy() for player, counter in self.prog_items.items()}
-        ret.reachable_regions = {player: region_set.copy() for player, region_set in
-                                 self.reachable_regions.items()}
-        ret.blocked_connections = {player: entrance_set.copy() for player, entrance_set in
-                                   self.blocked_connections.items()}
+        # __init__ is skipped, as the precollected items it collects would be overwritten right away
+        ret = CollectionState.__new__(CollectionState)
+        ret.multiworld = self.multiworld
+        ret.prog_items = CopyOnWriteLayers.share(self.prog_items)
+        ret.reachable_regions = CopyOnWriteLayers.share(self.reachable_regions)
+        ret.blocked_connections = CopyOnWriteLayers.share(self.blocked_connections)
         ret.advancements = self.advancements.copy()
         ret.path = self.path.copy()
         ret.locations_checked = self.locations_checked.copy()
+        ret.stale = {player: True for player in self.stale}
         ret.allow_partial_entrances = self.allow_partial_entrances
+        for function in self.additional_init_functions:
+            function(ret, self.multiworld)
         for function in self.additional_copy_functions:
             ret = function(self, ret)
         return ret
@@ -995,14 +1065,14 @@ class CollectionState():
 
     # item name related
     def has(self, item: str, player: int, count: int = 1) -> bool:
-        return self.prog_items[player][item] >= count
+        return _peek(self.prog_items, player)[item] >= count
 
     # for loops are specifically used in all/any/count methods, instead of all()/any()/sum(), to avoid the overhead of
     # creating and iterating generator instances. In `return all(player_prog_items[item] for item in items)`, the
     # argument to all() would be a new generator instance, for example.
     def has_all(self, items: Iterable[str], player: int) -> bool:
         """Returns True if each item name of items is in state at least once."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item in items:
             if not player_prog_items[item]:
                 return False
@@ -1010,7 +1080,7 @@ class CollectionState():
 
     def has_any(self, items: Iterable[str], player: int) -> bool:
         """Returns True if at least one item name of items is in state at least once."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item in items:
             if player_prog_items[item]:
                 return True
@@ -1018,7 +1088,7 @@ class CollectionState():
 
     def has_all_counts(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if each item name is in the state at least as many times as specified."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item, count in item_counts.items():
             if player_prog_items[item] < count:
                 return False
@@ -1026,19 +1096,19 @@ class CollectionState():
 
     def has_any_count(self, item_counts: Mapping[str, int], player: int) -> bool:
         """Returns True if at least one item name is in the state at least as many times as specified."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item, count in item_counts.items():
             if player_prog_items[item] >= count:
                 return True
         return False
 
     def count(self, item: str, player: int) -> int:
-        return self.prog_items[player][item]
+        return _peek(self.prog_items, player)[item]
 
     def has_from_list(self, items: Iterable[str], player: int, count: int) -> bool:
         """Returns True if the state contains at least `count` items matching any of the item names from a list."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item_name in items:
             found += player_prog_items[item_name]
             if found >= count:
@@ -1049,7 +1119,7 @@ class CollectionState():
         """Returns True if the state contains at least `count` items matching any of the item names from a list.
         Ignores duplicates of the same item."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item_name in items:
             found += player_prog_items[item_name] > 0
             if found >= count:
@@ -1058,7 +1128,7 @@ class CollectionState():
 
     def count_from_list(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         total = 0
         for item_name in items:
             total += player_prog_items[item_name]
@@ -1066,7 +1136,7 @@ class CollectionState():
 
     def count_from_list_unique(self, items: Iterable[str], player: int) -> int:
         """Returns the cumulative count of items from a list present in state. Ignores duplicates of the same item."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         total = 0
         for item_name in items:
             if player_prog_items[item_name] > 0:
@@ -1077,7 +1147,7 @@ class CollectionState():
     def has_group(self, item_name_group: str, player: int, count: int = 1) -> bool:
         """Returns True if the state contains at least `count` items present in a specified item group."""
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
             found += player_prog_items[item_name]
             if found >= count:
@@ -1089,7 +1159,7 @@ class CollectionState():
         Ignores duplicates of the same item.
         """
         found: int = 0
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]:
             found += player_prog_items[item_name] > 0
             if found >= count:
@@ -1098,7 +1168,7 @@ class CollectionState():
 
     def count_group(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         return sum(
             player_prog_items[item_name]
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
@@ -1107,7 +1177,7 @@ class CollectionState():
     def count_group_unique(self, item_name_group: str, player: int) -> int:
         """Returns the cumulative count of items from an item group present in state.
         Ignores duplicates of the same item."""
-        player_prog_items = self.prog_items[player]
+        player_prog_items = _peek(self.prog_items, player)
         return sum(
             player_prog_items[item_name] > 0
             for item_name in self.multiworld.worlds[player].item_name_groups[item_name_group]
@@ -1174,6 +1244,169 @@ class CollectionState():
             self.prog_items[player][item] = count
 
 
+class SphereIndex:
+    """
+    The logical spheres of a multiworld's filled locations, computed lazily and one sphere at a time.
+
+    Every sphere keeps the state it was swept with, so invalidating locations only discards the spheres from the
+    earliest one containing any of them onwards; the earlier spheres and their states stay valid.
+    See MultiWorld.share_spheres for sharing one index between all the places walking the spheres.
+    """
+    multiworld: MultiWorld
+    sendable: bool
+    """Only sort multiserver sendable locations into spheres. Events are collected as soon as they are reachable."""
+    spheres: List[Set[Location]]
+    """Computed spheres, which must not be modified."""
+    events: List[Set[Location]]
+    """Events collected before sweeping the sphere of the same number, only used if sendable."""
+    states: List[CollectionState]
+    """states[n] has all spheres before n collected. Has one entry more than spheres once initialized."""
+    sphere_of: Dict[Location, int]
+    """Sphere number of each sorted location and culled event."""
+    remaining: Set[Location]
+    """Filled locations not sorted into a sphere yet. Unreachable once complete."""
+    remaining_events: Set[Location]
+    complete: bool
+
+    def __init__(self, multiworld: MultiWorld, sendable: bool = False) -> None:
+        self.multiworld = multiworld
+        self.sendable = sendable
+        self.reset()
+
+    def reset(self) -> None:
+        """Discards all spheres, to be recomputed from the multiworld's current items on the next access."""
+        self.spheres = []
+        self.events = []
+        self.states = []
+        self.sphere_of = {}
+        self.remaining = set()
+        self.remaining_events = set()
+        self.complete = False
+
+    def _is_event(self, location: Location) -> bool:
+        return self.sendable and not (type(location.item.code) is int and type(location.address) is int)
+
+    def _initialize(self) -> None:
+        self.states.append(CollectionState(self.multiworld))
+        for location in self.multiworld.get_filled_locations():
+            if self._is_event(location):
+                self.remaining_events.add(location)
+            else:
+                self.remaining.add(location)
+        self.complete = not self.remaining
+
+    def _sweep_sphere(self) -> None:
+        if not self.states:
+            self._initialize()
+            if self.complete:
+                return
+        number = len(self.spheres)
+        state = self.states[number].copy()
+
+        events: Set[Location] = set()
+        done_events: Set[Location] = self.remaining_events
+        while done_events:
+            done_events = {event for event in self.remaining_events if event.can_reach(state)}
+            for event in done_events:
+                state.collect(event.item, True, event)
+            self.remaining_events -= done_events
+            events |= done_events
+
+        sphere = {location for location in self.remaining if location.can_reach(state)}
+        if not sphere:
+            # culled events don't matter without a sphere to collect them for
+            self.remaining_events |= events
+            self.complete = True
+            return
+
+        for location in sphere:
+            state.collect(location.item, True, location)
+        self.remaining -= sphere
+        for location in events:
+            self.sphere_of[location] = number
+        for location in sphere:
+            self.sphere_of[location] = number
+        self.events.append(events)
+        self.spheres.append(sphere)
+        self.states.append(state)
+        self.complete = not self.remaining
+
+    def compute(self) -> None:
+        """Computes all remaining spheres."""
+        while not self.complete:
+            self._sweep_sphere()
+
+    def get_sphere(self, number: int) -> Set[Location]:
+        """Returns sphere number, computing it if needed, or an empty set if there is no such sphere."""
+        while number >= len(self.spheres) and not self.complete:
+            self._sweep_sphere()
+        return self.spheres[number] if number < len(self.spheres) else set()
+
+    def get_state(self, number: int) -> CollectionState:
+        """Returns the state with all spheres before number collected, which must not be modified."""
+        if number:
+            self.get_sphere(number - 1)
+        elif not self.states:
+            self._initialize()
+        return self.states[min(number, len(self.spheres))]
+
+    def get_final_state(self) -> CollectionState:
+        """Returns the state with all reachable filled locations collected, which must not be modified."""
+        self.compute()
+        return self.states[-1]
+
+    def iter_spheres(self) -> Iterator[Set[Location]]:
+        """Yields a copy of each sphere the way MultiWorld.get_spheres does, computing them as needed."""
+        number = 0
+        while True:
+            sphere = self.get_sphere(number)
+            if not sphere:
+                break
+            yield set(sphere)
+            number += 1
+        if self.remaining:
+            yield set()
+            yield set(self.remaining)
+
+    def invalidate(self, locations: Iterable[Location]) -> None:
+        """Discards the spheres affected by the items at locations having changed."""
+        if not self.states:
+            return
+        locations = tuple(locations)
+        first = len(self.spheres)
+        for location in locations:
+            number = self.sphere_of.get(location)
+            if number is not None:
+                first = min(first, number)
+            elif location not in self.remaining and location not in self.remaining_events:
+                # newly filled, so it could belong to any sphere
+                self.reset()
+                return
+        if first < len(self.spheres):
+            for number in range(first, len(self.spheres)):
+                for location in self.spheres[number]:
+                    del self.sphere_of[location]
+                for location in self.events[number]:
+                    del self.sphere_of[location]
+                self.remaining |= self.spheres[number]
+                self.remaining_events |= self.events[number]
+            del self.spheres[first:]
+            del self.events[first:]
+            del self.states[first + 1:]
+            self.complete = False
+        if self.sendable:
+            # the new items may have changed which of the locations are events
+            for location in locations:
+                if location in self.sphere_of:
+                    continue
+                self.remaining.discard(location)
+                self.remaining_events.discard(location)
+                if self._is_event(location):
+                    self.remaining_events.add(location)
+                else:
+                    self.remaining.add(location)
+
+
 CollectionRule = Callable[[CollectionState], bool]
 DEFAULT_COLLECTION_RULE: CollectionRule = staticmethod(lambda state: True)
 
@@ -1342,7 +1575,7 @@ class Region:
     def can_reach(self, state: CollectionState) -> bool:
         if state.stale[self.player]:
             state.update_reachable_regions(self.player)
-        return self in state.reachable_regions[self.player]
+        return self in _peek(state.reachable_regions, self.player)
 
     @property
     def hint_text(self) -> str:
@@ -1704,24 +1937,30 @@ class Spoiler:
         # get locations containing progress items
         multiworld = self.multiworld
         prog_locations = {location for location in multiworld.get_filled_locations() if location.item.advancement}
-        state_cache: List[Optional[CollectionState]] = [None]
+        sphere_index = multiworld.get_sphere_index()
+        state_cache: List[CollectionState] = []
         collection_spheres: List[Set[Location]] = []
-        state = CollectionState(multiworld)
         sphere_candidates = set(prog_locations)
         logging.debug('Building up collection spheres.')
+        index_number = 0
         while sphere_candidates:
 
             # build up spheres of collection radius.
             # Everything in each sphere is independent from each other in dependencies and only depends on lower spheres
-
-            sphere = {location for location in sphere_candidates if state.can_reach(location)}
-
-            for location in sphere:
-                state.collect(location.item, True, location)
+            # The spheres of all filled locations come from the sphere index, skipping those without progress items.
+
+            # copied, as the index's states must not be modified by checking whether the game is beaten from them
+            state = sphere_index.get_state(index_number).copy()
+            sphere = sphere_index.get_sphere(index_number)
+            index_number += 1
+            if sphere:
+                sphere = {location for location in sphere_candidates if location in sphere}
+                if not sphere:
+                    continue
 
             sphere_candidates -= sphere
             collection_spheres.append(sphere)
-            state_cache.append(state.copy())
+            state_cache.append(state)
 
             logging.debug('Calculated sphere %i, containing %i of %i progress items.', len(collection_spheres),
                           len(sphere),
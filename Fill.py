@@ -730,7 +730,12 @@ def flood_items(multiworld: MultiWorld) -> None:
                 break
 
 
-def balance_multiworld_progression(multiworld: MultiWorld) -> None:
+def balance_multiworld_progression(multiworld: MultiWorld, budget: int = 0) -> None:
+    """
+    :param multiworld: Multiworld to be balanced.
+    :param budget: Maximum number of candidate items to evaluate before stopping early, keeping the swaps made so far.
+    0 for no limit.
+    """
     # A system to reduce situations where players have no checks remaining, popularly known as "BK mode."
     # Overall progression balancing algorithm:
     # Gather up all locations in a sphere.
@@ -768,6 +773,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
         }
         sphere_num: int = 1
         moved_item_count: int = 0
+        evaluated_item_count: int = 0
+        out_of_budget: bool = False
+        # the spheres following the current one, as found by balancing, valid until items get moved
+        pending_spheres: typing.List[typing.Set[Location]] = []
 
         def get_sphere_locations(sphere_state: CollectionState,
                                  locations: typing.Set[Location]) -> typing.Set[Location]:
@@ -784,7 +793,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
             # Gather non-locked locations.
             # This ensures that only shuffled locations get counted for progression balancing,
             #   i.e. the items the players will be checking.
-            sphere_locations = get_sphere_locations(state, unchecked_locations)
+            if pending_spheres:
+                sphere_locations = pending_spheres.pop(0)
+            else:
+                sphere_locations = get_sphere_locations(state, unchecked_locations)
             for location in sphere_locations:
                 unchecked_locations.remove(location)
                 if not location.locked:
@@ -819,7 +831,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                     balancing_reachables = reachable_locations_count.copy()
                     balancing_sphere = sphere_locations.copy()
                     candidate_items: typing.Dict[int, typing.Set[Location]] = collections.defaultdict(set)
-                    while True:
+                    for balancing_sphere_num in itertools.count():
                         # Check locations in the current sphere and gather progression items to swap earlier
                         for location in balancing_sphere:
                             if location.advancement:
@@ -832,7 +844,11 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                                         location.progress_type != LocationProgressType.PRIORITY):
                                     candidate_items[player].add(location)
                                     logging.debug(f"Candidate item: {location.name}, {location.item.name}")
-                        balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                        if balancing_sphere_num < len(pending_spheres):
+                            balancing_sphere = pending_spheres[balancing_sphere_num]
+                        else:
+                            balancing_sphere = get_sphere_locations(balancing_state, balancing_unchecked_locations)
+                            pending_spheres.append(balancing_sphere)
                         for location in balancing_sphere:
                             balancing_unchecked_locations.remove(location)
                             if not location.locked:
@@ -850,12 +866,17 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                         if l not in balancing_unchecked_locations:
                             unlocked_locations[l.player].add(l)
                     items_to_replace: typing.List[Location] = []
+                    balancing_beaten = multiworld.has_beaten_game(balancing_state)
                     for player in balancing_players:
                         locations_to_test = unlocked_locations[player]
                         items_to_test = list(candidate_items[player])
                         items_to_test.sort()
                         multiworld.random.shuffle(items_to_test)
                         while items_to_test:
+                            if budget and evaluated_item_count >= budget:
+                                out_of_budget = True
+                                break
+                            evaluated_item_count += 1
                             testing = items_to_test.pop()
                             reducing_state = state.copy()
                             for location in itertools.chain((
@@ -866,14 +887,16 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
 
                             reducing_state.sweep_for_advancements(locations=locations_to_test)
 
-                            if multiworld.has_beaten_game(balancing_state):
-                                if not multiworld.has_beaten_game(reducing_state):
-                                    items_to_replace.append(testing)
+                            if balancing_beaten:
+                                replace = not multiworld.has_beaten_game(reducing_state)
                             else:
                                 reduced_sphere = get_sphere_locations(reducing_state, locations_to_test)
                                 p = item_percentage(player, reachable_locations_count[player] + len(reduced_sphere))
-                                if p < threshold_percentages[player]:
-                                    items_to_replace.append(testing)
+                                replace = p < threshold_percentages[player]
+                            if replace:
+                                items_to_replace.append(testing)
+                        if out_of_budget:
+                            break
 
                     old_moved_item_count = moved_item_count
 
@@ -901,6 +924,7 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                             logging.warning(f"Could not Progression Balance {old_location.item}")
 
                     if old_moved_item_count < moved_item_count:
+                        pending_spheres.clear()
                         logging.debug(f"Moved {moved_item_count} items so far\n")
                         unlocked = {fresh for player in balancing_players for fresh in unlocked_locations[player]}
                         for location in get_sphere_locations(state, unlocked):
@@ -914,6 +938,10 @@ def balance_multiworld_progression(multiworld: MultiWorld) -> None:
                     state.collect(location.item, True, location)
             checked_locations |= sphere_locations
 
+            if out_of_budget:
+                logging.warning(f"Progression balancing stopped early after evaluating {evaluated_item_count} items, "
+                                f"having moved {moved_item_count} items.")
+                break
             if multiworld.has_beaten_game(state):
                 break
             elif not sphere_locations:
@@ -931,6 +959,8 @@ def swap_location_item(location_1: Location, location_2: Location, check_locked:
     location_2.item, location_1.item = location_1.item, location_2.item
     location_1.item.location = location_1
     location_2.item.location = location_2
+    if location_1.parent_region and location_1.parent_region.multiworld:
+        location_1.parent_region.multiworld.invalidate_spheres((location_1, location_2))
 
 
 def parse_planned_blocks(multiworld: MultiWorld) -> dict[int, list[PlandoItemBlock]]:
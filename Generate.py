@@ -57,6 +57,12 @@ def mystery_argparse(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--spoiler_only", action="store_true",
                         help="Skips generation assertion and multidata, outputting only a spoiler log. "
                              "Intended for debugging and testing purposes.")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="Writes a json report of the time taken per world, stage and phase of generation, "
+                             "CollectionState copy and sweep counts and the slowest access rules to PATH.")
+    parser.add_argument("--profile_flamegraph", metavar="PATH",
+                        help="Writes the time taken per phase, stage and world of generation to PATH "
+                             "as collapsed stacks for flamegraph tools.")
     args = parser.parse_args(argv)
 
     if args.skip_output and args.spoiler_only:
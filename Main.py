@@ -1,7 +1,9 @@
 import collections
-from collections.abc import Mapping
+from collections.abc import Iterator, Mapping
 import concurrent.futures
+import contextlib
 import logging
+import multiprocessing
 import os
 import tempfile
 import time
@@ -15,6 +17,7 @@ from Fill import FillError, balance_multiworld_progression, distribute_items_res
     parse_planned_blocks, distribute_planned_blocks, resolve_early_locations_for_planned
 from NetUtils import convert_to_base_types
 from Options import StartInventoryPool
+import Profiling
 from Utils import __version__, output_path, restricted_dumps, version_tuple
 from settings import get_settings
 from worlds import AutoWorld
@@ -22,6 +25,38 @@ from worlds.generic.Rules import exclusion_rules, locality_rules
 
 __all__ = ["main"]
 
+_forked_multiworld: MultiWorld | None = None
+"""The multiworld the output processes were forked with."""
+
+
+def _generate_output_in_process(player: int, output_directory: str) -> dict[str, Any]:
+    """Runs a world's generate_output in a forked process and returns the attributes to hand back to the world."""
+    assert _forked_multiworld, "output processes have to be forked from a generating process"
+    world = _forked_multiworld.worlds[player]
+    AutoWorld.call_single(_forked_multiworld, "generate_output", player, output_directory)
+    return {name: getattr(world, name) for name in world.process_output}
+
+
+@contextlib.contextmanager
+def _start_output_processes(multiworld: MultiWorld, players: list[int]) \
+        -> Iterator[concurrent.futures.ProcessPoolExecutor | None]:
+    global _forked_multiworld
+    processes = min(get_settings().generator.output_processes, len(players))
+    if processes < 1:
+        yield None
+        return
+    if "fork" not in multiprocessing.get_all_start_methods():
+        logging.info("Output processes require fork, which is not available on this platform. Using threads instead.")
+        yield None
+        return
+    _forked_multiworld = multiworld
+    try:
+        with concurrent.futures.ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("fork")) as pool:
+            yield pool
+    finally:
+        # the processes have their own copy, so this would only keep the multiworld alive after generation
+        _forked_multiworld = None
+
 
 def main(args, seed=None, baked_server_options: dict[str, object] | None = None):
     if not baked_server_options:
@@ -32,6 +67,18 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         output_path.cached_path = args.outputpath
 
     start = time.perf_counter()
+    profile = Profiling.start() if args.profile or args.profile_flamegraph else None
+    try:
+        multiworld = _generate(args, seed, baked_server_options, start)
+    finally:
+        if profile:
+            Profiling.stop()
+    if profile:
+        profile.write(args.profile, args.profile_flamegraph, multiworld)
+    return multiworld
+
+
+def _generate(args, seed, baked_server_options: dict[str, object], start: float) -> MultiWorld:
     # initialize the multiworld
     multiworld = MultiWorld(args.multi)
 
@@ -69,6 +116,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
     del item_count, location_count
 
+    Profiling.phase("generate")
     # This assertion method should not be necessary to run if we are not outputting any multidata.
     if not args.skip_output and not args.spoiler_only:
         AutoWorld.call_stage(multiworld, "assert_generate")
@@ -184,11 +232,15 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     if any(world.options.item_links for world in multiworld.worlds.values()):
         multiworld._all_state = None
 
+    Profiling.phase("plando")
+    # all rules are set by now, so they can be timed through fill, balancing and spoiler
+    Profiling.instrument_rules(multiworld)
     logger.info("Running Item Plando.")
     resolve_early_locations_for_planned(multiworld)
     distribute_planned_blocks(multiworld, [x for player in multiworld.plando_item_blocks
                                            for x in multiworld.plando_item_blocks[player]])
 
+    Profiling.phase("fill")
     logger.info('Running Pre Main Fill.')
 
     AutoWorld.call_all(multiworld, "pre_fill")
@@ -202,8 +254,13 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
 
     AutoWorld.call_all(multiworld, 'post_fill')
 
+    Profiling.phase("balancing")
+    # from here on, the spoiler, the accessibility check and get_spheres share one index, kept up to date by any swaps
+    # afterwards; progression balancing walks its own spheres and the multidata uses a separate index of sendable ones
+    multiworld.share_spheres()
+
     if multiworld.players > 1 and not args.skip_prog_balancing:
-        balance_multiworld_progression(multiworld)
+        balance_multiworld_progression(multiworld, get_settings().generator.progression_balancing_budget)
     else:
         logger.info("Progression balancing skipped.")
 
@@ -214,10 +271,12 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         logger.info('Done. Skipped output/spoiler generation. Total Time: %s', time.perf_counter() - start)
         return multiworld
 
+    Profiling.phase("output")
     logger.info(f'Beginning output...')
     outfilebase = 'AP_' + multiworld.seed_name
 
     if args.spoiler_only:
+        Profiling.phase("spoiler")
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
             multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
@@ -230,10 +289,37 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
     with output as temp_dir:
         output_players = [player for player in multiworld.player_ids if AutoWorld.World.generate_output.__code__
                           is not multiworld.worlds[player].generate_output.__code__]
-        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool:
+        process_players = [player for player in output_players
+                           if multiworld.worlds[player].process_output is not None]
+        # computed up front, so the output threads and processes only ever read the shared spheres;
+        # the sendable spheres are only walked by write_multidata, so they are left to compute there
+        multiworld.get_sphere_index().compute()
+        with concurrent.futures.ThreadPoolExecutor(len(output_players) + 2) as pool, \
+                _start_output_processes(multiworld, process_players) as process_pool:
+            output_file_futures = []
+            if process_pool:
+                # submitted before anything runs in the thread pool, so the processes are forked without its threads
+                process_futures = {player: process_pool.submit(_generate_output_in_process, player, temp_dir)
+                                   for player in process_players}
+
+                def receive_process_output(player: int) -> None:
+                    world = multiworld.worlds[player]
+                    try:
+                        for name, value in process_futures[player].result().items():
+                            setattr(world, name, value)
+                    finally:
+                        # the event set by the forked process is not the one modify_multidata waits for
+                        rom_name_available_event = getattr(world, "rom_name_available_event", None)
+                        if rom_name_available_event:
+                            rom_name_available_event.set()
+
+                for player in process_players:
+                    output_file_futures.append(pool.submit(receive_process_output, player))
+                output_players = [player for player in output_players if player not in process_futures]
+
             check_accessibility_task = pool.submit(multiworld.fulfills_accessibility)
 
-            output_file_futures = [pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir)]
+            output_file_futures.append(pool.submit(AutoWorld.call_stage, multiworld, "generate_output", temp_dir))
             for player in output_players:
                 # skip starting a thread for methods that say "pass".
                 output_file_futures.append(
@@ -369,6 +455,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
                     logger.info(f'Generating output files ({i}/{len(output_file_futures)}).')
                 future.result()
 
+        Profiling.phase("spoiler")
         if args.spoiler > 1:
             logger.info('Calculating playthrough.')
             multiworld.spoiler.create_playthrough(create_paths=args.spoiler > 2)
@@ -376,6 +463,7 @@ def main(args, seed=None, baked_server_options: dict[str, object] | None = None)
         if args.spoiler:
             multiworld.spoiler.to_file(os.path.join(temp_dir, '%s_Spoiler.txt' % outfilebase))
 
+        Profiling.phase("archive")
         zipfilename = output_path(f"AP_{multiworld.seed_name}.zip")
         logger.info(f"Creating final archive at {zipfilename}")
         with zipfile.ZipFile(zipfilename, mode="w", compression=zipfile.ZIP_DEFLATED,
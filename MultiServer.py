@@ -29,6 +29,7 @@ ModuleUpdate.update()
 if typing.TYPE_CHECKING:
     import ssl
     from NetUtils import ServerConnection
+    from ServerMetrics import ServerMetrics
 
 import colorama
 import websockets
@@ -91,6 +92,13 @@ def update_container_unique(container, entries):
     return container
 
 
+def add_in_place(value, other):
+    if type(value) is list and type(other) is list:
+        value += other  # extend instead of copying the whole list
+        return value
+    return value + other
+
+
 def queue_gc():
     import gc
     from threading import Thread
@@ -112,7 +120,8 @@ modify_functions = {
     "replace": lambda old, new: new,
     "default": lambda old, new: old,
     # numeric:
-    "add": operator.add,  # add together two objects, using python's "+" operator (works on strings and lists as append)
+    # add together two objects, using python's "+" operator (works on strings and lists as append, lists in place)
+    "add": add_in_place,
     "mul": operator.mul,
     "pow": operator.pow,
     "mod": operator.mod,
@@ -131,6 +140,11 @@ modify_functions = {
     "pop": pop_from_container,
     "update": update_container_unique,
 }
+# operations that may modify the value they are applied to instead of returning a new one.
+# process_set_cmds copies a value before the first of these in each batch of Sets, as the value stored before the batch
+# may still be referenced by saves, journal records or earlier replies. Only further Sets on the same key within that
+# batch skip the copy, so a single Set per message copies the value once, as every Set did before batching.
+in_place_operations = {"add", "remove", "pop", "update"}
 
 
 def get_saving_second(seed_name: str, interval: int = 60) -> int:
@@ -211,6 +225,9 @@ class Client(Endpoint):
 
 team_slot = typing.Tuple[int, int]
 
+# json of each game's data package by game and checksum, shared by all rooms of a process as most games don't change
+encoded_game_packages: typing.Dict[typing.Tuple[str, str], str] = {}
+
 
 class Context:
     dumper = staticmethod(encode)
@@ -237,6 +254,7 @@ class Context:
     stored_data: typing.Dict[str, object]
     read_data: typing.Dict[str, object]
     stored_data_notification_clients: typing.Dict[str, typing.Set[Client]]
+    stored_data_prefix_notification_clients: typing.Dict[str, typing.Set[Client]]
     slot_info: typing.Dict[int, NetworkSlot]
     generator_version = Version(0, 0, 0)
     checksums: typing.Dict[str, str]
@@ -277,13 +295,17 @@ class Context:
         self.server = None
         self.countdown_timer = 0
         self.received_items = {}
+        self.new_items_slots: typing.Set[team_slot] = set()  # slots with received items not yet sent to clients
         self.start_inventory = {}
         self.name_aliases: typing.Dict[team_slot, str] = {}
         self.location_checks = collections.defaultdict(set)
         self.hint_cost = hint_cost
         self.location_check_points = location_check_points
         self.hints_used = collections.defaultdict(int)
+        # hints each slot is concerned with, as finding player or as (group member of) receiving player
         self.hints: typing.Dict[team_slot, typing.Set[Hint]] = collections.defaultdict(set)
+        # the same hints by (team, finding player, location), as a location has at most one hint
+        self.location_hints: typing.Dict[typing.Tuple[int, int, int], Hint] = {}
         self.release_mode: str = release_mode
         self.remaining_mode: str = remaining_mode
         self.collect_mode: str = collect_mode
@@ -303,8 +325,20 @@ class Context:
         self.auto_save_interval = 60  # in seconds
         self.auto_saver_thread: typing.Optional[threading.Thread] = None
         self.save_dirty = False
+        # journaled saving appends changes to journal_filename and only occasionally writes a full save
+        self.journaling = False
+        self.journal_filename: typing.Optional[str] = None
+        self.journal_id = 0  # of the last full save, which a journal has to start with to apply to it
+        self.journal_records: typing.List[typing.Tuple[str, typing.Any, typing.Any]] = []
+        self.journal_lock = threading.Lock()
+        self.journal_size = 0
+        self.snapshot_size = 0
+        self.snapshot_due = True
         self.tags = ['AP']
+        self.metrics: typing.Optional[ServerMetrics] = None
         self.games: typing.Dict[int, str] = {}
+        self.game_slots: typing.Dict[str, typing.List[int]] = {}
+        self.tagged_clients: typing.Dict[typing.Tuple[int, str], typing.Set[Client]] = {}
         self.minimum_client_versions: typing.Dict[int, Version] = {}
         self.seed_name = ""
         self.groups = {}
@@ -312,8 +346,13 @@ class Context:
         self.random = random.Random()
         self.stored_data = {}
         self.stored_data_notification_clients = collections.defaultdict(weakref.WeakSet)
+        self.stored_data_prefix_notification_clients = collections.defaultdict(weakref.WeakSet)
+        self.stored_data_prefix_lengths: typing.Set[int] = set()
         self.read_data = {}
         self.spheres = []
+        self.encoded_game_packages: typing.Dict[str, str] = {}
+        self.encoded_cache: typing.Dict[typing.Hashable, typing.Tuple[typing.Hashable, str]] = {}
+        self.players_version = 0
 
         # init empty to satisfy linter, I suppose
         self.gamespackage = {}
@@ -378,6 +417,8 @@ class Context:
         if not endpoint.socket or not endpoint.socket.open:
             return False
         msg = self.dumper(msgs)
+        if self.metrics:
+            self.metrics.record_send(1, len(msg))
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -392,6 +433,8 @@ class Context:
     async def send_encoded_msgs(self, endpoint: Endpoint, msg: str) -> bool:
         if not endpoint.socket or not endpoint.socket.open:
             return False
+        if self.metrics:
+            self.metrics.record_send(1, len(msg))
         try:
             await endpoint.socket.send(msg)
         except websockets.ConnectionClosed:
@@ -408,6 +451,8 @@ class Context:
         for endpoint in endpoints:
             if endpoint.socket and endpoint.socket.open:
                 sockets.append(endpoint.socket)
+        if self.metrics:
+            self.metrics.record_send(len(sockets), len(msg))
         try:
             websockets.broadcast(sockets, msg)
         except RuntimeError:
@@ -451,8 +496,35 @@ class Context:
             self.endpoints.remove(endpoint)
         if endpoint.slot and endpoint in self.clients[endpoint.team][endpoint.slot]:
             self.clients[endpoint.team][endpoint.slot].remove(endpoint)
+        self.unindex_client_tags(endpoint)
         await on_client_disconnected(self, endpoint)
 
+    def index_client_tags(self, client: Client):
+        for tag in client.tags:
+            self.tagged_clients.setdefault((client.team, tag), set()).add(client)
+
+    def unindex_client_tags(self, client: Client):
+        for tag in client.tags:
+            tagged_clients = self.tagged_clients.get((client.team, tag))
+            if tagged_clients:
+                tagged_clients.discard(client)
+                if not tagged_clients:
+                    del self.tagged_clients[client.team, tag]
+
+    def get_bounce_targets(self, team: int, games: typing.Iterable[str], tags: typing.Iterable[str],
+                           slots: typing.Iterable[int]) -> typing.Set[Client]:
+        """Returns the clients of team that play one of games, have one of tags or are connected to one of slots."""
+        team_clients = self.clients[team]
+        targets: typing.Set[Client] = set()
+        for game in games:
+            for slot in self.game_slots.get(game, ()):
+                targets.update(team_clients[slot])
+        for tag in tags:
+            targets.update(self.tagged_clients.get((team, tag), ()))
+        for slot in slots:
+            targets.update(team_clients.get(slot, ()))
+        return targets
+
     def notify_client(self, client: Client, text: str, additional_arguments: dict = {}):
         if not client.auth or client.no_text:
             return
@@ -514,6 +586,9 @@ class Context:
 
         self.slot_info = decoded_obj["slot_info"]
         self.games = {slot: slot_info.game for slot, slot_info in self.slot_info.items()}
+        self.game_slots = {}
+        for slot, game in self.games.items():
+            self.game_slots.setdefault(game, []).append(slot)
         self.groups = {slot: set(slot_info.group_members) for slot, slot_info in self.slot_info.items()
                        if slot_info.type == SlotType.group}
 
@@ -527,7 +602,7 @@ class Context:
             self.player_names[0, slot_id] = slot_info.name
             self.player_name_lookup[slot_info.name] = 0, slot_id
             self.read_data[f"hints_{0}_{slot_id}"] = lambda local_team=0, local_player=slot_id: \
-                list(self.get_rechecked_hints(local_team, local_player))
+                list(self.hints[local_team, local_player])
             self.read_data[f"client_status_{0}_{slot_id}"] = lambda local_team=0, local_player=slot_id: \
                 self.client_game_state[local_team, local_player]
 
@@ -547,6 +622,7 @@ class Context:
 
         for slot, hints in decoded_obj["precollected_hints"].items():
             self.hints[0, slot].update(hints)
+        self.index_hints()
 
         # declare slots that aren't players as done
         for slot, slot_info in self.slot_info.items():
@@ -584,6 +660,7 @@ class Context:
         if self.saving:
             if now:
                 self.save_dirty = False
+                self.snapshot_due = True
                 return self._save()
 
             self.save_dirty = True
@@ -592,18 +669,110 @@ class Context:
         return False
 
     def _save(self, exit_save: bool = False) -> bool:
+        if self.journaling and not self.snapshot_due and self.journal_size <= self.snapshot_size:
+            return self._save_journal()
         try:
+            # a failed full save leaves the journal behind the game state, so the next save has to be full again
+            self.snapshot_due = True
+            with self.journal_lock:
+                self.journal_records.clear()
+            self.journal_id += 1
+            start = time.perf_counter()
             # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
-            encoded_save = pickle.dumps(self.get_save())
+            encoded_save = zlib.compress(pickle.dumps(self.get_save()))
             with open(self.save_filename, "wb") as f:
-                f.write(zlib.compress(encoded_save))
+                f.write(encoded_save)
+            if self.metrics:
+                self.metrics.record_save("snapshot", time.perf_counter() - start, len(encoded_save))
+            if self.journaling:
+                self.snapshot_size = len(encoded_save)
+                self.journal_size = 0
+                self._write_journal("wb", [("journal", None, self.journal_id)])
         except Exception as e:
             self.logger.exception(e)
             return False
         else:
+            self.snapshot_due = False
             return True
 
-    def init_save(self, enabled: bool = True):
+    def _save_journal(self) -> bool:
+        with self.journal_lock:
+            records, self.journal_records = self.journal_records, []
+        if records:
+            try:
+                self._write_journal("ab", records)
+            except Exception as e:
+                self.logger.exception(e)
+                self.snapshot_due = True
+                return False
+        return True
+
+    def _write_journal(self, mode: str, records: typing.List[typing.Tuple[str, typing.Any, typing.Any]]) -> None:
+        start = time.perf_counter()
+        chunk = zlib.compress(pickle.dumps(records))
+        with open(self.journal_filename, mode) as f:
+            f.write(len(chunk).to_bytes(4, "big") + chunk)
+        self.journal_size += 4 + len(chunk)
+        if self.metrics:
+            self.metrics.record_save("journal", time.perf_counter() - start, 4 + len(chunk))
+
+    def journal(self, kind: str, key: typing.Any, value: typing.Any) -> None:
+        """Records a change of the game state for the next journaled save, see replay_journal_record for kinds."""
+        if self.journaling:
+            with self.journal_lock:
+                self.journal_records.append((kind, key, value))
+
+    def replay_journal_record(self, kind: str, key: typing.Any, value: typing.Any) -> None:
+        if kind == "location_checks":
+            self.location_checks[key] |= value
+        elif kind == "received_items":
+            index, items = value
+            self.received_items.setdefault(key, [])[index:index + len(items)] = items
+        elif kind == "group_collected":
+            self.group_collected.setdefault(key, set()).add(value)
+        elif kind == "hint":
+            hint: Hint = value
+            old_hint = self.get_hint(key, hint.finding_player, hint.location)
+            if not old_hint:
+                self.add_hint(key, hint)
+            elif old_hint != hint:
+                self.update_hint(key, old_hint, hint)
+        elif kind in {"client_activity_timers", "client_connection_timers"}:
+            getattr(self, kind)[key] = datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+        elif kind == "name_aliases" and value is None:
+            self.name_aliases.pop(key, None)
+        elif kind in {"name_aliases", "hints_used", "client_game_state", "stored_data"}:
+            getattr(self, kind)[key] = value
+        else:
+            raise ValueError(f"Unknown save journal record {kind}")
+
+    def load_journal(self) -> None:
+        """Replays the journal of the loaded save, if there is one that starts at it."""
+        try:
+            with open(self.journal_filename, "rb") as f:
+                journal = f.read()
+        except FileNotFoundError:
+            return
+        records: typing.List[typing.Tuple[str, typing.Any, typing.Any]] = []
+        position = 0
+        while position < len(journal):
+            size = int.from_bytes(journal[position:position + 4], "big")
+            if position + 4 + size > len(journal):
+                self.logger.warning("Save journal ends in an incomplete save, ignoring it.")
+                break
+            records += restricted_loads(zlib.decompress(journal[position + 4:position + 4 + size]))
+            position += 4 + size
+        if not records or records[0] != ("journal", None, self.journal_id):
+            self.logger.info("Save journal is of an older save, ignoring it.")
+            return
+        for kind, key, value in records[1:]:
+            self.replay_journal_record(kind, key, value)
+        self.logger.info(f"Replayed {len(records) - 1} changes from the save journal.")
+        # a complete journal can be continued, otherwise it has to start over with a full save
+        self.journal_size = position
+        self.snapshot_due = position != len(journal)
+
+    def init_save(self, enabled: bool = True, journal: bool = False):
         self.saving = enabled
         if self.saving:
             if not self.save_filename:
@@ -611,14 +780,23 @@ class Context:
                 name, ext = os.path.splitext(self.data_filename)
                 self.save_filename = name + '.apsave' if ext.lower() in ('.archipelago', '.zip') \
                     else self.data_filename + '_' + 'apsave'
+            self.journal_filename = self.save_filename + ".journal"
             try:
                 with open(self.save_filename, 'rb') as f:
-                    save_data = restricted_loads(zlib.decompress(f.read()))
+                    encoded_save = f.read()
+                    self.snapshot_size = len(encoded_save)
+                    save_data = restricted_loads(zlib.decompress(encoded_save))
                     self.set_save(save_data)
             except FileNotFoundError:
                 self.logger.error('No save data found, starting a new game')
             except Exception as e:
                 self.logger.exception(e)
+            else:
+                try:
+                    self.load_journal()
+                except Exception as e:
+                    self.logger.exception(e)
+            self.journaling = journal
             self._start_async_saving()
 
     def _start_async_saving(self, atexit_save: bool = True):
@@ -653,7 +831,6 @@ class Context:
                 atexit.register(self._save, True)  # make sure we save on exit too
 
     def get_save(self) -> dict:
-        self.recheck_hints()
         d = {
             "version": self.save_version,
             "connect_names": self.connect_names,
@@ -670,6 +847,7 @@ class Context:
             "random_state": self.random.getstate(),
             "group_collected": dict(self.group_collected),
             "stored_data": self.stored_data,
+            "journal_id": self.journal_id,
             "game_options": {"hint_cost": self.hint_cost, "location_check_points": self.location_check_points,
                              "server_password": self.server_password, "password": self.password,
                              "release_mode": self.release_mode,
@@ -691,6 +869,7 @@ class Context:
         self.hints.update(savedata["hints"])
 
         self.name_aliases.update(savedata["name_aliases"])
+        self.players_version += 1
         self.client_game_state.update(savedata["client_game_state"])
         self.client_connection_timers.update(
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
@@ -699,6 +878,7 @@ class Context:
             {tuple(key): datetime.datetime.fromtimestamp(value, datetime.timezone.utc) for key, value
              in savedata["client_activity_timers"]})
         self.location_checks.update(savedata["location_checks"])
+        self.index_hints()
         self.random.setstate(savedata["random_state"])
 
         if "game_options" in savedata:
@@ -718,6 +898,8 @@ class Context:
 
         if "stored_data" in savedata:
             self.stored_data = savedata["stored_data"]
+
+        self.journal_id = savedata.get("journal_id", 0)
         # count items and slots from lists for items_handling = remote
         self.logger.info(
             f'Loaded save file with {sum([len(v) for k, v in self.received_items.items() if k[2]])} received items '
@@ -730,33 +912,44 @@ class Context:
             return max(1, int(self.hint_cost * 0.01 * len(self.locations[slot])))
         return 0
 
+    def index_hints(self) -> None:
+        """Rechecks all hints and rebuilds location_hints from the hints of each slot, after those were loaded."""
+        self.location_hints.clear()
+        for (team, slot), hints in self.hints.items():
+            hints = {hint.re_check(self, team) for hint in hints}
+            self.hints[team, slot] = hints
+            for hint in hints:
+                self.location_hints.setdefault((team, hint.finding_player, hint.location), hint)
+
     def recheck_hints(self, team: typing.Optional[int] = None, slot: typing.Optional[int] = None,
                       changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
         """Refreshes the hints for the specified team/slot. Providing 'None' for either team or slot
         will refresh all teams or all slots respectively. If a set is passed for 'changed', each (team,slot)
         pair that has at least one hint modified will be added to the set.
         """
-        for hint_team, hint_slot in self.hints:
+        for (hint_team, _, _), hint in list(self.location_hints.items()):
             if team != hint_team and team is not None:
                 continue  # Check specified team only, all if team is None
-            if slot != hint_slot and slot is not None:
+            if slot is not None and slot != hint.finding_player and slot not in self.slot_set(hint.receiving_player):
                 continue  # Check specified slot only, all if slot is None
-            new_hints: typing.Set[Hint] = set()
-            for hint in self.hints[hint_team, hint_slot]:
-                new_hint = hint.re_check(self, hint_team)
-                new_hints.add(new_hint)
-                if hint == new_hint:
-                    continue
-                for player in self.slot_set(hint.receiving_player) | {hint.finding_player}:
-                    if changed is not None:
-                        changed.add((hint_team,player))
-                    if slot is not None and slot != player:
-                        self.replace_hint(hint_team, player, hint, new_hint)
-            self.hints[hint_team, hint_slot] = new_hints
-
-    def get_rechecked_hints(self, team: int, slot: int):
-        self.recheck_hints(team, slot)
-        return self.hints[team, slot]
+            self._recheck_hint(hint_team, hint, changed)
+
+    def recheck_location_hints(self, team: int, slot: int, locations: typing.Iterable[int],
+                               changed: typing.Optional[typing.Set[team_slot]] = None) -> None:
+        """Refreshes only the hints for the given locations of team/slot, such as newly checked ones.
+        Adds each (team,slot) pair that has at least one hint modified to 'changed', if passed."""
+        for location in locations:
+            hint = self.location_hints.get((team, slot, location))
+            if hint:
+                self._recheck_hint(team, hint, changed)
+
+    def _recheck_hint(self, team: int, hint: Hint, changed: typing.Optional[typing.Set[team_slot]]) -> None:
+        new_hint = hint.re_check(self, team)
+        if hint == new_hint:
+            return
+        concerning_slots = self.update_hint(team, hint, new_hint)
+        if changed is not None:
+            changed.update((team, player) for player in concerning_slots)
 
     def get_sphere(self, player: int, location_id: int) -> int:
         """Get sphere of a location, -1 if spheres are not available."""
@@ -768,9 +961,60 @@ class Context:
                            f"Location or player may not exist.")
         return -1
 
+    def get_encoded_game_package(self, game: str) -> str:
+        """Returns the json of a game's data package, encoding it only once per checksum."""
+        encoded = self.encoded_game_packages.get(game)
+        if encoded is None:
+            game_package = self.gamespackage[game]
+            checksum = game_package.get("checksum")
+            encoded = encoded_game_packages.get((game, checksum)) if checksum else None
+            if encoded is None:
+                encoded = self.dumper(game_package)
+                if checksum:
+                    encoded_game_packages[game, checksum] = encoded
+            self.encoded_game_packages[game] = encoded
+        return encoded
+
+    def get_data_package_msg(self, games: typing.Iterable[str]) -> str:
+        """Returns the encoded DataPackage message for games, put together from their encoded data packages."""
+        encoded_games = ",".join(f"{self.dumper(game)}:{self.get_encoded_game_package(game)}" for game in games)
+        return f'[{{"cmd":"DataPackage","data":{{"games":{{{encoded_games}}}}}}}]'
+
     def get_players_package(self):
         return [NetworkPlayer(t, p, self.get_aliased_name(t, p), n) for (t, p), n in self.player_names.items()]
 
+    def get_cached_encoding(self, key: typing.Hashable, version: typing.Hashable,
+                            build: typing.Callable[[], typing.Any]) -> str:
+        """Returns the json of build(), reusing the json from an earlier call with the same key and version."""
+        cached = self.encoded_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        encoded = self.dumper(build())
+        self.encoded_cache[key] = version, encoded
+        return encoded
+
+    def get_encoded_players_package(self) -> str:
+        """Returns the json of get_players_package(), encoded again only after aliases changed."""
+        return self.get_cached_encoding("players", self.players_version, self.get_players_package)
+
+    def get_connected_msg(self, team: int, slot: int, slot_data: bool = True) -> str:
+        """
+        Returns the encoded Connected message for a slot, put together from json that is cached per slot.
+        Checked and missing locations are encoded again only after the slot checked more locations.
+        """
+        checks_version = len(self.location_checks[team, slot])
+        missing = self.get_cached_encoding(("missing_locations", team, slot), checks_version,
+                                           lambda: get_missing_checks(self, team, slot))
+        checked = self.get_cached_encoding(("checked_locations", team, slot), checks_version,
+                                           lambda: get_checked_checks(self, team, slot))
+        slot_info = self.get_cached_encoding("slot_info", None, lambda: self.slot_info)
+        msg = (f'{{"cmd":"Connected","team":{team},"slot":{slot},"players":{self.get_encoded_players_package()},'
+               f'"missing_locations":{missing},"checked_locations":{checked},"slot_info":{slot_info},'
+               f'"hint_points":{get_slot_points(self, team, slot)}')
+        if slot_data:
+            msg += f',"slot_data":{self.get_cached_encoding(("slot_data", slot), None, lambda: self.slot_data[slot])}'
+        return msg + "}"
+
     def slot_set(self, slot) -> typing.Set[int]:
         """Returns the slot IDs that concern that slot,
         as in expands groups out and returns back the input for solo."""
@@ -805,7 +1049,8 @@ class Context:
                      persist_even_if_found: bool = False, recipients: typing.Sequence[int] = None):
         """Send and remember hints."""
         if only_new:
-            hints = [hint for hint in hints if hint not in self.hints[team, hint.finding_player]]
+            hints = [hint for hint in hints
+                     if (team, hint.finding_player, hint.location) not in self.location_hints]
         if not hints:
             return
         new_hint_events: typing.Set[int] = set()
@@ -822,12 +1067,8 @@ class Context:
             if not hint.found or persist_even_if_found:
                 # since hints are bidirectional, finding player and receiving player,
                 # we can check once if hint already exists
-                if hint not in self.hints[team, hint.finding_player]:
-                    self.hints[team, hint.finding_player].add(hint)
-                    new_hint_events.add(hint.finding_player)
-                    for player in self.slot_set(hint.receiving_player):
-                        self.hints[team, player].add(hint)
-                        new_hint_events.add(player)
+                if (team, hint.finding_player, hint.location) not in self.location_hints:
+                    new_hint_events |= self.add_hint(team, hint)
 
             self.logger.info("Notice (Team #%d): %s" % (team + 1, format_hint(self, team, hint)))
         for slot in new_hint_events:
@@ -842,15 +1083,30 @@ class Context:
                     async_start(self.send_msgs(client, client_hints))
 
     def get_hint(self, team: int, finding_player: int, seeked_location: int) -> typing.Optional[Hint]:
-        for hint in self.hints[team, finding_player]:
-            if hint.location == seeked_location and hint.finding_player == finding_player:
-                return hint
-        return None
-    
+        return self.location_hints.get((team, finding_player, seeked_location))
+
     def replace_hint(self, team: int, slot: int, old_hint: Hint, new_hint: Hint) -> None:
         if old_hint in self.hints[team, slot]:
             self.hints[team, slot].remove(old_hint)
             self.hints[team, slot].add(new_hint)
+
+    def add_hint(self, team: int, hint: Hint) -> typing.Set[int]:
+        """Adds a hint for a location without one to all slots concerned with it and returns those slots."""
+        self.location_hints[team, hint.finding_player, hint.location] = hint
+        concerning_slots = self.slot_set(hint.receiving_player) | {hint.finding_player}
+        for slot in concerning_slots:
+            self.hints[team, slot].add(hint)
+        self.journal("hint", team, hint)
+        return concerning_slots
+
+    def update_hint(self, team: int, old_hint: Hint, new_hint: Hint) -> typing.Set[int]:
+        """Replaces old_hint with new_hint for all slots concerned with it and returns those slots."""
+        self.location_hints[team, new_hint.finding_player, new_hint.location] = new_hint
+        self.journal("hint", team, new_hint)
+        concerning_slots = self.slot_set(old_hint.receiving_player) | {old_hint.finding_player}
+        for slot in concerning_slots:
+            self.replace_hint(team, slot, old_hint, new_hint)
+        return concerning_slots
     
     # "events"
 
@@ -864,6 +1120,15 @@ class Context:
             release_player(self, client.team, client.slot)
         self.save()  # save goal completion flag
 
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.Set[int]):
+        """Called after locations were newly checked by slot, for subclasses to track checks."""
+        pass
+
+    def on_new_received_items(self, team: int, slot: int, remote_items: bool, index: int,
+                              items: typing.List[NetworkItem]):
+        """Called after items were added at index of the received items of slot, for subclasses to track items."""
+        pass
+
     def on_new_hint(self, team: int, slot: int):
         self.on_changed_hints(team, slot)
         self.broadcast(self.clients[team][slot], [{
@@ -871,22 +1136,40 @@ class Context:
             "hint_points": get_slot_points(self, team, slot)
         }])
 
+    def add_stored_data_notification(self, client: Client, key: str) -> None:
+        """Registers client for SetReply packages of key, or of all keys starting with key if it ends with a *."""
+        if key.endswith("*"):
+            prefix = key[:-1]
+            self.stored_data_prefix_notification_clients[prefix].add(client)
+            self.stored_data_prefix_lengths.add(len(prefix))
+        else:
+            self.stored_data_notification_clients[key].add(client)
+
+    def get_stored_data_notification_clients(self, key: str) -> typing.Set[Client]:
+        """Returns the clients registered for SetReply packages of key, directly or by one of its prefixes."""
+        targets: typing.Set[Client] = set(self.stored_data_notification_clients.get(key, ()))
+        # only look up prefixes of lengths that were registered, instead of every prefix of key
+        for length in self.stored_data_prefix_lengths:
+            if length <= len(key):
+                targets.update(self.stored_data_prefix_notification_clients.get(key[:length], ()))
+        return targets
+
     def on_changed_hints(self, team: int, slot: int):
         key: str = f"_read_hints_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
+        targets: typing.Set[Client] = self.get_stored_data_notification_clients(key)
         if targets:
             self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.hints[team, slot]}])
 
     def on_client_status_change(self, team: int, slot: int):
         key: str = f"_read_client_status_{team}_{slot}"
-        targets: typing.Set[Client] = set(self.stored_data_notification_clients[key])
+        targets: typing.Set[Client] = self.get_stored_data_notification_clients(key)
         if targets:
             self.broadcast(targets, [{"cmd": "SetReply", "key": key, "value": self.client_game_state[team, slot]}])
 
 
 def update_aliases(ctx: Context, team: int):
-    cmd = ctx.dumper([{"cmd": "RoomUpdate",
-                       "players": ctx.get_players_package()}])
+    ctx.players_version += 1
+    cmd = f'[{{"cmd":"RoomUpdate","players":{ctx.get_encoded_players_package()}}}]'
 
     for clients in ctx.clients[team].values():
         for client in clients:
@@ -906,8 +1189,7 @@ async def server(websocket: "ServerConnection", path: str = "/", ctx: Context =
         async for data in websocket:
             if ctx.log_network:
                 ctx.logger.info(f"Incoming message: {data}")
-            for msg in decode(data):
-                await process_client_cmd(ctx, client, msg)
+            await process_client_cmds(ctx, client, decode(data))
     except Exception as e:
         if not isinstance(e, websockets.WebSocketException):
             ctx.logger.exception(e)
@@ -982,13 +1264,15 @@ async def on_client_joined(ctx: Context, client: Client):
         ctx.notify_client(client, "Warning: your client does not support compressed websocket connections! "
                                   "It may stop working in the future. If you are a player, please report this to the "
                                   "client's developer.")
-    ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+    ctx.client_connection_timers[client.team, client.slot] = now = datetime.datetime.now(datetime.timezone.utc)
+    ctx.journal("client_connection_timers", (client.team, client.slot), now.timestamp())
 
 
 async def on_client_left(ctx: Context, client: Client):
     if len(ctx.clients[client.team][client.slot]) < 1:
         update_client_status(ctx, client, ClientStatus.CLIENT_UNKNOWN)
-        ctx.client_connection_timers[client.team, client.slot] = datetime.datetime.now(datetime.timezone.utc)
+        ctx.client_connection_timers[client.team, client.slot] = now = datetime.datetime.now(datetime.timezone.utc)
+        ctx.journal("client_connection_timers", (client.team, client.slot), now.timestamp())
 
     version_str = '.'.join(str(x) for x in client.version)
 
@@ -1066,20 +1350,36 @@ def get_start_inventory(ctx: Context, player: int, remote_start_inventory: bool)
     return ctx.start_inventory.setdefault(player, []) if remote_start_inventory else []
 
 
+def add_received_items(ctx: Context, team: int, slot: int, remote_items: bool,
+                       new_items: typing.List[NetworkItem]) -> None:
+    items = get_received_items(ctx, team, slot, remote_items)
+    index = len(items)
+    ctx.journal("received_items", (team, slot, remote_items), (index, new_items))
+    items += new_items
+    ctx.new_items_slots.add((team, slot))
+    ctx.on_new_received_items(team, slot, remote_items, index, new_items)
+
+
 def send_new_items(ctx: Context):
-    for team, clients in ctx.clients.items():
-        for slot, clients in clients.items():
-            for client in clients:
-                if client.no_items:
-                    continue
-                start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
-                items = get_received_items(ctx, team, slot, client.remote_items)
-                if len(start_inventory) + len(items) > client.send_index:
-                    first_new_item = max(0, client.send_index - len(start_inventory))
-                    async_start(ctx.send_msgs(client, [{
-                        "cmd": "ReceivedItems",
-                        "index": client.send_index,
-                        "items": start_inventory[client.send_index:] + items[first_new_item:]}]))
+    """Sends the items added since the last call to the clients of their slots."""
+    new_items_slots, ctx.new_items_slots = ctx.new_items_slots, set()
+    for team, slot in new_items_slots:
+        # clients of a slot that are in sync and handle items the same way are sent the same message
+        clients_by_message: typing.Dict[typing.Tuple[int, bool, bool], typing.List[Client]] = \
+            collections.defaultdict(list)
+        for client in ctx.clients.get(team, {}).get(slot, ()):
+            if not client.no_items:
+                clients_by_message[client.send_index, client.remote_items, client.remote_start_inventory].append(client)
+        for (send_index, remote_items, remote_start_inventory), clients in clients_by_message.items():
+            start_inventory = get_start_inventory(ctx, slot, remote_start_inventory)
+            items = get_received_items(ctx, team, slot, remote_items)
+            if len(start_inventory) + len(items) > send_index:
+                first_new_item = max(0, send_index - len(start_inventory))
+                ctx.broadcast(clients, [{
+                    "cmd": "ReceivedItems",
+                    "index": send_index,
+                    "items": start_inventory[send_index:] + items[first_new_item:]}])
+                for client in clients:
                     client.send_index = len(start_inventory) + len(items)
 
 
@@ -1094,8 +1394,7 @@ def release_player(ctx: Context, team: int, slot: int):
     ctx.broadcast_text_all("%s (Team #%d) has released all remaining items from their world."
                            % (ctx.player_names[(team, slot)], team + 1),
                            {"type": "Release", "team": team, "slot": slot})
-    register_location_checks(ctx, team, slot, all_locations)
-    update_checked_locations(ctx, team, slot)
+    register_bulk_location_checks(ctx, team, {slot: all_locations}, resync=True)
 
 
 def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
@@ -1105,15 +1404,14 @@ def collect_player(ctx: Context, team: int, slot: int, is_group: bool = False):
     ctx.broadcast_text_all("%s (Team #%d) has collected their items from other worlds."
                            % (ctx.player_names[(team, slot)], team + 1),
                            {"type": "Collect", "team": team, "slot": slot})
-    for source_player, location_ids in all_locations.items():
-        register_location_checks(ctx, team, source_player, location_ids, count_activity=False)
-        update_checked_locations(ctx, team, source_player)
+    register_bulk_location_checks(ctx, team, all_locations, count_activity=False, resync=True)
 
     if not is_group:
         for group, group_players in ctx.groups.items():
             if slot in group_players:
                 group_collected_players = ctx.group_collected.setdefault(group, set())
                 group_collected_players.add(slot)
+                ctx.journal("group_collected", group, slot)
                 if set(group_players) == group_collected_players:
                     collect_player(ctx, team, group, True)
 
@@ -1124,20 +1422,35 @@ def get_remaining(ctx: Context, team: int, slot: int) -> typing.List[typing.Tupl
 
 def send_items_to(ctx: Context, team: int, target_slot: int, *items: NetworkItem):
     for target in ctx.slot_set(target_slot):
-        for item in items:
-            if item.player != target_slot:
-                get_received_items(ctx, team, target, False).append(item)
-            get_received_items(ctx, team, target, True).append(item)
+        for remote_items in (False, True):
+            target_items = [item for item in items if remote_items or item.player != target_slot]
+            if target_items:
+                add_received_items(ctx, team, target, remote_items, target_items)
 
 
 def register_location_checks(ctx: Context, team: int, slot: int, locations: typing.Iterable[int],
                              count_activity: bool = True):
-    slot_locations = ctx.locations[slot]
-    new_locations = set(locations) - ctx.location_checks[team, slot]
-    new_locations.intersection_update(slot_locations)  # ignore location IDs unknown to this multidata
-    if new_locations:
+    register_bulk_location_checks(ctx, team, {slot: locations}, count_activity)
+
+
+def register_bulk_location_checks(ctx: Context, team: int, checks: typing.Mapping[int, typing.Iterable[int]],
+                                  count_activity: bool = True, resync: bool = False):
+    """
+    Registers checked locations of any number of slots of a team at once,
+    sending new items, RoomUpdates and changed hints once per affected client.
+    If resync, the RoomUpdate of every slot in checks contains all of its checked locations instead of only new ones.
+    """
+    new_checks: typing.Dict[int, typing.Set[int]] = {}
+    info_texts: list[dict[str, typing.Any]] = []
+    for slot, locations in checks.items():
+        slot_locations = ctx.locations[slot]
+        new_locations = set(locations) - ctx.location_checks[team, slot]
+        new_locations.intersection_update(slot_locations)  # ignore location IDs unknown to this multidata
+        if not new_locations:
+            continue
         if count_activity:
-            ctx.client_activity_timers[team, slot] = datetime.datetime.now(datetime.timezone.utc)
+            ctx.client_activity_timers[team, slot] = now = datetime.datetime.now(datetime.timezone.utc)
+            ctx.journal("client_activity_timers", (team, slot), now.timestamp())
 
         sortable: list[tuple[int, int, int, int]] = []
         for location in new_locations:
@@ -1146,7 +1459,6 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
             # sort/group by receiver and item
             sortable.append((target_player, item_id, location, flags))
 
-        info_texts: list[dict[str, typing.Any]] = []
         for target_player, item_id, location, flags in sorted(sortable):
             new_item = NetworkItem(item_id, location, slot, flags)
             send_items_to(ctx, team, target_player, new_item)
@@ -1160,19 +1472,31 @@ def register_location_checks(ctx: Context, team: int, slot: int, locations: typi
                 ctx.broadcast_team(team, info_texts)
                 info_texts.clear()
             info_texts.append(json_format_send_event(new_item, target_player))
-        ctx.broadcast_team(team, info_texts)
-        del info_texts
         del sortable
 
         ctx.location_checks[team, slot] |= new_locations
+        ctx.journal("location_checks", (team, slot), new_locations)
+        new_checks[slot] = new_locations
+        ctx.on_new_location_checks(team, slot, new_locations)
+
+    if info_texts:
+        ctx.broadcast_team(team, info_texts)
+    del info_texts
+    if new_checks:
         send_new_items(ctx)
-        ctx.broadcast(ctx.clients[team][slot], [{
-            "cmd": "RoomUpdate",
-            "hint_points": get_slot_points(ctx, team, slot),
-            "checked_locations": new_locations,  # send back new checks only
-        }])
+    for slot in (checks if resync else new_checks):
+        if not ctx.clients[team][slot]:
+            continue
+        room_update: typing.Dict[str, typing.Any] = {"cmd": "RoomUpdate"}
+        if slot in new_checks:
+            room_update["hint_points"] = get_slot_points(ctx, team, slot)
+        # send back new checks only, unless resyncing
+        room_update["checked_locations"] = get_checked_checks(ctx, team, slot) if resync else new_checks[slot]
+        ctx.broadcast(ctx.clients[team][slot], [room_update])
+    if new_checks:
         updated_slots: typing.Set[tuple[int, int]] = set()
-        ctx.recheck_hints(team, slot, updated_slots)
+        for slot, new_locations in new_checks.items():
+            ctx.recheck_location_hints(team, slot, new_locations, updated_slots)
         for hint_team, hint_slot in updated_slots:
             ctx.on_changed_hints(hint_team, hint_slot)
         ctx.save()
@@ -1642,12 +1966,14 @@ class ClientMessageProcessor(CommonCommandProcessor):
         if alias_name:
             alias_name = alias_name[:16].strip()
             self.ctx.name_aliases[self.client.team, self.client.slot] = alias_name
+            self.ctx.journal("name_aliases", (self.client.team, self.client.slot), alias_name)
             self.output(f"Hello, {alias_name}")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
             return True
         elif (self.client.team, self.client.slot) in self.ctx.name_aliases:
             del (self.ctx.name_aliases[self.client.team, self.client.slot])
+            self.ctx.journal("name_aliases", (self.client.team, self.client.slot), None)
             self.output("Removed Alias")
             update_aliases(self.ctx, self.client.team)
             self.ctx.save()
@@ -1665,8 +1991,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
             )
             if usable:
                 new_item = NetworkItem(names[item_name], -1, self.client.slot)
-                get_received_items(self.ctx, self.client.team, self.client.slot, False).append(new_item)
-                get_received_items(self.ctx, self.client.team, self.client.slot, True).append(new_item)
+                for remote_items in (False, True):
+                    add_received_items(self.ctx, self.client.team, self.client.slot, remote_items, [new_item])
                 self.ctx.broadcast_text_all(
                     'Cheat console: sending "' + item_name + '" to ' + self.ctx.get_aliased_name(self.client.team,
                                                                                                  self.client.slot),
@@ -1684,9 +2010,7 @@ class ClientMessageProcessor(CommonCommandProcessor):
         points_available = get_client_points(self.ctx, self.client)
         cost = self.ctx.get_hint_cost(self.client.slot)
         if not input_text:
-            hints = {hint.re_check(self.ctx, self.client.team) for hint in
-                     self.ctx.hints[self.client.team, self.client.slot]}
-            self.ctx.hints[self.client.team, self.client.slot] = hints
+            hints = self.ctx.hints[self.client.team, self.client.slot]
             self.ctx.notify_hints(self.client.team, list(hints), recipients=(self.client.slot,))
             self.output(f"A hint costs {self.ctx.get_hint_cost(self.client.slot)} points. "
                         f"You have {points_available} points.")
@@ -1778,6 +2102,8 @@ class ClientMessageProcessor(CommonCommandProcessor):
                     hints.append(hint)
                     can_pay -= 1
                     self.ctx.hints_used[self.client.team, self.client.slot] += 1
+                    self.ctx.journal("hints_used", (self.client.team, self.client.slot),
+                                     self.ctx.hints_used[self.client.team, self.client.slot])
 
                 self.ctx.notify_hints(self.client.team, hints)
                 if not_found_hints:
@@ -1844,6 +2170,98 @@ def get_slot_points(ctx: Context, team: int, slot: int) -> int:
             ctx.get_hint_cost(slot) * ctx.hints_used[team, slot])
 
 
+async def process_client_cmds(ctx: Context, client: Client, msgs: typing.List[typing.Any]):
+    """Processes the commands of one message, replying to consecutive Set commands together."""
+    sets: typing.List[dict] = []
+    for args in msgs:
+        if client.auth and type(args) is dict and args.get("cmd") == "Set":
+            sets.append(args)
+            continue
+        if sets:
+            await process_set_cmds(ctx, client, sets)
+            sets = []
+        if ctx.metrics:
+            cmd = args.get("cmd") if type(args) is dict else None  # handlers may reuse args for their reply
+            start = time.perf_counter()
+            try:
+                await process_client_cmd(ctx, client, args)
+            finally:
+                ctx.metrics.record_command(cmd, time.perf_counter() - start)
+        else:
+            await process_client_cmd(ctx, client, args)
+    if sets:
+        await process_set_cmds(ctx, client, sets)
+
+
+async def process_set_cmds(ctx: Context, client: Client, sets: typing.List[dict]):
+    """
+    Applies Set commands to the data storage in order,
+    then sends each target all of its SetReply packages in one message.
+    """
+    start = time.perf_counter()
+    replies: typing.List[dict] = []
+    reply_targets: typing.Dict[Client, typing.List[int]] = collections.defaultdict(list)
+    # keys whose stored value was copied by an earlier Set of this batch and is not referenced by anything else,
+    # only these values can be modified in place. Values stored before this batch may be referenced by saves,
+    # values of replies are only encoded after the batch and values from arguments are echoed in replies.
+    owned_keys: typing.Set[str] = set()
+    changed_keys: typing.Dict[str, None] = {}
+    try:
+        for args in sets:
+            if "key" not in args or args["key"].startswith("_read_") or \
+                    "operations" not in args or not type(args["operations"]) == list:
+                await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments",
+                                              "text": 'Set', "original_cmd": "Set"}])
+                continue
+            key: str = args["key"]
+            targets = ctx.get_stored_data_notification_clients(key)
+            if args.get("want_reply", False):
+                targets.add(client)
+            args["cmd"] = "SetReply"
+            value = ctx.stored_data.get(key, args.get("default", 0))
+            owned = key in owned_keys
+            if targets:
+                args["original_value"] = value
+                owned = False
+            args["slot"] = client.slot
+            for operation in args["operations"]:
+                in_place = operation["operation"] in in_place_operations
+                if in_place and not owned:
+                    value = copy.copy(value)
+                    owned = True
+                value = modify_functions[operation["operation"]](value, operation["value"])
+                # other operations may return one of their arguments, like replace
+                owned = owned and in_place
+            ctx.stored_data[key] = args["value"] = value
+            if owned and not targets:
+                owned_keys.add(key)
+            else:
+                owned_keys.discard(key)
+            changed_keys[key] = None
+            for target in targets:
+                reply_targets[target].append(len(replies))
+            replies.append(args)
+    finally:
+        # journal the final values only, as owned values may still have been modified by later sets
+        for key in changed_keys:
+            ctx.journal("stored_data", key, ctx.stored_data[key])
+        # reply to the sets that were applied even if a later one failed,
+        # clients receiving the same replies share one encoded message
+        clients_by_replies: typing.Dict[typing.Tuple[int, ...], typing.List[Client]] = \
+            collections.defaultdict(list)
+        for target, reply_indices in reply_targets.items():
+            clients_by_replies[tuple(reply_indices)].append(target)
+        for reply_indices, targets in clients_by_replies.items():
+            ctx.broadcast(targets, [replies[index] for index in reply_indices])
+        if replies:
+            ctx.save()
+        if ctx.metrics:
+            # consecutive sets are processed together, so they share the time taken
+            taken = (time.perf_counter() - start) / len(sets)
+            for _ in sets:
+                ctx.metrics.record_command("Set", taken)
+
+
 async def process_client_cmd(ctx: Context, client: Client, args: dict):
     try:
         cmd: str = args["cmd"]
@@ -1897,6 +2315,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             team, slot = ctx.connect_names[args['name']]
             if client.auth and client.team is not None and client.slot in ctx.clients[client.team]:
                 ctx.clients[team][slot].remove(client)  # re-auth, remove old entry
+                ctx.unindex_client_tags(client)
                 if client.team != team or client.slot != slot:
                     client.auth = False  # swapping Team/Slot
             client.team = team
@@ -1906,51 +2325,36 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             ctx.clients[team][slot].append(client)
             client.version = args['version']
             client.tags = args['tags']
+            ctx.index_client_tags(client)
             client.no_locations = bool(client.tags & _non_game_messages.keys())
             # set NoText for old PopTracker clients that predate the tag to save traffic
             client.no_text = "NoText" in client.tags or ("PopTracker" in client.tags and client.version < (0, 5, 1))
-            connected_packet = {
-                "cmd": "Connected",
-                "team": client.team, "slot": client.slot,
-                "players": ctx.get_players_package(),
-                "missing_locations": get_missing_checks(ctx, team, slot),
-                "checked_locations": get_checked_checks(ctx, team, slot),
-                "slot_info": ctx.slot_info,
-                "hint_points": get_slot_points(ctx, team, slot),
-            }
-            reply = [connected_packet]
+            reply = [ctx.get_connected_msg(team, slot, args.get("slot_data", True))]
             start_inventory = get_start_inventory(ctx, slot, client.remote_start_inventory)
             items = get_received_items(ctx, client.team, client.slot, client.remote_items)
             if (start_inventory or items) and not client.no_items:
-                reply.append({"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items})
+                received_items = {"cmd": 'ReceivedItems', "index": 0, "items": start_inventory + items}
+                reply.append(ctx.dumper([received_items])[1:-1])
                 client.send_index = len(start_inventory) + len(items)
             if not client.auth:  # if this was a Re-Connect, don't print to console
                 client.auth = True
                 await on_client_joined(ctx, client)
-            if args.get("slot_data", True):
-                connected_packet["slot_data"] = ctx.slot_data[client.slot]
-            await ctx.send_msgs(client, reply)
+            await ctx.send_encoded_msgs(client, f"[{','.join(reply)}]")
 
     elif cmd == "GetDataPackage":
         exclusions = args.get("exclusions", [])
         if "games" in args:
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name in set(args.get("games", []))}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": games}}])
+            requested_games = set(args.get("games", []))
+            games = [name for name in ctx.gamespackage if name in requested_games]
+            await ctx.send_encoded_msgs(client, ctx.get_data_package_msg(games))
         # TODO: remove exclusions behaviour around 0.5.0
         elif exclusions:
             exclusions = set(exclusions)
-            games = {name: game_data for name, game_data in ctx.gamespackage.items()
-                     if name not in exclusions}
-
-            package = {"games": games}
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": package}])
+            games = [name for name in ctx.gamespackage if name not in exclusions]
+            await ctx.send_encoded_msgs(client, ctx.get_data_package_msg(games))
 
         else:
-            await ctx.send_msgs(client, [{"cmd": "DataPackage",
-                                          "data": {"games": ctx.gamespackage}}])
+            await ctx.send_encoded_msgs(client, ctx.get_data_package_msg(ctx.gamespackage))
 
     elif client.auth:
         if cmd == "ConnectUpdate":
@@ -1978,7 +2382,9 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
 
             if "tags" in args:
                 old_tags = client.tags
+                ctx.unindex_client_tags(client)
                 client.tags = args["tags"]
+                ctx.index_client_tags(client)
                 if set(old_tags) != set(client.tags):
                     client.no_locations = bool(client.tags & _non_game_messages.keys())
                     client.no_text = "NoText" in client.tags or (
@@ -2115,9 +2521,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             if hint == new_hint:
                 return
 
-            concerning_slots = ctx.slot_set(hint.receiving_player) | {hint.finding_player}
-            for slot in concerning_slots:
-                ctx.replace_hint(client.team, slot, hint, new_hint)
+            concerning_slots = ctx.update_hint(client.team, hint, new_hint)
             ctx.save()
             for slot in concerning_slots:
                 ctx.on_changed_hints(client.team, slot)
@@ -2143,13 +2547,9 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             tags = set(args.get("tags", []))
             slots = set(args.get("slots", []))
             args["cmd"] = "Bounced"
-            msg = ctx.dumper([args])
-
-            for bounceclient in ctx.endpoints:
-                if client.team == bounceclient.team and (ctx.games[bounceclient.slot] in games or
-                                                         set(bounceclient.tags) & tags or
-                                                         bounceclient.slot in slots):
-                    await ctx.send_encoded_msgs(bounceclient, msg)
+            targets = ctx.get_bounce_targets(client.team, games, tags, slots)
+            if targets:
+                await ctx.broadcast_send_encoded_msgs(targets, ctx.dumper([args]))
 
         elif cmd == "Get":
             if "keys" not in args or type(args["keys"]) != list:
@@ -2166,25 +2566,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
             await ctx.send_msgs(client, [args])
 
         elif cmd == "Set":
-            if "key" not in args or args["key"].startswith("_read_") or \
-                    "operations" not in args or not type(args["operations"]) == list:
-                await ctx.send_msgs(client, [{'cmd': 'InvalidPacket', "type": "arguments",
-                                              "text": 'Set', "original_cmd": cmd}])
-                return
-            args["cmd"] = "SetReply"
-            value = ctx.stored_data.get(args["key"], args.get("default", 0))
-            args["original_value"] = copy.copy(value)
-            args["slot"] = client.slot
-            for operation in args["operations"]:
-                func = modify_functions[operation["operation"]]
-                value = func(value, operation["value"])
-            ctx.stored_data[args["key"]] = args["value"] = value
-            targets = set(ctx.stored_data_notification_clients[args["key"]])
-            if args.get("want_reply", False):
-                targets.add(client)
-            if targets:
-                ctx.broadcast(targets, [args])
-            ctx.save()
+            await process_set_cmds(ctx, client, [args])
 
         elif cmd == "SetNotify":
             if "keys" not in args or type(args["keys"]) != list:
@@ -2192,7 +2574,7 @@ async def process_client_cmd(ctx: Context, client: Client, args: dict):
                                               "text": 'SetNotify', "original_cmd": cmd}])
                 return
             for key in args["keys"]:
-                ctx.stored_data_notification_clients[key].add(client)
+                ctx.add_stored_data_notification(client, key)
 
 
 def update_client_status(ctx: Context, client: Client, new_status: ClientStatus):
@@ -2207,6 +2589,7 @@ def update_client_status(ctx: Context, client: Client, new_status: ClientStatus)
                 ctx.broadcast_text_all(f"Team #{client.team + 1} has completed all of their games! Congratulations!")
 
         ctx.client_game_state[client.team, client.slot] = new_status
+        ctx.journal("client_game_state", (client.team, client.slot), new_status)
         ctx.on_client_status_change(client.team, client.slot)
         ctx.save()
 
@@ -2266,12 +2649,14 @@ class ServerCommandProcessor(CommonCommandProcessor):
                     if alias_name:
                         alias_name = alias_name.strip()[:15]
                         self.ctx.name_aliases[team, slot] = alias_name
+                        self.ctx.journal("name_aliases", (team, slot), alias_name)
                         self.output(f"Named {player_name} as {alias_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
                         return True
                     else:
                         del (self.ctx.name_aliases[team, slot])
+                        self.ctx.journal("name_aliases", (team, slot), None)
                         self.output(f"Removed Alias for {player_name}")
                         update_aliases(self.ctx, team)
                         self.ctx.save()
@@ -2529,6 +2914,7 @@ class ServerCommandProcessor(CommonCommandProcessor):
                 return False
 
         setattr(self.ctx, option_name, value_type(option_value))
+        self.ctx.snapshot_due = True  # options are only kept by full saves
         self.output(f"Set option {option_name} to {getattr(self.ctx, option_name)}")
         if option_name in {"release_mode", "remaining_mode", "collect_mode"}:
             self.ctx.broadcast_all([{"cmd": "RoomUpdate", 'permissions': get_permissions(self.ctx)}])
@@ -2581,6 +2967,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--password', default=defaults["password"])
     parser.add_argument('--savefile', default=defaults["savefile"])
     parser.add_argument('--disable_save', default=defaults["disable_save"], action='store_true')
+    parser.add_argument('--journal_save', default=defaults["journal_save"], action='store_true',
+                        help="Append changes to a journal next to the save, only occasionally writing a full save.")
     parser.add_argument('--cert', help="Path to a SSL Certificate for encryption.")
     parser.add_argument('--cert_key', help="Path to SSL Certificate Key file")
     parser.add_argument('--loglevel', default=defaults["loglevel"],
@@ -2635,6 +3023,9 @@ def parse_args() -> argparse.Namespace:
     #0 -> recommended for tournaments to force a level playing field, only allow an exact version match
     """)
     parser.add_argument('--log_network', default=defaults["log_network"], action="store_true")
+    parser.add_argument('--metrics_port', type=int,
+                        help="Serve performance metrics in the Prometheus text format on this port of localhost.")
+    parser.add_argument('--metrics_file', help="Write performance metrics as json to this file every minute.")
     args = parser.parse_args()
     return args
 
@@ -2711,7 +3102,7 @@ async def main(args: argparse.Namespace):
         logging.exception(f"Failed to read multiworld data ({e})")
         raise
 
-    ctx.init_save(not args.disable_save)
+    ctx.init_save(not args.disable_save, args.journal_save)
 
     ssl_context = load_server_cert(args.cert, args.cert_key) if args.cert else None
 
@@ -2727,6 +3118,15 @@ async def main(args: argparse.Namespace):
                                                  'No password' if not ctx.password else 'Password: %s' % ctx.password))
 
     await ctx.server
+    if args.metrics_port or args.metrics_file:
+        import ServerMetrics
+        ctx.metrics = ServerMetrics.ServerMetrics()
+        async_start(ServerMetrics.monitor_loop_lag(ctx), "monitor_loop_lag")
+        if args.metrics_port:
+            await ServerMetrics.serve_prometheus(ctx, "127.0.0.1", args.metrics_port)
+            logging.info(f"Serving metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+        if args.metrics_file:
+            async_start(ServerMetrics.dump_json_regularly(ctx, args.metrics_file), "dump_metrics")
     console_task = asyncio.create_task(console(ctx))
     if ctx.auto_shutdown:
         ctx.shutdown_task = asyncio.create_task(auto_shutdown(ctx, [console_task]))
@@ -5,6 +5,7 @@ import typing
 import enum
 import warnings
 from json import JSONEncoder, JSONDecoder
+from json.encoder import encode_basestring
 
 if typing.TYPE_CHECKING:
     from websockets import WebSocketServerProtocol as ServerConnection
@@ -95,7 +96,12 @@ class NetworkItem(typing.NamedTuple):
     flags: int = 0
 
 
+_scalar_types = frozenset((str, int, bool, float, type(None)))
+
+
 def _scan_for_TypedTuples(obj: typing.Any) -> typing.Any:
+    if type(obj) in _scalar_types:  # most common by far, checked first to speed up scanning large messages
+        return obj
     if isinstance(obj, tuple) and hasattr(obj, "_fields"):  # NamedTuple is not actually a parent class
         data = obj._asdict()
         data["class"] = obj.__class__.__name__
@@ -135,7 +141,39 @@ _encode = JSONEncoder(
 ).encode
 
 
+def _encode_network_items(items: typing.Iterable[NetworkItem]) -> str:
+    """Pure python implementation of _speedups.encode_network_items."""
+    parts: typing.List[str] = []
+    for item, location, player, flags in items:
+        # bool and enums are ints too, but are encoded differently
+        if type(item) is not int or type(location) is not int or type(player) is not int or type(flags) is not int:
+            raise TypeError("NetworkItem fields have to be int")
+        parts.append(f'{{"item":{item},"location":{location},"player":{player},"flags":{flags},'
+                     f'"class":"NetworkItem"}}')
+    return "[" + ",".join(parts) + "]"
+
+
+# messages the server sends in bulk and their NetworkItem list, which is worth encoding without building dicts
+_network_item_list_keys = {"ReceivedItems": "items", "LocationInfo": "locations"}
+
+
+def _encode_msg(msg: typing.Any) -> str:
+    items_key = _network_item_list_keys.get(msg.get("cmd")) if type(msg) is dict else None
+    items = msg.get(items_key) if items_key else None
+    if (type(items) is list or type(items) is tuple) and all(type(item) is NetworkItem for item in items) \
+            and all(type(key) is str for key in msg):
+        try:
+            return "{" + ",".join([f"{encode_basestring(key)}:"
+                                   f"{encode_network_items(value) if key == items_key else encode(value)}"
+                                   for key, value in msg.items()]) + "}"
+        except (TypeError, OverflowError):
+            pass  # not a plain NetworkItem, use the generic encoder
+    return _encode(_scan_for_TypedTuples(msg))
+
+
 def encode(obj: typing.Any) -> str:
+    if type(obj) is list and any(type(msg) is dict and msg.get("cmd") in _network_item_list_keys for msg in obj):
+        return "[" + ",".join([_encode_msg(msg) for msg in obj]) + "]"
     return _encode(_scan_for_TypedTuples(obj))
 
 
@@ -512,9 +550,10 @@ class MultiData(typing.TypedDict):
 
 if typing.TYPE_CHECKING:  # type-check with pure python implementation until we have a typing stub
     LocationStore = _LocationStore
+    encode_network_items = _encode_network_items
 else:
     try:
-        from _speedups import LocationStore
+        from _speedups import LocationStore, encode_network_items
         import _speedups
         import os.path
         if os.path.isfile("_speedups.pyx") and os.path.getctime(_speedups.__file__) < os.path.getctime("_speedups.pyx"):
@@ -527,8 +566,9 @@ else:
         except ImportError:
             pyximport = None
         try:
-            from _speedups import LocationStore
+            from _speedups import LocationStore, encode_network_items
         except ImportError:
             warnings.warn("_speedups not available. Falling back to pure python LocationStore. "
                           "Install a matching C++ compiler for your platform to compile _speedups.")
             LocationStore = _LocationStore
+            encode_network_items = _encode_network_items
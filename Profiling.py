@@ -0,0 +1,242 @@
+"""
+Profiling of generation, enabled by Generate.py's --profile and --profile_flamegraph.
+
+While a GenerationProfile is active, Main marks the phases of generation, worlds.AutoWorld reports the time of every
+stage call and the profile counts CollectionState copies and sweeps and times the access rules of all locations and
+entrances. Nothing is measured while no profile is active.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import Utils
+
+if TYPE_CHECKING:
+    from BaseClasses import CollectionRule, CollectionState, MultiWorld
+
+__all__ = ["GenerationProfile", "start", "stop", "get_active", "phase", "instrument_rules"]
+
+_active: Optional[GenerationProfile] = None
+
+
+class _RuleStats:
+    __slots__ = ("spots", "calls", "time")
+
+    spots: int
+    calls: int
+    time: float
+
+    def __init__(self) -> None:
+        self.spots = 0
+        self.calls = 0
+        self.time = 0.0
+
+
+def _describe_rule(rule: Callable[..., Any]) -> str:
+    """Names a rule by the code it runs, so the lambdas of all locations sharing one rule are counted together."""
+    code = getattr(rule, "__code__", None)
+    if code is None:
+        rule_type = type(rule)
+        return f"{rule_type.__module__}.{rule_type.__qualname__}"
+    file_name = os.path.relpath(code.co_filename, Utils.local_path())
+    return f"{file_name}:{code.co_firstlineno} ({getattr(rule, '__qualname__', code.co_name)})"
+
+
+class GenerationProfile:
+    """Timings and counters of one generation, see the module docstring."""
+    phases: Dict[str, float]
+    """Time spent in each phase of generation, in the order they were entered."""
+    player_stages: Dict[int, Dict[str, float]]
+    """Time spent in each stage method of each player's world."""
+    class_stages: Dict[str, Dict[str, float]]
+    """Time spent in each stage_ class method of each game."""
+    state_counts: Dict[str, typing.Counter[str]]
+    """Counts of CollectionState copies and sweeps per phase."""
+    rule_stats: Dict[str, _RuleStats]
+    stacks: typing.Counter[Tuple[str, str, str]]
+    """Time per collapsed stack of phase, stage and world, for flamegraphs."""
+
+    _phase: str
+    _phase_start: float
+    _lock: threading.Lock
+    _patched_state_methods: Dict[str, Tuple[Callable[..., Any], Callable[..., Any]]]
+    """Original and counting method of each patched CollectionState method."""
+    _instrumented_spots: List[Tuple[Any, CollectionRule, CollectionRule]]
+    """Each instrumented spot with its original and timed rule."""
+
+    def __init__(self) -> None:
+        self.phases = {}
+        self.player_stages = defaultdict(dict)
+        self.class_stages = defaultdict(dict)
+        self.state_counts = defaultdict(Counter)
+        self.rule_stats = defaultdict(_RuleStats)
+        self.stacks = Counter()
+        self._phase = "setup"
+        self._phase_start = time.perf_counter()
+        self._lock = threading.Lock()
+        self._patched_state_methods = {}
+        self._instrumented_spots = []
+
+    def enter_phase(self, name: str) -> None:
+        """Ends the current phase and starts the named one."""
+        now = time.perf_counter()
+        self.phases[self._phase] = self.phases.get(self._phase, 0.0) + now - self._phase_start
+        self._phase = name
+        self._phase_start = now
+
+    def record_call(self, method: Callable[..., Any], taken: float, multiworld: Optional[MultiWorld] = None,
+                    player: Optional[int] = None) -> None:
+        """Records the time a world's stage method took. Without player, the method is a stage_ class method."""
+        name = getattr(method, "__name__", str(method))
+        with self._lock:
+            if player and multiworld:
+                stages = self.player_stages[player]
+                world = f"{multiworld.player_name[player]} ({multiworld.game[player]})"
+            else:
+                world_type = getattr(method, "__self__", None)
+                world = getattr(world_type, "game", None) or getattr(world_type, "__name__", "Unknown")
+                stages = self.class_stages[world]
+            stages[name] = stages.get(name, 0.0) + taken
+            self.stacks[self._phase, name, world] += taken
+
+    def instrument_state(self) -> None:
+        """Counts CollectionState copies and sweeps until uninstrument is called."""
+        from BaseClasses import CollectionState
+
+        for method_name, counter_name in (("copy", "copies"), ("sweep_for_advancements", "sweeps")):
+            method = getattr(CollectionState, method_name)
+
+            def counted(state: CollectionState, *args: Any, _method: Callable[..., Any] = method,
+                        _counter_name: str = counter_name, **kwargs: Any) -> Any:
+                self.state_counts[self._phase][_counter_name] += 1
+                return _method(state, *args, **kwargs)
+
+            setattr(CollectionState, method_name, counted)
+            self._patched_state_methods[method_name] = method, counted
+
+    def instrument_rules(self, multiworld: MultiWorld) -> None:
+        """Times the access rules of all locations and entrances of multiworld until uninstrument is called."""
+        for region in multiworld.get_regions():
+            for spot in (*region.locations, *region.exits):
+                rule = spot.access_rule
+                stats = self.rule_stats[_describe_rule(rule)]
+                stats.spots += 1
+                spot.access_rule = self._timed_rule(rule, stats)
+                self._instrumented_spots.append((spot, rule, spot.access_rule))
+
+    @staticmethod
+    def _timed_rule(rule: CollectionRule, stats: _RuleStats) -> CollectionRule:
+        def timed_rule(state: CollectionState) -> bool:
+            start = time.perf_counter()
+            try:
+                return rule(state)
+            finally:
+                stats.calls += 1
+                stats.time += time.perf_counter() - start
+
+        return timed_rule
+
+    def uninstrument(self) -> None:
+        """
+        Restores everything instrumented, keeping the numbers gathered so far.
+        Anything replaced since it was instrumented is left as is, as the replacement may still wrap the instrumented
+        version, for example a rule combined with add_rule.
+        """
+        from BaseClasses import CollectionState
+
+        for method_name, (method, counted) in self._patched_state_methods.items():
+            if CollectionState.__dict__.get(method_name) is counted:
+                setattr(CollectionState, method_name, method)
+        self._patched_state_methods.clear()
+        for spot, rule, timed_rule in self._instrumented_spots:
+            if spot.access_rule is timed_rule:
+                spot.access_rule = rule
+        self._instrumented_spots.clear()
+
+    def report(self, multiworld: Optional[MultiWorld] = None, rule_count: int = 100) -> Dict[str, Any]:
+        """Returns the profile as json-compatible data, including the rule_count slowest access rules."""
+        rules = sorted(self.rule_stats.items(), key=lambda item: item[1].time, reverse=True)[:rule_count]
+        players: Dict[str, Dict[str, Any]] = {}
+        for player, stages in sorted(self.player_stages.items()):
+            players[str(player)] = {
+                "name": multiworld.player_name[player] if multiworld else None,
+                "game": multiworld.game[player] if multiworld else None,
+                "total": sum(stages.values()),
+                "stages": stages,
+            }
+        return {
+            "seed": multiworld.seed_name if multiworld else None,
+            "total": sum(self.phases.values()),
+            "phases": self.phases,
+            "players": players,
+            "class_stages": self.class_stages,
+            "collection_state": {phase_name: dict(counts) for phase_name, counts in self.state_counts.items()},
+            "access_rules": [{"rule": name, "spots": stats.spots, "calls": stats.calls, "time": stats.time}
+                             for name, stats in rules],
+        }
+
+    def collapsed_stacks(self) -> List[str]:
+        """Returns the profile as lines of collapsed stacks in microseconds, as read by flamegraph tools."""
+        lines: List[str] = []
+        phase_calls: typing.Counter[str] = Counter()
+        for (phase_name, stage, world), taken in self.stacks.items():
+            phase_calls[phase_name] += taken
+            lines.append(f"{phase_name};{stage};{world.replace(';', ',')} {round(taken * 1_000_000)}")
+        for phase_name, taken in self.phases.items():
+            # output runs in threads, so the stage calls of a phase can add up to more than the phase itself
+            self_time = max(0.0, taken - phase_calls[phase_name])
+            lines.append(f"{phase_name} {round(self_time * 1_000_000)}")
+        return lines
+
+    def write(self, report_path: Optional[str], flamegraph_path: Optional[str],
+              multiworld: Optional[MultiWorld] = None) -> None:
+        if report_path:
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(self.report(multiworld), f, indent=2)
+            logging.info(f"Wrote generation profile to {report_path}")
+        if flamegraph_path:
+            with open(flamegraph_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(self.collapsed_stacks()) + "\n")
+            logging.info(f"Wrote generation flamegraph stacks to {flamegraph_path}")
+
+
+def start() -> GenerationProfile:
+    """Starts profiling generation with a new GenerationProfile, which also counts CollectionState operations."""
+    global _active
+    assert _active is None, "a generation profile is already active"
+    _active = GenerationProfile()
+    _active.instrument_state()
+    return _active
+
+
+def stop() -> Optional[GenerationProfile]:
+    """Ends the current phase and profiling, returning the profile that was active."""
+    global _active
+    profile, _active = _active, None
+    if profile:
+        profile.enter_phase("done")
+        profile.uninstrument()
+    return profile
+
+
+def get_active() -> Optional[GenerationProfile]:
+    return _active
+
+
+def phase(name: str) -> None:
+    """Starts the named phase of generation in the active profile, if any."""
+    if _active:
+        _active.enter_phase(name)
+
+
+def instrument_rules(multiworld: MultiWorld) -> None:
+    """Starts timing the access rules of multiworld in the active profile, if any."""
+    if _active:
+        _active.instrument_rules(multiworld)
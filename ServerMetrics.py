@@ -0,0 +1,256 @@
+"""
+Performance metrics of MultiServer, enabled by its --metrics_port and --metrics_file or WebHost's ROOM_METRICS_INTERVAL.
+
+While a Context has ServerMetrics, it records the latency of every client command, the recipients and size of every
+message sent, the duration and size of saves and the lag of the event loop. Reports add the current size of the
+game state, as json or in the Prometheus text format. Nothing is measured while a Context has no metrics.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from MultiServer import Context
+
+__all__ = ["Histogram", "ServerMetrics", "monitor_loop_lag", "serve_prometheus", "dump_json_regularly"]
+
+latency_buckets: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+recipient_buckets: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+max_commands = 50
+
+
+class Histogram:
+    """Counts observations per upper bound of buckets, like a Prometheus histogram."""
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    buckets: Tuple[float, ...]
+    counts: List[int]
+    """Observations per bucket, not cumulative. The last entry counts observations above all buckets."""
+    count: int
+    sum: float
+    max: float
+
+    def __init__(self, buckets: Tuple[float, ...] = latency_buckets) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Returns the number of observations up to each bound, ending with all of them at +Inf."""
+        result: List[Tuple[str, int]] = []
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            result.append((str(bound), total))
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum, "max": self.max, "buckets": dict(self.cumulative_counts())}
+
+
+class ServerMetrics:
+    """Metrics of one Context, see the module docstring."""
+    commands: Dict[str, Histogram]
+    """Time taken to process each command received from clients, by cmd."""
+    recipients: Histogram
+    """Number of clients each message was sent to."""
+    encoded_characters: int
+    """Characters of all encoded messages, counting messages sent to multiple clients once."""
+    sent_characters: int
+    """Characters of all messages sent, counting messages once per client they were sent to."""
+    saves: Dict[str, Histogram]
+    """Time taken by snapshot and journal saves."""
+    last_save_sizes: Dict[str, int]
+    """Bytes written by the last snapshot and journal save."""
+    loop_lag: Histogram
+    """How much later than scheduled the event loop woke up monitor_loop_lag."""
+    started: float
+
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        self.commands = {}
+        self.recipients = Histogram(recipient_buckets)
+        self.encoded_characters = 0
+        self.sent_characters = 0
+        self.saves = {}
+        self.last_save_sizes = {}
+        self.loop_lag = Histogram()
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record_command(self, cmd: typing.Any, taken: float) -> None:
+        # clients choose cmd, so limit how many metrics they can create
+        if not isinstance(cmd, str):
+            cmd = "Other"
+        histogram = self.commands.get(cmd)
+        if histogram is None:
+            if len(self.commands) >= max_commands:
+                cmd = "Other"
+            histogram = self.commands.setdefault(cmd, Histogram())
+        histogram.observe(taken)
+
+    def record_send(self, recipients: int, characters: int) -> None:
+        self.recipients.observe(recipients)
+        self.encoded_characters += characters
+        self.sent_characters += characters * recipients
+
+    def record_save(self, kind: str, taken: float, size: int) -> None:
+        """Records a save of kind "snapshot" or "journal". Saves can happen in the auto saver thread."""
+        with self._lock:
+            histogram = self.saves.get(kind)
+            if histogram is None:
+                histogram = self.saves[kind] = Histogram()
+            histogram.observe(taken)
+            self.last_save_sizes[kind] = size
+
+    @staticmethod
+    def get_state_sizes(ctx: Context) -> Dict[str, int]:
+        """Returns the current size of the parts of ctx's game state that grow during a game."""
+        sizes = {
+            "endpoints": len(ctx.endpoints),
+            "clients": sum(len(clients) for team in ctx.clients.values() for clients in team.values()),
+            "hints": len(ctx.location_hints),
+            "hint_entries": sum(len(hints) for hints in ctx.hints.values()),
+            "stored_data_keys": len(ctx.stored_data),
+            "received_items": sum(len(items) for items in ctx.received_items.values()),
+            "location_checks": sum(len(checks) for checks in ctx.location_checks.values()),
+        }
+        # only implemented by _speedups, and there are no locations before ctx is loaded
+        get_size = getattr(getattr(ctx, "locations", None), "get_size", None)
+        if get_size:
+            sizes["location_store_bytes"] = get_size()
+        return sizes
+
+    def report(self, ctx: Context) -> Dict[str, Any]:
+        """Returns all metrics and the current state sizes of ctx as json compatible dict."""
+        with self._lock:
+            saves = {kind: dict(histogram.report(), last_size=self.last_save_sizes[kind])
+                     for kind, histogram in self.saves.items()}
+        return {
+            "uptime": time.time() - self.started,
+            "commands": {cmd: histogram.report() for cmd, histogram in self.commands.items()},
+            "sends": {
+                "recipients": self.recipients.report(),
+                "encoded_characters": self.encoded_characters,
+                "sent_characters": self.sent_characters,
+            },
+            "saves": saves,
+            "event_loop_lag": self.loop_lag.report(),
+            "state": self.get_state_sizes(ctx),
+        }
+
+    def prometheus(self, ctx: Context) -> str:
+        """Returns all metrics and the current state sizes of ctx in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def histogram_lines(name: str, description: str,
+                            histograms: Iterable[Tuple[str, Histogram]]) -> None:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in histograms:
+                separator = "," if labels else ""
+                for bound, count in histogram.cumulative_counts():
+                    lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {count}')
+                suffix = f"{{{labels}}}" if labels else ""
+                lines.append(f"{name}_sum{suffix} {histogram.sum}")
+                lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        def value_lines(name: str, metric_type: str, description: str, value: float) -> None:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.append(f"{name} {value}")
+
+        histogram_lines("archipelago_command_seconds", "Time taken to process commands received from clients.",
+                        ((f'cmd={json.dumps(cmd)}', histogram) for cmd, histogram in self.commands.items()))
+        histogram_lines("archipelago_message_recipients", "Number of clients each message was sent to.",
+                        (("", self.recipients),))
+        value_lines("archipelago_encoded_characters_total", "counter",
+                    "Characters of encoded messages, counting messages sent to multiple clients once.",
+                    self.encoded_characters)
+        value_lines("archipelago_sent_characters_total", "counter",
+                    "Characters of messages sent, counting messages once per recipient.", self.sent_characters)
+        with self._lock:
+            saves = list(self.saves.items())
+            last_save_sizes = dict(self.last_save_sizes)
+        histogram_lines("archipelago_save_seconds", "Time taken by saves.",
+                        ((f'kind="{kind}"', histogram) for kind, histogram in saves))
+        lines.append("# HELP archipelago_last_save_bytes Bytes written by the last save.")
+        lines.append("# TYPE archipelago_last_save_bytes gauge")
+        for kind, size in last_save_sizes.items():
+            lines.append(f'archipelago_last_save_bytes{{kind="{kind}"}} {size}')
+        histogram_lines("archipelago_event_loop_lag_seconds", "How much later than scheduled the event loop woke up.",
+                        (("", self.loop_lag),))
+        for name, size in self.get_state_sizes(ctx).items():
+            value_lines(f"archipelago_{name}", "gauge", f"Current number of {name.replace('_', ' ')}.", size)
+        value_lines("archipelago_uptime_seconds", "gauge", "Seconds since metrics were enabled.",
+                    time.time() - self.started)
+        return "\n".join(lines) + "\n"
+
+
+async def monitor_loop_lag(ctx: Context, interval: float = 1.0) -> None:
+    """Records the lag of the event loop into ctx.metrics every interval seconds until ctx exits."""
+    while not ctx.exit_event.is_set():
+        start = time.perf_counter()
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(ctx.exit_event.wait(), interval)
+        if ctx.metrics:
+            ctx.metrics.loop_lag.observe(max(0.0, time.perf_counter() - start - interval))
+
+
+async def serve_prometheus(ctx: Context, host: str, port: int) -> asyncio.AbstractServer:
+    """Serves ctx.metrics in the Prometheus text format over http on host and port, to any request path."""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            await reader.readuntil(b"\r\n\r\n")  # ignore the request, there is only one thing to get
+            body = ctx.metrics.prometheus(ctx).encode() if ctx.metrics else b""
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+                         b"Connection: close\r\n\r\n" + body)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def dump_json_regularly(ctx: Context, path: str, interval: float = 60.0) -> None:
+    """Writes the json report of ctx.metrics to path every interval seconds and once more when ctx exits."""
+    while True:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(ctx.exit_event.wait(), interval)
+        if ctx.metrics:
+            try:
+                temp_path = path + ".tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(ctx.metrics.report(ctx), f, indent=2)
+                os.replace(temp_path, path)  # readers never see a partial report
+            except OSError as e:
+                logging.getLogger("ServerMetrics").warning(f"Could not write metrics to {path}: {e}")
+        if ctx.exit_event.is_set():
+            break
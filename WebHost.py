@@ -52,6 +52,8 @@ def get_app() -> "Flask":
     cache.init_app(app)
     db.bind(**app.config["PONY"])
     db.generate_mapping(create_tables=True)
+    from WebHostLib.stats import backfill_games_played
+    backfill_games_played()
     return app
 
 
@@ -40,6 +40,10 @@ app.config["HOSTERS"] = 8  # maximum concurrent room hosters
 app.config["SELFLAUNCH"] = True  # application process is in charge of launching Rooms.
 app.config["SELFLAUNCHCERT"] = None  # can point to a SSL Certificate to encrypt Room websocket connections
 app.config["SELFLAUNCHKEY"] = None  # can point to a SSL Certificate Key to encrypt Room websocket connections
+# seconds between writing the performance metrics of each room to logs/<room id>.metrics.json, 0 to disable
+app.config["ROOM_METRICS_INTERVAL"] = 0
+# seconds between publishing the tracker changes of each hosted room to /api/tracker/<tracker>/events, 0 to disable
+app.config["TRACKER_EVENT_INTERVAL"] = 0
 app.config["SELFGEN"] = True  # application process is in charge of scheduling Generations.
 # at what amount of worlds should scheduling be used, instead of rolling in the web-thread
 app.config["JOB_THRESHOLD"] = 1
@@ -59,6 +63,10 @@ app.config["PONY"] = {
 }
 app.config["MAX_ROLL"] = 20
 app.config["CACHE_TYPE"] = "SimpleCache"
+# decompressed multidata bytes of decoded seeds to keep in memory for trackers, decoded they take about five times that
+app.config["TRACKER_SEED_CACHE_SIZE"] = 128 * 1024 * 1024
+# number of decoded data packages to keep in memory for trackers
+app.config["TRACKER_GAME_CACHE_SIZE"] = 512
 app.config["HOST_ADDRESS"] = ""
 app.config["ASSET_RIGHTS"] = False
 
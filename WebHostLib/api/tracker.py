@@ -1,14 +1,17 @@
+import hashlib
+import json
 from datetime import datetime, timezone
 from typing import Any, TypedDict
 from uuid import UUID
 
-from flask import abort
+from flask import Response, abort, current_app, jsonify, make_response, request
+from pony.orm import select
 
 from NetUtils import ClientStatus, Hint, NetworkItem, SlotType
 from WebHostLib import cache
 from WebHostLib.api import api_endpoints
-from WebHostLib.models import Room
-from WebHostLib.tracker import TrackerData
+from WebHostLib.models import Room, TrackerEvent
+from WebHostLib.tracker import TrackerData, game_tables_cache, seed_data_cache
 
 
 class PlayerAlias(TypedDict):
@@ -64,20 +67,54 @@ class PlayerGame(TypedDict):
     game: str
 
 
+def get_tracker_version(room: Room) -> str:
+    """Returns an identifier of the room's current save, which changes whenever the saved state changes."""
+    # hashes the save itself, as the save on shutdown doesn't update last_activity
+    return hashlib.sha1(room.multisave or b"").hexdigest()
+
+
+def not_modified(version: str) -> Response | None:
+    """Returns a 304 response if the request's If-None-Match contains version."""
+    if request.if_none_match.contains(version):
+        response = make_response("", 304)
+        response.set_etag(version)
+        return response
+    return None
+
+
 @api_endpoints.route("/tracker/<suuid:tracker>")
-@cache.memoize(timeout=60)
-def tracker_data(tracker: UUID) -> dict[str, Any]:
+def tracker_data(tracker: UUID) -> Response:
     """
     Outputs json data to <root_path>/api/tracker/<id of current session tracker>.
 
     :param tracker: UUID of current session tracker.
 
     :return: Tracking data for all players in the room. Typing and docstrings describe the format of each value.
+        The ETag can be passed as cursor to /tracker/<id of current session tracker>/delta.
     """
     room: Room | None = Room.get(tracker=tracker)
     if not room:
         abort(404)
+    version = get_tracker_version(room)
+    response = not_modified(version)
+    if not response:
+        response = jsonify(get_tracker_state(tracker, version))
+        response.set_etag(version)
+    return response
+
+
+tracker_snapshot_timeout = 600
+"""Seconds that cursors of /tracker/<tracker>/delta stay valid after their save was last requested."""
 
+
+def get_tracker_snapshot_key(tracker: UUID, version: str) -> str:
+    return f"tracker_snapshot_{tracker}_{version}"
+
+
+@cache.memoize(timeout=60)
+def get_tracker_state(tracker: UUID, version: str) -> dict[str, Any]:
+    """Returns the data of /tracker at version, keeping a snapshot of it for deltas to later versions."""
+    room: Room = Room.get(tracker=tracker)
     tracker_data = TrackerData(room)
 
     all_players: dict[int, list[int]] = tracker_data.get_all_players()
@@ -155,7 +192,7 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
             player_status.append(
                 {"team": team, "player": player, "status": tracker_data.get_player_client_status(team, player)})
 
-    return {
+    state = {
         "aliases": player_aliases,
         "player_items_received": player_items_received,
         "player_checks_done": player_checks_done,
@@ -165,6 +202,130 @@ def tracker_data(tracker: UUID) -> dict[str, Any]:
         "connection_timers": connection_timers,
         "player_status": player_status,
     }
+    cache.set(get_tracker_snapshot_key(tracker, version), get_tracker_snapshot(state), tracker_snapshot_timeout)
+    return state
+
+
+def get_tracker_snapshot(state: dict[str, Any]) -> dict[str, dict[tuple[int, int | None], Any]]:
+    """Returns what get_tracker_delta needs of a state, by key and then team and player of each entry."""
+    snapshot: dict[str, dict[tuple[int, int | None], Any]] = {}
+    for key, entries in state.items():
+        key_snapshot = snapshot[key] = {}
+        for entry in entries:
+            if key == "player_items_received":
+                value = len(entry["items"])  # items are only ever appended
+            elif key == "player_checks_done":
+                value = frozenset(entry["locations"])
+            else:
+                value = entry
+            key_snapshot[entry["team"], entry.get("player")] = value
+    return snapshot
+
+
+def get_tracker_delta(state: dict[str, Any], previous: dict[str, dict[tuple[int, int | None], Any]]) \
+        -> dict[str, Any]:
+    """Returns the entries of state that changed since the snapshot previous, in the format of /tracker/delta."""
+    delta: dict[str, Any] = {}
+    for key, entries in state.items():
+        previous_entries = previous.get(key, {})
+        changed: list[dict[str, Any]] = []
+        for entry in entries:
+            previous_entry = previous_entries.get((entry["team"], entry.get("player")))
+            if key == "player_items_received":
+                index = previous_entry or 0
+                if len(entry["items"]) > index:
+                    changed.append({**entry, "index": index, "items": entry["items"][index:]})
+            elif key == "player_checks_done":
+                locations = [location for location in entry["locations"] if location not in (previous_entry or ())]
+                if locations:
+                    changed.append({**entry, "locations": locations})
+            elif entry != previous_entry:
+                changed.append(entry)
+        delta[key] = changed
+    return delta
+
+
+@api_endpoints.route("/tracker/<suuid:tracker>/delta")
+def tracker_delta(tracker: UUID) -> Response:
+    """
+    Outputs json data to <root_path>/api/tracker/<id of current session tracker>/delta?cursor=<cursor>.
+
+    :param tracker: UUID of current session tracker.
+
+    :return: The tracking data of /tracker that changed since the cursor, with the cursor to pass next time.
+        Without a cursor, or if it is no longer known, returns the data of all players and full is true.
+    """
+    room: Room | None = Room.get(tracker=tracker)
+    if not room:
+        abort(404)
+    version = get_tracker_version(room)
+    response = not_modified(version)
+    if not response:
+        response = jsonify(get_tracker_delta_data(tracker, version, request.args.get("cursor")))
+        response.set_etag(version)
+    return response
+
+
+@cache.memoize(timeout=60)
+def get_tracker_delta_data(tracker: UUID, version: str, cursor: str | None) -> dict[str, Any]:
+    state = get_tracker_state(tracker, version)
+    previous = cache.get(get_tracker_snapshot_key(tracker, cursor)) if cursor else None
+    if cursor == version and previous is None:
+        previous = get_tracker_snapshot(state)  # the state's snapshot may have been evicted before the state itself
+    delta = get_tracker_delta(state, previous or {})
+    delta["cursor"] = version
+    delta["full"] = previous is None
+    return delta
+
+
+class TrackerChanges(TypedDict):
+    id: int
+    time: datetime
+    changes: dict[str, Any]
+
+
+@api_endpoints.route("/tracker/<suuid:tracker>/events")
+def tracker_events(tracker: UUID) -> dict[str, Any]:
+    """
+    Outputs json data to <root_path>/api/tracker/<id of current session tracker>/events?after=<event id>.
+    Rooms publish their changes every TRACKER_EVENT_INTERVAL seconds, which are kept for 10 minutes.
+
+    :param tracker: UUID of current session tracker.
+
+    :return: Changes of the room after the event id, in order, for clients following it instead of polling /tracker.
+        Without an event id, returns no events and the last_id to follow from.
+    """
+    if not current_app.config["TRACKER_EVENT_INTERVAL"]:
+        abort(404)
+    return get_tracker_events(tracker, request.args.get("after", type=int))
+
+
+max_tracker_events = 100
+
+
+@cache.memoize(timeout=1)
+def get_tracker_events(tracker: UUID, after: int | None) -> dict[str, Any]:
+    room: Room | None = Room.get(tracker=tracker)
+    if not room:
+        abort(404)
+
+    if after is None:
+        return {"last_id": select(event.id for event in TrackerEvent if event.room == room).max() or 0,
+                "events": [], "reset": False}
+
+    events: list[TrackerChanges] = [
+        {"id": event.id, "time": event.time.replace(tzinfo=timezone.utc), "changes": json.loads(event.data)}
+        for event in select(event for event in TrackerEvent
+                            if event.room == room and event.id > after).order_by(TrackerEvent.id)[:max_tracker_events]
+    ]
+    """Changes per event, in the format of the matching entries of /tracker, up to max_tracker_events at once.
+    player_checks_done and player_items_received only contain what is new, starting at index of all items received."""
+    return {
+        "last_id": events[-1]["id"] if events else after,
+        "events": events,
+        # events older than after were already removed, so some after it may be missing
+        "reset": bool(after) and not TrackerEvent.exists(id=after, room=room),
+    }
 
 
 class PlayerGroups(TypedDict):
@@ -256,3 +417,13 @@ def tracker_slot_data(tracker: UUID) -> list[PlayerSlotData]:
         break
 
     return slot_data
+
+
+@api_endpoints.route("/tracker_cache")
+def tracker_cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Outputs json data to <root_path>/api/tracker_cache.
+
+    :return: Size and hit metrics of this WebHost process's caches of decoded seeds and data package tables.
+    """
+    return {"seeds": seed_data_cache.stats(), "games": game_tables_cache.stats()}
@@ -3,13 +3,14 @@ from __future__ import annotations
 import json
 import logging
 import multiprocessing
+import time
 import typing
 from datetime import timedelta, datetime
 from threading import Event, Thread
 from typing import Any
 from uuid import UUID
 
-from pony.orm import db_session, select, commit, PrimaryKey
+from pony.orm import db_session, select, commit, count, PrimaryKey
 
 from Utils import restricted_loads
 from .locker import Locker, AlreadyRunningException
@@ -113,6 +114,19 @@ def cleanup():
         logging.info(f"{rooms} Rooms, {seeds} Seeds and {slots} Slots have been deleted.")
 
 
+full_scan_interval = 60
+"""Seconds between scans of all recently active rooms, in between only rooms with new activity are checked."""
+activity_margin = timedelta(seconds=5)
+"""How long before a poll activity is looked for again, as activity may be committed a while after it was set."""
+
+
+def place_room(hosters: typing.Sequence[MultiworldInstance], room_id: UUID, slots: int) -> None:
+    """Starts the room on the least loaded hoster, unless a hoster is already hosting it."""
+    if any(hoster.is_hosting(room_id) for hoster in hosters):
+        return
+    min(hosters, key=MultiworldInstance.get_placement_key).start_room(room_id, slots)
+
+
 def autohost(config: dict):
     def keep_running():
         stop_event = _stop_event
@@ -125,15 +139,26 @@ def autohost(config: dict):
                     hosters.append(hoster)
                     hoster.start()
 
+                last_full_scan = float("-inf")
+                last_poll = datetime.utcnow()
                 while not stop_event.wait(0.1):
+                    now = datetime.utcnow()
+                    if time.monotonic() - last_full_scan >= full_scan_interval:
+                        last_full_scan = time.monotonic()
+                        since = now - timedelta(days=3)
+                    else:
+                        since = last_poll - activity_margin
+                    last_poll = now
                     with db_session:
-                        rooms = select(
-                            room for room in Room if
-                            room.last_activity >= datetime.utcnow() - timedelta(days=3))
-                        for room in rooms:
-                            # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
-                            if room.last_activity >= datetime.utcnow() - timedelta(seconds=room.timeout + 5):
-                                hosters[room.id.int % len(hosters)].start_room(room.id)
+                        # last_activity is indexed, so this only reads rooms with new activity between full scans
+                        rooms = select(room for room in Room if room.last_activity >= since)
+                        # we have to filter twice, as the per-room timeout can't currently be PonyORM transpiled.
+                        to_start = [(count(room.seed.slots), room.id) for room in rooms
+                                    if room.last_activity >= now - timedelta(seconds=room.timeout + 5)
+                                    and not any(hoster.is_hosting(room.id) for hoster in hosters)]
+                    # largest rooms first, which spreads them over all hosters when starting up
+                    for slots, room_id in sorted(to_start, key=lambda room: room[0], reverse=True):
+                        place_room(hosters, room_id, slots)
 
         except AlreadyRunningException:
             logging.info("Autohost reports as already running, not starting another.")
@@ -179,14 +204,34 @@ def autogen(config: dict):
     Thread(target=keep_running, name="AP_Autogen").start()
 
 
+class HosterLoad(typing.NamedTuple):
+    """Load of a hoster process, as reported by it every few seconds."""
+    rooms: float
+    clients: float
+    extra_clients: float
+    """Clients beyond the slot count of their room, summed over the rooms."""
+    loop_lag: float
+    """Seconds the event loop woke up later than scheduled."""
+    rss: float
+    """Resident memory in bytes, 0 if unknown."""
+
+
+lagging_threshold = 0.1
+"""Event loop lag in seconds above which a hoster only gets new rooms if all others lag too."""
+
+
 class MultiworldInstance():
     def __init__(self, config: dict, id: int):
-        self.room_ids = set()
+        self.room_slots: dict[UUID, int] = {}
+        """Slot count of each room this hoster was asked to host."""
+        self.load_report = multiprocessing.Array("d", len(HosterLoad._fields))
         self.process: typing.Optional[multiprocessing.Process] = None
         self.ponyconfig = config["PONY"]
         self.cert = config["SELFLAUNCHCERT"]
         self.key = config["SELFLAUNCHKEY"]
         self.host = config["HOST_ADDRESS"]
+        self.metrics_interval = config["ROOM_METRICS_INTERVAL"]
+        self.tracker_event_interval = config["TRACKER_EVENT_INTERVAL"]
         self.rooms_to_start = multiprocessing.Queue()
         self.rooms_shutting_down = multiprocessing.Queue()
         self.name = f"MultiHoster{id}"
@@ -198,18 +243,35 @@ class MultiworldInstance():
         process = multiprocessing.Process(group=None, target=run_server_process,
                                           args=(self.name, self.ponyconfig, get_static_server_data(),
                                                 self.cert, self.key, self.host,
-                                                self.rooms_to_start, self.rooms_shutting_down),
+                                                self.rooms_to_start, self.rooms_shutting_down,
+                                                self.metrics_interval, self.tracker_event_interval,
+                                                self.load_report),
                                           name=self.name)
         process.start()
         self.process = process
 
-    def start_room(self, room_id):
+    def _collect_shut_down_rooms(self):
         while not self.rooms_shutting_down.empty():
-            self.room_ids.remove(self.rooms_shutting_down.get(block=True, timeout=None))
-        if room_id in self.room_ids:
+            del self.room_slots[self.rooms_shutting_down.get(block=True, timeout=None)]
+
+    def is_hosting(self, room_id: UUID) -> bool:
+        self._collect_shut_down_rooms()
+        return room_id in self.room_slots
+
+    def get_load(self) -> HosterLoad:
+        return HosterLoad(*self.load_report[:])
+
+    def get_placement_key(self) -> tuple[bool, float, float]:
+        """Sorts less loaded hosters first: not lagging, then fewer slots or clients of hosted rooms, then memory."""
+        load = self.get_load()
+        # each room counts max(slots, clients), so rooms count before their players connect and busy rooms count more
+        return load.loop_lag > lagging_threshold, sum(self.room_slots.values()) + load.extra_clients, load.rss
+
+    def start_room(self, room_id, slots: int = 0):
+        if self.is_hosting(room_id):
             pass  # should already be hosted currently.
         else:
-            self.room_ids.add(room_id)
+            self.room_slots[room_id] = slots
             self.rooms_to_start.put(room_id)
 
     def stop(self):
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import asyncio
 import collections
+import contextlib
 import datetime
 import functools
+import json
 import logging
 import multiprocessing
+import os
 import pickle
 import random
 import socket
@@ -17,6 +20,7 @@ import sys
 import websockets
 from pony.orm import commit, db_session, select
 
+import ServerMetrics
 import Utils
 
 from MultiServer import (
@@ -25,7 +29,11 @@ from MultiServer import (
 )
 from Utils import restricted_loads, cache_argsless
 from .locker import Locker
-from .models import Command, GameDataPackage, Room, db
+from NetUtils import NetworkItem
+from .models import Command, GameDataPackage, Room, TrackerEvent, db
+
+tracker_event_retention = datetime.timedelta(minutes=10)
+"""How long tracker events are kept for /api/tracker/<tracker>/events."""
 
 
 class CustomClientMessageProcessor(ClientMessageProcessor):
@@ -74,6 +82,13 @@ class WebHostContext(Context):
         self.main_loop = asyncio.get_running_loop()
         self.video = {}
         self.tags = ["AP", "WebHost"]
+        # tracker changes since the last published tracker event, see publish_tracker_events
+        self.tracker_event_interval: float = 0
+        self.tracker_checks: typing.Dict[typing.Tuple[int, int], typing.Set[int]] = {}
+        self.tracker_items: typing.Dict[typing.Tuple[int, int], typing.Tuple[int, typing.List[NetworkItem]]] = {}
+        self.tracker_hint_slots: typing.Set[typing.Tuple[int, int]] = set()
+        self.tracker_status_slots: typing.Set[typing.Tuple[int, int]] = set()
+        self.last_tracker_event_cleanup = 0.0
 
     def __del__(self):
         try:
@@ -108,6 +123,77 @@ class WebHostContext(Context):
                     command.delete()
                 commit()
 
+    def on_new_location_checks(self, team: int, slot: int, locations: typing.Set[int]):
+        super().on_new_location_checks(team, slot, locations)
+        if self.tracker_event_interval:
+            self.tracker_checks.setdefault((team, slot), set()).update(locations)
+
+    def on_new_received_items(self, team: int, slot: int, remote_items: bool, index: int,
+                              items: typing.List[NetworkItem]):
+        super().on_new_received_items(team, slot, remote_items, index, items)
+        # trackers show the received items including those found in the own world
+        if self.tracker_event_interval and remote_items:
+            pending = self.tracker_items.get((team, slot))
+            if pending:
+                pending[1].extend(items)
+            else:
+                self.tracker_items[team, slot] = index, list(items)
+
+    def on_changed_hints(self, team: int, slot: int):
+        super().on_changed_hints(team, slot)
+        if self.tracker_event_interval:
+            self.tracker_hint_slots.add((team, slot))
+
+    def on_client_status_change(self, team: int, slot: int):
+        super().on_client_status_change(team, slot)
+        if self.tracker_event_interval:
+            self.tracker_status_slots.add((team, slot))
+
+    def pop_tracker_event(self) -> typing.Optional[str]:
+        """Returns the json of the tracker changes since the last call, in the format of /api/tracker, or None."""
+        event: typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]] = {}
+        if self.tracker_checks:
+            # checks_done is the slot's total, so trackers can apply it no matter which checks they already show
+            event["player_checks_done"] = [{"team": team, "player": slot, "locations": sorted(locations),
+                                            "checks_done": len(self.location_checks[team, slot])}
+                                           for (team, slot), locations in self.tracker_checks.items()]
+        if self.tracker_items:
+            event["player_items_received"] = [{"team": team, "player": slot, "index": index, "items": items}
+                                              for (team, slot), (index, items) in self.tracker_items.items()]
+        if self.tracker_hint_slots:
+            event["hints"] = [{"team": team, "player": slot, "hints": sorted(self.hints[team, slot])}
+                              for team, slot in self.tracker_hint_slots]
+        if self.tracker_status_slots:
+            event["player_status"] = [{"team": team, "player": slot, "status": self.client_game_state[team, slot]}
+                                      for team, slot in self.tracker_status_slots]
+        self.tracker_checks = {}
+        self.tracker_items = {}
+        self.tracker_hint_slots = set()
+        self.tracker_status_slots = set()
+        return json.dumps(event, separators=(",", ":")) if event else None
+
+    async def publish_tracker_events(self, interval: float):
+        """Stores the tracker changes of this room as TrackerEvent every interval seconds, while any happened."""
+        self.tracker_event_interval = interval
+        while not self.exit_event.is_set():
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.exit_event.wait(), interval)
+            data = self.pop_tracker_event()
+            if data:
+                await self.main_loop.run_in_executor(None, self._store_tracker_event, data)
+
+    def _store_tracker_event(self, data: str):
+        try:
+            with db_session:
+                TrackerEvent(room=Room.get(id=self.room_id), data=data)
+                if time.monotonic() - self.last_tracker_event_cleanup > 60:
+                    self.last_tracker_event_cleanup = time.monotonic()
+                    cutoff = datetime.datetime.utcnow() - tracker_event_retention
+                    select(event for event in TrackerEvent
+                           if event.room.id == self.room_id and event.time < cutoff).delete(bulk=True)
+        except Exception as e:  # a lost tracker event is no reason to stop the room
+            self.logger.exception(e)
+
     @db_session
     def load(self, room_id: int):
         self.room_id = room_id
@@ -155,7 +241,8 @@ class WebHostContext(Context):
             self.location_name_groups = static_location_name_groups
         return self._load(multidata, game_data_packages, True)
 
-    def init_save(self, enabled: bool = True):
+    def init_save(self, enabled: bool = True, journal: bool = False):
+        # rooms always save full snapshots, journal is ignored: trackers read the game state from Room.multisave
         self.saving = enabled
         if self.saving:
             with db_session:
@@ -168,8 +255,11 @@ class WebHostContext(Context):
     @db_session
     def _save(self, exit_save: bool = False) -> bool:
         room = Room.get(id=self.room_id)
+        start = time.perf_counter()
         # Does not use Utils.restricted_dumps because we'd rather make a save than not make one
         room.multisave = pickle.dumps(self.get_save())
+        if self.metrics:
+            self.metrics.record_save("snapshot", time.perf_counter() - start, len(room.multisave))
         # saving only occurs on activity, so we can "abuse" this information to mark this as last_activity
         if not exit_save:  # we don't want to count a shutdown as activity, which would restart the server again
             room.last_activity = datetime.datetime.utcnow()
@@ -247,7 +337,9 @@ def tear_down_logging(room_id):
 
 def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                        cert_file: typing.Optional[str], cert_key_file: typing.Optional[str],
-                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue):
+                       host: str, rooms_to_run: multiprocessing.Queue, rooms_shutting_down: multiprocessing.Queue,
+                       metrics_interval: float = 0, tracker_event_interval: float = 0,
+                       load_report: typing.Optional[typing.MutableSequence[float]] = None):
     from setproctitle import setproctitle
 
     setproctitle(name)
@@ -291,14 +383,42 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     gc.collect()  # free intermediate objects used during setup
 
     loop = asyncio.get_event_loop()
+    contexts: typing.Set[WebHostContext] = set()
+
+    async def report_load(interval: float = 5.0):
+        """Writes the HosterLoad fields to load_report, for placing new rooms."""
+        try:
+            import psutil
+            process = psutil.Process()
+        except ImportError:
+            process = None
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            loop_lag = max(0.0, time.perf_counter() - start - interval)
+            clients = extra_clients = 0
+            for ctx in contexts:
+                clients += len(ctx.endpoints)
+                extra_clients += max(0, len(ctx.endpoints) - (len(ctx.slot_info) - len(ctx.groups)))
+            load_report[:] = (len(contexts), clients, extra_clients, loop_lag,
+                              process.memory_info().rss if process else 0)
 
     async def start_room(room_id):
         with Locker(f"RoomLocker {room_id}"):
             try:
                 logger = set_up_logging(room_id)
                 ctx = WebHostContext(static_server_data, logger)
+                contexts.add(ctx)
+                if metrics_interval:
+                    ctx.metrics = ServerMetrics.ServerMetrics()
+                    Utils.async_start(ServerMetrics.monitor_loop_lag(ctx), "monitor_loop_lag")
+                    Utils.async_start(ServerMetrics.dump_json_regularly(
+                        ctx, os.path.join(Utils.user_path("logs"), f"{room_id}.metrics.json"), metrics_interval),
+                        "dump_metrics")
                 ctx.load(room_id)
                 ctx.init_save()
+                if tracker_event_interval:
+                    Utils.async_start(ctx.publish_tracker_events(tracker_event_interval), "publish_tracker_events")
                 assert ctx.server is None
                 try:
                     ctx.server = websockets.serve(
@@ -356,6 +476,7 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
                     setattr(asyncio.current_task(), "save", None)
             finally:
                 try:
+                    contexts.discard(ctx)
                     ctx.save_dirty = False  # make sure the saving thread does not write to DB after final wakeup
                     ctx.exit_event.set()  # make sure the saving thread stops at some point
                     # NOTE: async saving should probably be an async task and could be merged with shutdown_task
@@ -400,6 +521,9 @@ def run_server_process(name: str, ponyconfig: dict, static_server_data: dict,
     starter = Starter()
     starter.daemon = True
     starter.start()
+    if load_report is not None:
+        # async_start keeps a reference to the task, so it can't be garbage collected, but needs a running loop
+        loop.call_soon(Utils.async_start, report_load(), "report_load")
     try:
         loop.run_forever()
     finally:
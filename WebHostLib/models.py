@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID, uuid4
 from pony.orm import Database, PrimaryKey, Required, Set, Optional, buffer, LongStr
 
@@ -24,6 +24,7 @@ class Room(db.Entity):
     creation_time = Required(datetime, default=lambda: datetime.utcnow(), index=True)  # index used by landing page
     owner = Required(UUID, index=True)
     commands = Set('Command')
+    tracker_events = Set('TrackerEvent')
     seed = Required('Seed', index=True)
     multisave = Optional(buffer, lazy=True)
     show_spoiler = Required(int, default=0)  # 0 -> never, 1 -> after completion, -> 2 always
@@ -50,6 +51,22 @@ class Command(db.Entity):
     commandtext = Required(str)
 
 
+class TrackerEvent(db.Entity):
+    id = PrimaryKey(int, auto=True)
+    room = Required(Room, index=True)
+    time = Required(datetime, default=lambda: datetime.utcnow(), index=True)
+    data = Required(LongStr)  # json of the tracker changes since the previous event of the room
+
+
+class GamesPlayed(db.Entity):
+    # rollup for the stats page, updated when rooms are created
+    day = Required(date)  # creation day of the rooms
+    game = Required(str)
+    # slots of game in those rooms. Volatile, as record_games_played increments it in SQL
+    count = Required(int, default=0, volatile=True)
+    PrimaryKey(day, game)
+
+
 class Generation(db.Entity):
     id = PrimaryKey(UUID, default=uuid4)
     owner = Required(UUID)
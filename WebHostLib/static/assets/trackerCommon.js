@@ -132,41 +132,161 @@ window.addEventListener('load', () => {
         return sleepSeconds || 60;
     }
 
+    const wrapper = document.getElementById('tracker-wrapper');
+    const events_url = wrapper.getAttribute('data-events');
+    const events_interval = parseFloat(wrapper.getAttribute('data-events-interval'));
+    // kinds of changes this page shows, but can only show by reloading it
+    const reload_on = new Set((wrapper.getAttribute('data-reload-on') || '').split(' ').filter((kind) => kind));
+    // only set on the tracker of a single player, which ignores the changes of others
+    const own_team = wrapper.hasAttribute('data-team') ? parseInt(wrapper.getAttribute('data-team')) : null;
+    const own_player = wrapper.hasAttribute('data-player') ? parseInt(wrapper.getAttribute('data-player')) : null;
+    const status_names = {0: "Disconnected", 5: "Connected", 10: "Ready", 20: "Playing", 30: "Goal Completed"};
+    // checks done by each "team/player" as last seen in events, applied again to the tables after every reload.
+    // The reloaded page is rendered from the room's last save, which may not have all of them yet.
+    const live_checks_done = new Map();
+    let last_event_id = null;
+    // the first reload covers the changes between the save this page was rendered from and the first events
+    let reload_pending = true;
+
+    // cells are changed through their data, so the columns' render functions show them like the server rendered ones
+    const setChecksDone = (team, player, checks_done) => {
+        tables.rows(`[data-team="${team}"][data-player="${player}"]`).every(function (row_index, table_index) {
+            const row = $(this.node());
+            const checks = tables.cell(row.find('td.checks')[0]);
+            if (!checks.any())
+                return;
+            // the cell has a data-sort attribute, which makes its data an object
+            const previous = parseInt(checks.data()['@data-sort']);
+            if (checks_done <= previous)
+                return;
+            const total = parseInt(row.find('td.checks').attr('data-total'));
+            checks.data({...checks.data(), display: `${checks_done}/${total}`, '@data-sort': `${checks_done}`});
+            tables.cell(row.find('td.percentage')[0]).data(total ? (checks_done / total * 100).toFixed(2) : '100.00');
+            tables.cell(row.find('td.activity')[0]).data('0');
+
+            const team_checks = $(tables.table(table_index).footer()).find('td.team-checks');
+            if (team_checks.length) {
+                const team_complete = parseInt(team_checks.attr('data-complete')) + checks_done - previous;
+                const team_total = parseInt(team_checks.attr('data-total'));
+                team_checks.attr('data-complete', team_complete).text(`${team_complete}/${team_total}`);
+                $(tables.table(table_index).footer()).find('td.team-percentage')
+                    .text(team_total ? (team_complete / team_total * 100).toFixed(2) : '100');
+            }
+        });
+    };
+
+    const setStatus = (team, player, status) => {
+        tables.rows(`[data-team="${team}"][data-player="${player}"]`).every(function (row_index, table_index) {
+            const row = $(this.node());
+            const previous = parseInt(row.attr('data-status'));
+            if (previous === status)
+                return;
+            row.attr('data-status', status);
+            tables.cell(row.find('td.status')[0]).data(status_names[status] || "Unknown State");
+
+            const completed_worlds = $(tables.table(table_index).footer()).find('td.completed-worlds');
+            if (completed_worlds.length && (previous === 30) !== (status === 30)) {
+                const completed = parseInt(completed_worlds.attr('data-completed')) + (status === 30 ? 1 : -1);
+                completed_worlds.attr('data-completed', completed)
+                    .text(`${completed}/${completed_worlds.attr('data-total')} Complete`);
+            }
+        });
+    };
+
+    const applyChanges = (changes) => {
+        for (const [kind, entries] of Object.entries(changes)) {
+            if (reload_on.has(kind) && entries.some((entry) => own_player === null ||
+                (entry.team === own_team && entry.player === own_player))) {
+                reload_pending = true;
+            }
+        }
+        for (const entry of changes.player_checks_done || []) {
+            live_checks_done.set(`${entry.team}/${entry.player}`, entry.checks_done);
+            setChecksDone(entry.team, entry.player, entry.checks_done);
+        }
+        for (const entry of changes.player_status || []) {
+            setStatus(entry.team, entry.player, entry.status);
+        }
+    };
+
+    const reload = () => {
+        const target = $("<div></div>");
+        console.log("Updating Tracker...");
+        target.load(location.href, function (response, status) {
+            if (status === "success") {
+                target.find(".table").each(function (i, new_table) {
+                    const new_trs = $(new_table).find("tbody>tr");
+                    const footer_tr = $(new_table).find("tfoot>tr");
+                    const old_table = tables.eq(i);
+                    const topscroll = $(old_table.settings()[0].nScrollBody).scrollTop();
+                    const leftscroll = $(old_table.settings()[0].nScrollBody).scrollLeft();
+                    old_table.clear();
+                    if (footer_tr.length) {
+                        $(old_table.table).find("tfoot").html(footer_tr);
+                    }
+                    old_table.rows.add(new_trs);
+                    old_table.draw();
+                    $(old_table.settings()[0].nScrollBody).scrollTop(topscroll);
+                    $(old_table.settings()[0].nScrollBody).scrollLeft(leftscroll);
+                });
+                $("#multi-stream-link").replaceWith(target.find("#multi-stream-link"));
+                if (live_checks_done.size) {
+                    live_checks_done.forEach((checks_done, slot) => {
+                        const [team, player] = slot.split('/');
+                        setChecksDone(team, player, checks_done);
+                    });
+                    tables.draw(false);
+                }
+            } else {
+                console.log("Failed to connect to Server, in order to update Table Data.");
+                console.log(response);
+            }
+        });
+    };
+
+    // follows the room's events more often than it saves, applying what it can to the tables in place
+    const followEvents = () => {
+        if (document.hidden) {
+            setTimeout(followEvents, events_interval * 1000);
+            return;
+        }
+        fetch(last_event_id === null ? events_url : `${events_url}?after=${last_event_id}`)
+            .then((response) => response.ok ? response.json() : Promise.reject(response))
+            .then((data) => {
+                if (data.reset) {
+                    reload_pending = true;
+                }
+                last_event_id = data.last_id;
+                data.events.forEach((event) => applyChanges(event.changes));
+                if (data.events.length) {
+                    tables.draw(false);
+                }
+            })
+            .catch(() => {
+                last_event_id = null;
+                reload_pending = true;
+            })
+            .finally(() => setTimeout(followEvents, events_interval * 1000));
+    };
+    if (events_url) {
+        followEvents();
+    }
+
     let update_on_view = false;
     const update = () => {
         if (document.hidden) {
             console.log("Document reporting as not visible, not updating Tracker...");
             update_on_view = true;
+        } else if (!events_url || reload_pending) {
+            update_on_view = false;
+            reload_pending = false;
+            reload();
         } else {
             update_on_view = false;
-            const target = $("<div></div>");
-            console.log("Updating Tracker...");
-            target.load(location.href, function (response, status) {
-                if (status === "success") {
-                    target.find(".table").each(function (i, new_table) {
-                        const new_trs = $(new_table).find("tbody>tr");
-                        const footer_tr = $(new_table).find("tfoot>tr");
-                        const old_table = tables.eq(i);
-                        const topscroll = $(old_table.settings()[0].nScrollBody).scrollTop();
-                        const leftscroll = $(old_table.settings()[0].nScrollBody).scrollLeft();
-                        old_table.clear();
-                        if (footer_tr.length) {
-                            $(old_table.table).find("tfoot").html(footer_tr);
-                        }
-                        old_table.rows.add(new_trs);
-                        old_table.draw();
-                        $(old_table.settings()[0].nScrollBody).scrollTop(topscroll);
-                        $(old_table.settings()[0].nScrollBody).scrollLeft(leftscroll);
-                    });
-                    $("#multi-stream-link").replaceWith(target.find("#multi-stream-link"));
-                } else {
-                    console.log("Failed to connect to Server, in order to update Table Data.");
-                    console.log(response);
-                }
-            })
+            console.log("Room changes were applied from its events, not reloading Tracker...");
         }
         updater = setTimeout(update, getSleepTimeSeconds() * 1000);
-    }
+    };
     let updater = setTimeout(update, getSleepTimeSeconds() * 1000);
 
     window.addEventListener('resize', () => {
@@ -1,3 +1,4 @@
+import logging
 from collections import Counter, defaultdict
 from colorsys import hsv_to_rgb
 from datetime import datetime, timedelta, date
@@ -9,27 +10,78 @@ from bokeh.models import HoverTool
 from bokeh.plotting import figure, ColumnDataSource
 from bokeh.resources import INLINE
 from flask import render_template
-from pony.orm import select
+from pony.orm import TransactionIntegrityError, commit, db_session, rollback, select
 
 from . import app, cache
-from .models import Room
+from .models import GamesPlayed, Room, db
 
 PLOT_WIDTH = 600
+STATS_DAYS = 30
+
+
+def record_games_played(room: Room, attempts: int = 3) -> None:
+    """
+    Adds the games of a newly created room to the GamesPlayed rollup, in a transaction of its own.
+    The room has to be committed already, as failing to count its games is only logged, not raised.
+    """
+    room_id, day = room.id, room.creation_time.date()
+    played = Counter(slot.game for slot in room.seed.slots)
+    quote_name = db.provider.quote_name
+    table = quote_name(GamesPlayed._table_)
+    day_column, game_column, count_column = (quote_name(attr.column)
+                                             for attr in (GamesPlayed.day, GamesPlayed.game, GamesPlayed.count))
+    for _ in range(attempts):
+        try:
+            for game, game_count in played.items():
+                # incremented by the database, so concurrently created rooms can't overwrite each other's counts
+                cursor = db.execute(f"UPDATE {table} SET {count_column} = {count_column} + $game_count "
+                                    f"WHERE {day_column} = $day AND {game_column} = $game")
+                if not cursor.rowcount:
+                    GamesPlayed(day=day, game=game, count=game_count)
+            commit()
+            return
+        except TransactionIntegrityError:
+            # another room created the same row first, which the next attempt increments instead
+            rollback()
+        except Exception as e:
+            rollback()
+            logging.exception(e)
+            return
+    logging.warning(f"Could not add the games of room {room_id} to the GamesPlayed rollup.")
+
+
+def backfill_games_played() -> None:
+    """Fills the GamesPlayed rollup from the rooms of the last STATS_DAYS days, if it is empty."""
+    with db_session:
+        if GamesPlayed.select().exists():
+            return
+        cutoff = date.today() - timedelta(days=STATS_DAYS)
+        played: Counter[tuple[date, str]] = Counter()
+        # one query for all rooms and their slots, instead of one query per room
+        for _, _, creation_time, game in select((room.id, slot.id, room.creation_time, slot.game)
+                                                for room in Room for slot in room.seed.slots
+                                                if room.creation_time >= cutoff):
+            played[creation_time.date(), game] += 1
+        for (day, game), count in played.items():
+            GamesPlayed(day=day, game=game, count=count)
+        try:
+            commit()
+        except TransactionIntegrityError:
+            pass  # another process backfilled at the same time
 
 
 def get_db_data(known_games: set[str]) -> tuple[Counter[str], defaultdict[date, dict[str, int]]]:
     games_played: defaultdict[date, dict[str, int]] = defaultdict(Counter)
     total_games: Counter[str] = Counter()
-    cutoff = date.today() - timedelta(days=30)
-    room: Room
-    for room in select(room for room in Room if room.creation_time >= cutoff):
-        for slot in room.seed.slots:
-            if slot.game in known_games:
-                current_game = slot.game
-            else:
-                current_game = "Other"
-            total_games[current_game] += 1
-            games_played[room.creation_time.date()][current_game] += 1
+    cutoff = date.today() - timedelta(days=STATS_DAYS)
+    for day, game, played in select((games.day, games.game, games.count)
+                                    for games in GamesPlayed if games.day >= cutoff):
+        if game in known_games:
+            current_game = game
+        else:
+            current_game = "Other"
+        total_games[current_game] += played
+        games_played[day][current_game] += played
     return total_games, games_played
 
 
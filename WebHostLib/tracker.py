@@ -1,18 +1,20 @@
 import datetime
 import collections
+import threading
+import zlib
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, NamedTuple, Counter
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Set, Tuple, TypeVar, NamedTuple, Counter
 from uuid import UUID
 from email.utils import parsedate_to_datetime
 
 from flask import make_response, render_template, request, Request, Response
 from werkzeug.exceptions import abort
 
-from MultiServer import Context, get_saving_second
+from MultiServer import get_saving_second
 from NetUtils import ClientStatus, Hint, NetworkItem, NetworkSlot, SlotType
 from Utils import restricted_loads, KeyedDefaultDict
 from . import app, cache
-from .models import GameDataPackage, Room
+from .models import GameDataPackage, Room, Seed
 
 # Multisave is currently updated, at most, every minute.
 TRACKER_CACHE_TIMEOUT_IN_SECONDS = 60
@@ -40,6 +42,113 @@ def _cache_results(func: Callable) -> Callable:
     return method_wrapper
 
 
+_T = TypeVar("_T")
+
+
+class LRUCache(Generic[_T]):
+    """Thread-safe cache that evicts the least recently used entries once their total weight exceeds max_weight."""
+
+    def __init__(self, max_weight: int) -> None:
+        self.max_weight = max_weight
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "collections.OrderedDict[Hashable, Tuple[_T, int]]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, create: Callable[[], Tuple[_T, int]]) -> _T:
+        """Returns the cached value of key, or the value of create(), which returns the value and its weight."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        # create outside the lock, so slow creation of one entry doesn't block all others
+        value, weight = create()
+        with self._lock:
+            if key not in self._entries and weight <= self.max_weight:
+                self._entries[key] = value, weight
+                self.weight += weight
+                while self.weight > self.max_weight:
+                    _, (_, evicted_weight) = self._entries.popitem(last=False)
+                    self.weight -= evicted_weight
+                    self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "weight": self.weight, "max_weight": self.max_weight,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class GameTables(NamedTuple):
+    """Lookup tables of one game's data package. Plain dicts, as they are shared by all requests."""
+    item_id_to_name: Dict[int, str]
+    location_id_to_name: Dict[int, str]
+    item_name_to_id: Dict[str, int]
+    location_name_to_id: Dict[str, int]
+
+
+class SeedData(NamedTuple):
+    """The parts of a seed that trackers read, which never change. Shared by all requests, so must not be modified."""
+    multidata: Dict[str, Any]
+    games: Dict[str, GameTables]
+
+
+def _load_game_tables(checksum: str) -> Tuple[GameTables, int]:
+    game_package = restricted_loads(GameDataPackage.get(checksum=checksum).data)
+    tables = GameTables(
+        {id: name for name, id in game_package["item_name_to_id"].items()},
+        {id: name for name, id in game_package["location_name_to_id"].items()},
+        game_package["item_name_to_id"],
+        game_package["location_name_to_id"],
+    )
+    return tables, 1
+
+
+def _load_seed_data(seed: Seed) -> Tuple[SeedData, int]:
+    # decompressed here rather than by Context.decompress, whose version check upload already did, for the size
+    raw_multidata = zlib.decompress(seed.multidata[1:])
+    multidata = restricted_loads(raw_multidata)
+    games = {game: game_tables_cache.get(game_package["checksum"],
+                                         lambda checksum=game_package["checksum"]: _load_game_tables(checksum))
+             for game, game_package in multidata["datapackage"].items()}
+    # the decompressed size is much closer to the memory taken than the compressed size
+    return SeedData(multidata, games), len(raw_multidata)
+
+
+game_tables_cache: LRUCache[GameTables] = LRUCache(app.config["TRACKER_GAME_CACHE_SIZE"])
+"""Lookup tables of data packages by checksum, weighing 1 each."""
+seed_data_cache: LRUCache[SeedData] = LRUCache(app.config["TRACKER_SEED_CACHE_SIZE"])
+"""SeedData by seed id, weighing the size of the seed's decompressed multidata."""
+
+
+def get_seed_data(seed: Seed) -> SeedData:
+    return seed_data_cache.get(seed.id, lambda: _load_seed_data(seed))
+
+
+class _NamesWithFallback(collections.ChainMap):
+    """
+    View of a cached id to name table, which names unknown ids without adding them to the table.
+    Writes go to a dict of the view's own, as the table is shared by all requests.
+    """
+
+    def __init__(self, names: Dict[int, str], fallback: Callable[[int], str]) -> None:
+        super().__init__({}, names)
+        self.fallback = fallback
+
+    def __missing__(self, key: int) -> str:
+        return self.fallback(key)
+
+
 @dataclass
 class TrackerData:
     """A helper dataclass that is instantiated each time an HTTP request comes in for tracker data.
@@ -55,7 +164,8 @@ class TrackerData:
     def __init__(self, room: Room):
         """Initialize a new RoomMultidata object for the current room."""
         self.room = room
-        self._multidata = Context.decompress(room.seed.multidata)
+        seed_data = get_seed_data(room.seed)
+        self._multidata = seed_data.multidata
         self._multisave = restricted_loads(room.multisave) if room.multisave else {}
         self._tracker_cache = {}
 
@@ -69,16 +179,15 @@ class TrackerData:
         self.location_id_to_name: Dict[str, Dict[int, str]] = KeyedDefaultDict(lambda game_name: {
             game_name: KeyedDefaultDict(lambda code: f"Unknown Game {game_name} - Location (ID: {code})")
         })
-        for game, game_package in self._multidata["datapackage"].items():
-            game_package = restricted_loads(GameDataPackage.get(checksum=game_package["checksum"]).data)
-            self.item_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Item (ID: {code})", {
-                id: name for name, id in game_package["item_name_to_id"].items()})
-            self.location_id_to_name[game] = KeyedDefaultDict(lambda code: f"Unknown Location (ID: {code})", {
-                id: name for name, id in game_package["location_name_to_id"].items()})
+        for game, game_tables in seed_data.games.items():
+            self.item_id_to_name[game] = _NamesWithFallback(game_tables.item_id_to_name,
+                                                            lambda code: f"Unknown Item (ID: {code})")
+            self.location_id_to_name[game] = _NamesWithFallback(game_tables.location_id_to_name,
+                                                                lambda code: f"Unknown Location (ID: {code})")
 
             # Normal lookup tables as well.
-            self.item_name_to_id[game] = game_package["item_name_to_id"]
-            self.location_name_to_id[game] = game_package["location_name_to_id"]
+            self.item_name_to_id[game] = game_tables.item_name_to_id
+            self.location_name_to_id[game] = game_tables.location_name_to_id
 
     def get_seed_name(self) -> str:
         """Retrieves the seed name."""
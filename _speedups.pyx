@@ -14,6 +14,7 @@ from cpython cimport PyObject
 from typing import Any, Dict, Iterable, Iterator, Generator, Sequence, Tuple, TypeVar, Union, Set, List, TYPE_CHECKING
 from cymem.cymem cimport Pool
 from libc.stdint cimport int64_t, uint32_t
+from libc.stdio cimport snprintf
 from collections import defaultdict
 
 cdef extern from *:
@@ -376,3 +377,25 @@ cdef class PlayerLocationProxy:
         count = self._store.sender_index[self._player].count
         for entry in self._store.entries[start:start+count]:
             yield entry.location, (entry.item, entry.receiver, entry.flags)
+
+
+def encode_network_items(items: Iterable[Any]) -> str:
+    """
+    Encodes NetworkItems to the same json as NetUtils.encode, without first turning each item into a dict.
+    Raises TypeError or OverflowError for fields that are not plain 64bit ints, so the caller can fall back to encode.
+    """
+    cdef char buffer[192]
+    cdef int length
+    cdef int64_t item_id, location, player, flags
+    cdef list parts = []
+    for item_obj, location_obj, player_obj, flags_obj in items:
+        # bool and enums are ints too, but are encoded differently
+        if type(item_obj) is not int or type(location_obj) is not int \
+                or type(player_obj) is not int or type(flags_obj) is not int:
+            raise TypeError("NetworkItem fields have to be int")
+        item_id, location, player, flags = item_obj, location_obj, player_obj, flags_obj
+        length = snprintf(buffer, sizeof(buffer),
+                          b'{"item":%lld,"location":%lld,"player":%lld,"flags":%lld,"class":"NetworkItem"}',
+                          <long long>item_id, <long long>location, <long long>player, <long long>flags)
+        parts.append(buffer[:length].decode("ascii"))
+    return "[" + ",".join(parts) + "]"
@@ -532,6 +532,12 @@ class ServerOptions(Group):
         Allows for clients to log on and manage the server.  If this is null, no remote administration is possible.
         """
 
+    class JournalSave(Bool):
+        """
+        Append each change of the game to a journal next to the save, only writing the full save once the journal
+        grows larger than it. Makes saving long running games much cheaper.
+        """
+
     class DisableItemCheat(Bool):
         """Disallow !getitem"""
 
@@ -615,6 +621,7 @@ class ServerOptions(Group):
     multidata: str | None = None
     savefile: str | None = None
     disable_save: bool = False
+    journal_save: JournalSave | bool = False
     loglevel: str = "info"
     logtime: bool = False
     server_password: ServerPassword | None = None
@@ -687,6 +694,18 @@ class GeneratorOptions(Group):
         start_inventory -> Move remaining items to start_inventory, generate additional filler items to fill locations.
         """
 
+    class OutputProcesses(int):
+        """
+        Number of processes generating the output of worlds that support it, using fork where available.
+        0 generates all output in threads of the generating process.
+        """
+
+    class ProgressionBalancingBudget(int):
+        """
+        Maximum number of candidate items progression balancing evaluates before it stops early.
+        Items moved up to that point stay moved. 0 for no limit.
+        """
+
     enemizer_path: EnemizerPath = EnemizerPath("EnemizerCLI/EnemizerCLI.Core")  # + ".exe" is implied on Windows
     player_files_path: PlayerFilesPath = PlayerFilesPath("Players")
     players: Players = Players(0)
@@ -696,6 +715,8 @@ class GeneratorOptions(Group):
     race: Race = Race(0)
     plando_options: PlandoOptions = PlandoOptions("bosses, connections, texts")
     panic_method: PanicMethod = PanicMethod("swap")
+    output_processes: OutputProcesses = OutputProcesses(0)
+    progression_balancing_budget: ProgressionBalancingBudget = ProgressionBalancingBudget(0)
     loglevel: str = "info"
     logtime: bool = False
 
@@ -0,0 +1,60 @@
+def run_encode_benchmark(iterations: int = 100) -> None:
+    """
+    Run a benchmark of encoding the messages MultiServer sends in bulk during release/collect, comparing the generic
+    encoder against the NetworkItem fast path of NetUtils.encode with the pure python and, if available, cython
+    implementation of encode_network_items.
+    """
+    import logging
+    import typing
+    from unittest import mock
+
+    from time_it import TimeIt
+
+    import NetUtils
+    from NetUtils import NetworkItem
+    from Utils import init_logging
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    items = [NetworkItem(item_id, 1000 + item_id, item_id % 100, item_id % 8) for item_id in range(10_000)]
+    cases: typing.Dict[str, typing.List[typing.Dict[str, typing.Any]]] = {
+        "ReceivedItems of 10000 items": [{"cmd": "ReceivedItems", "index": 0, "items": items}],
+        "LocationInfo of 1000 items": [{"cmd": "LocationInfo", "locations": items[:1000]}],
+        "100 ReceivedItems of 1 item": [{"cmd": "ReceivedItems", "index": index, "items": [item]}
+                                        for index, item in enumerate(items[:100])],
+    }
+
+    implementations: typing.Dict[str, typing.Callable[[typing.Any], str]] = {
+        "generic": lambda obj: NetUtils._encode(NetUtils._scan_for_TypedTuples(obj)),
+    }
+
+    def fast_path(encode_network_items: typing.Callable[..., str]) -> typing.Callable[[typing.Any], str]:
+        def encode(obj: typing.Any) -> str:
+            with mock.patch.object(NetUtils, "encode_network_items", encode_network_items):
+                return NetUtils.encode(obj)
+        return encode
+
+    implementations["pure python"] = fast_path(NetUtils._encode_network_items)
+    if NetUtils.encode_network_items is not NetUtils._encode_network_items:
+        implementations["cython"] = fast_path(NetUtils.encode_network_items)
+    else:
+        logger.info("_speedups not available, skipping the cython implementation.")
+
+    for case, msgs in cases.items():
+        expected = implementations["generic"](msgs)
+        times: typing.Dict[str, float] = {}
+        for name, encode in implementations.items():
+            assert encode(msgs) == expected, f"{name} encoded {case} differently"
+            with TimeIt(f"{iterations} runs of {name} encoding {case}", logger) as t:
+                for _ in range(iterations):
+                    encode(msgs)
+            times[name] = t.dif
+        logger.info(f"{case}: " + ", ".join(f"{name} {times['generic'] / taken:.1f}x"
+                                            for name, taken in times.items() if name != "generic"))
+
+
+if __name__ == "__main__":
+    from path_change import change_home
+    change_home()
+    run_encode_benchmark()
@@ -0,0 +1,222 @@
+"""
+End-to-end benchmark of generating multiworlds of a given size and mix of games with default options.
+
+Each case generates in a fresh process, recording wall time and peak RSS. With --profile, each case is generated a
+second time with Generate.py's --profile, recording per-phase timings and CollectionState counts. That run's rule
+timing and counting wrappers slow generation down, so its times are kept apart from the uninstrumented wall time.
+Results can be saved as a baseline and later runs compared against it, failing on regressions beyond a threshold:
+
+    python test/benchmark/generation.py --games Pokepelago --players 1 10 100 --save_baseline baseline.json
+    python test/benchmark/generation.py --games Pokepelago --players 1 10 100 --baseline baseline.json
+    python test/benchmark/generation.py --games Pokepelago --players 10 --profile
+"""
+import typing
+
+if typing.TYPE_CHECKING:
+    import multiprocessing.connection
+
+
+class CaseResult(typing.TypedDict):
+    wall_time: float
+    """Seconds spent in Main.main, which excludes loading the worlds."""
+    peak_rss_mib: typing.Optional[float]
+    """Peak resident memory of the generating process, None where it can't be measured."""
+    phases: typing.Dict[str, float]
+    """Seconds spent in each phase of the profiled run, empty without --profile."""
+    collection_state: typing.Dict[str, typing.Dict[str, int]]
+    """CollectionState copies and sweeps per phase of the profiled run, empty without --profile."""
+
+
+def case_name(games: typing.Sequence[str], players: int, seed: int) -> str:
+    return f"{players} players of {'/'.join(games)}, seed {seed}"
+
+
+def _peak_rss_mib() -> typing.Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    import sys
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kibibytes on Linux, bytes on macOS
+    return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _generate_case(games: typing.Sequence[str], players: int, seed: int, output: bool, profile: bool,
+                   connection: "multiprocessing.connection.Connection") -> None:
+    """
+    Generates one case and sends its CaseResult through connection. Runs in its own process.
+
+    :param profile: Generate with a profile active, filling in the phases and CollectionState counts.
+    """
+    import json
+    import os
+    import random
+    import tempfile
+    import time
+
+    import Generate
+    import Main
+    from worlds.AutoWorld import AutoWorldRegister
+
+    random.seed(seed)
+    with tempfile.TemporaryDirectory(prefix="AP_benchmark_") as temp_dir:
+        args = Generate.mystery_argparse([])
+        args.multi = players
+        args.outputname = None
+        args.outputpath = temp_dir
+        args.skip_output = not output
+        args.profile = os.path.join(temp_dir, "profile.json") if profile else None
+        args.game = {}
+        args.name = {}
+        args.sprite = {}
+        args.sprite_pool = {}
+        for player in range(1, players + 1):
+            game = games[(player - 1) % len(games)]
+            args.game[player] = game
+            args.name[player] = f"Player{player}"
+            args.sprite[player] = None
+            args.sprite_pool[player] = None
+            for option_name, option in AutoWorldRegister.world_types[game].options_dataclass.type_hints.items():
+                if not hasattr(args, option_name):
+                    setattr(args, option_name, {})
+                getattr(args, option_name)[player] = option.from_any(option.default)
+
+        start = time.perf_counter()
+        Main.main(args, seed)
+        wall_time = time.perf_counter() - start
+
+        report = {"phases": {}, "collection_state": {}}
+        if profile:
+            with open(args.profile, encoding="utf-8") as f:
+                report = json.load(f)
+    connection.send(CaseResult(wall_time=wall_time, peak_rss_mib=_peak_rss_mib(), phases=report["phases"],
+                               collection_state=report["collection_state"]))
+
+
+def _run_case_process(games: typing.Sequence[str], players: int, seed: int, output: bool, profile: bool) -> CaseResult:
+    """Generates one case in a freshly spawned process, so memory and caches of earlier cases don't carry over."""
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_generate_case, args=(games, players, seed, output, profile, sender))
+    process.start()
+    sender.close()
+    try:
+        result: CaseResult = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Generating {case_name(games, players, seed)} failed, see its output above.") from None
+    finally:
+        process.join()
+    return result
+
+
+def run_case(games: typing.Sequence[str], players: int, seed: int, output: bool = False,
+             profile: bool = False) -> CaseResult:
+    """
+    Generates one case without any profiling, for its wall time and peak RSS.
+
+    :param profile: Generate the case a second time with a profile active, for its phases and CollectionState counts.
+    """
+    result = _run_case_process(games, players, seed, output, False)
+    if profile:
+        profiled = _run_case_process(games, players, seed, output, True)
+        result["phases"] = profiled["phases"]
+        result["collection_state"] = profiled["collection_state"]
+    return result
+
+
+def compare(results: typing.Mapping[str, CaseResult], baseline: typing.Mapping[str, CaseResult],
+            threshold: float, min_time: float) -> typing.List[str]:
+    """
+    Returns a description of each regression of results against baseline.
+
+    :param threshold: Allowed relative increase, 0.2 allowing results to be up to 20% worse than the baseline.
+    :param min_time: Phases that took less than this many seconds in the baseline are too noisy to compare.
+    """
+    regressions: typing.List[str] = []
+
+    def check(name: str, measure: str, value: typing.Optional[float], base: typing.Optional[float]) -> None:
+        if value is not None and base and value > base * (1 + threshold):
+            regressions.append(f"{name}: {measure} went from {base:.3f} to {value:.3f} (+{value / base - 1:.0%})")
+
+    for name, result in results.items():
+        base_result = baseline.get(name)
+        if not base_result:
+            continue
+        check(name, "wall time", result["wall_time"], base_result["wall_time"])
+        check(name, "peak RSS MiB", result["peak_rss_mib"], base_result["peak_rss_mib"])
+        for phase, taken in result["phases"].items():
+            base_taken = base_result["phases"].get(phase)
+            if base_taken and base_taken >= min_time:
+                check(name, f"{phase} phase time", taken, base_taken)
+    return regressions
+
+
+def run_generation_benchmark(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Runs the benchmark as configured by argv, returning 1 if there were regressions against the baseline."""
+    import argparse
+    import json
+    import logging
+
+    from Utils import init_logging
+
+    parser = argparse.ArgumentParser(description="Benchmark generating multiworlds with default options.")
+    parser.add_argument("--games", nargs="+", default=["Pokepelago"],
+                        help="Games to generate, cycled through to fill all players.")
+    parser.add_argument("--players", nargs="+", type=int, default=[1, 10, 100],
+                        help="Player counts to generate a multiworld for each.")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0])
+    parser.add_argument("--output", action="store_true", help="Also generate output, spoiler and archive.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Generate each case again with profiling, for per-phase times and CollectionState counts.")
+    parser.add_argument("--baseline", help="Json results of an earlier run to compare against.")
+    parser.add_argument("--save_baseline", help="Writes the results as json to this path.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed relative increase over the baseline, 0.2 allowing up to 20%%.")
+    parser.add_argument("--min_time", type=float, default=0.1,
+                        help="Phases faster than this many seconds in the baseline are not compared.")
+    args = parser.parse_args(argv)
+
+    init_logging("Benchmark Runner")
+    logger = logging.getLogger("Benchmark")
+
+    results: typing.Dict[str, CaseResult] = {}
+    for players in args.players:
+        for seed in args.seeds:
+            name = case_name(args.games, players, seed)
+            results[name] = result = run_case(args.games, players, seed, args.output, args.profile)
+            peak_rss = f"{result['peak_rss_mib']:.1f} MiB" if result["peak_rss_mib"] is not None else "unknown"
+            logger.info(f"{name} took {result['wall_time']:.2f} seconds with a peak RSS of {peak_rss}.")
+            if result["phases"]:
+                phases = ", ".join(f"{phase} {taken:.2f}s" for phase, taken in result["phases"].items())
+                logger.info(f"Phases of its profiled run: {phases}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Saved results to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline: typing.Dict[str, CaseResult] = json.load(f)
+        missing = [name for name in results if name not in baseline]
+        if missing:
+            logger.warning(f"No baseline for: {', '.join(missing)}")
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        for regression in regressions:
+            logger.error(f"Regression in {regression}")
+        if regressions:
+            return 1
+        logger.info(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    from path_change import change_home
+    change_home()
+    sys.exit(run_generation_benchmark())
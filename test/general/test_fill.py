@@ -4,7 +4,7 @@ import unittest
 from Options import Accessibility
 from test.general import generate_items, generate_locations, generate_test_multiworld
 from Fill import FillError, balance_multiworld_progression, fill_restrictive, \
-    distribute_early_items, distribute_items_restrictive
+    distribute_early_items, distribute_items_restrictive, swap_location_item
 from BaseClasses import Entrance, LocationProgressType, MultiWorld, Region, Item, Location, \
     ItemClassification
 from worlds.generic.Rules import CollectionRule, add_item_rule, locality_rules, set_rule
@@ -869,6 +869,20 @@ class TestBalanceMultiworldProgression(unittest.TestCase):
         self.assertRegionContains(
             self.player1.regions[2], self.player2.prog_items[0])
 
+    def test_stops_balancing_when_out_of_budget(self) -> None:
+        """Test that progression balancing stops without moving items once its budget is used up"""
+        self.multiworld.worlds[self.player1.id].options.progression_balancing.value = 50
+        self.multiworld.worlds[self.player2.id].options.progression_balancing.value = 50
+
+        # both of player2's items are candidates to move earlier
+        swap_location_item(self.player2.prog_items[1].location, self.player1.regions[2].locations[2])
+
+        with self.assertLogs(level="WARNING"):
+            balance_multiworld_progression(self.multiworld, budget=1)
+
+        self.assertEqual(1, sum(item.location.parent_region is self.player1.regions[2]
+                                for item in self.player2.prog_items), "More items were evaluated than the budget allows")
+
     def test_ignores_priority_locations(self) -> None:
         """Test that progression items on priority locations don't get moved by balancing"""
         self.multiworld.worlds[self.player1.id].options.progression_balancing.value = 50
@@ -0,0 +1,95 @@
+import unittest
+
+from BaseClasses import MultiWorld, SphereIndex
+from Fill import FillError, swap_location_item
+from test.general import generate_test_multiworld
+from .test_fill import PlayerDefinition, generate_player_data
+
+
+def generate_chain(multiworld: MultiWorld) -> PlayerDefinition:
+    """Three regions, each one locked behind the previous region's progression item."""
+    player = generate_player_data(multiworld, 1, 1, 3, 3)
+    item_0, item_1, item_2 = player.prog_items
+    region_1 = player.generate_region(player.menu, 2, lambda state: state.has(item_0.name, 1))
+    region_2 = player.generate_region(region_1, 2, lambda state: state.has(item_1.name, 1))
+    multiworld.completion_condition[1] = lambda state: state.has(item_2.name, 1)
+    multiworld.push_item(player.locations[0], item_0, False)
+    multiworld.push_item(region_1.locations[0], item_1, False)
+    multiworld.push_item(region_1.locations[1], player.basic_items[0], False)
+    multiworld.push_item(region_2.locations[0], item_2, False)
+    multiworld.push_item(region_2.locations[1], player.basic_items[1], False)
+    return player
+
+
+class TestSphereIndex(unittest.TestCase):
+    def test_spheres(self):
+        """Tests that the index sorts filled locations into the spheres they are reached in"""
+        multiworld = generate_test_multiworld()
+        player = generate_chain(multiworld)
+        region_1, region_2 = player.regions[1:]
+
+        spheres = list(multiworld.get_spheres())
+        self.assertEqual([{player.locations[0]}, set(region_1.locations), set(region_2.locations)], spheres)
+        self.assertTrue(multiworld.fulfills_accessibility())
+
+    def test_unreachable(self):
+        """Tests that unreachable locations are yielded after an empty sphere"""
+        multiworld = generate_test_multiworld()
+        player = generate_chain(multiworld)
+        region_1, region_2 = player.regions[1:]
+        swap_location_item(player.locations[0], region_1.locations[1])
+
+        spheres = list(multiworld.get_spheres())
+        self.assertEqual([{player.locations[0]}, set(), {*region_1.locations, *region_2.locations}], spheres)
+
+    def test_shared_index_invalidation(self):
+        """Tests that swaps only discard the affected spheres of a shared index and keep it valid"""
+        multiworld = generate_test_multiworld()
+        player = generate_chain(multiworld)
+        region_1, region_2 = player.regions[1:]
+        multiworld.share_spheres()
+        sphere_index = multiworld.get_sphere_index()
+        self.assertIs(sphere_index, multiworld.get_sphere_index())
+        sphere_index.compute()
+        first_state = sphere_index.get_state(1)
+
+        swap_location_item(region_2.locations[0], region_2.locations[1])
+        self.assertEqual(2, len(sphere_index.spheres))
+        self.assertIs(first_state, sphere_index.get_state(1))
+        self.assertEqual(list(SphereIndex(multiworld).iter_spheres()), list(multiworld.get_spheres()))
+
+        swap_location_item(player.locations[0], region_1.locations[1])
+        self.assertEqual(0, len(sphere_index.spheres))
+        self.assertEqual(list(SphereIndex(multiworld).iter_spheres()), list(multiworld.get_spheres()))
+        with self.assertRaises(FillError):
+            multiworld.fulfills_accessibility()
+
+    def test_accessibility_keeps_index_states(self):
+        """Tests that the accessibility check doesn't modify the shared index's states, which output threads read"""
+        multiworld = generate_test_multiworld()
+        player = generate_chain(multiworld)
+        player.generate_region(player.regions[2], 1)
+        multiworld.worlds[1].options.accessibility.value = multiworld.worlds[1].options.accessibility.option_full
+        multiworld.share_spheres()
+        final_state = multiworld.get_sphere_index().get_final_state()
+        self.assertTrue(final_state.stale[1])
+
+        self.assertTrue(multiworld.fulfills_accessibility())
+        self.assertTrue(final_state.stale[1], "the final state's reachable regions were updated in place")
+
+    def test_sendable_spheres(self):
+        """Tests that events are collected as soon as they are reachable without starting a sphere"""
+        multiworld = generate_test_multiworld()
+        player = generate_chain(multiworld)
+        region_1, region_2 = player.regions[1:]
+        for location in multiworld.get_filled_locations():
+            location.address = location.item.code = 1
+        event_location = region_1.locations[0]
+        event_location.address = None
+        multiworld.share_spheres()
+
+        self.assertEqual([{player.locations[0]}, {region_1.locations[1], *region_2.locations}],
+                         list(multiworld.get_sendable_spheres()))
+        swap_location_item(event_location, region_1.locations[1])
+        self.assertEqual([{player.locations[0]}, {region_1.locations[1]}, set(region_2.locations)],
+                         list(multiworld.get_sendable_spheres()))
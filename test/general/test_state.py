@@ -1,7 +1,8 @@
 import unittest
 
+from BaseClasses import CollectionState, Region, _peek
 from worlds.AutoWorld import AutoWorldRegister, call_all
-from . import setup_solo_multiworld
+from . import generate_items, generate_test_multiworld, setup_solo_multiworld
 
 
 class TestBase(unittest.TestCase):
@@ -27,3 +28,43 @@ class TestBase(unittest.TestCase):
                     with self.subTest("Step", step=step):
                         call_all(multiworld, step)
                         self.assertTrue(multiworld.get_all_state(False, allow_partial_entrances=True))
+
+
+class TestCopyOnWrite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.multiworld = generate_test_multiworld(2)
+        for player in self.multiworld.player_ids:
+            menu = self.multiworld.get_region("Menu", player)
+            region = Region("Locked", player, self.multiworld)
+            self.multiworld.regions.append(region)
+            menu.connect(region, "Unlock", lambda state, player=player: state.has("Key", player))
+        self.item = generate_items(1, 1, True)[0]
+        self.item.name = "Key"
+
+    def test_copy_shares_layers(self) -> None:
+        """Copies share each player's layers until one side accesses them for writing."""
+        state = CollectionState(self.multiworld)
+        copy = state.copy()
+        self.assertIs(_peek(state.prog_items, 1), _peek(copy.prog_items, 1))
+        copy.collect(self.item, True)
+        self.assertIsNot(_peek(state.prog_items, 1), _peek(copy.prog_items, 1))
+        self.assertIs(_peek(state.prog_items, 2), _peek(copy.prog_items, 2))
+        self.assertFalse(state.has("Key", 1))
+        self.assertTrue(copy.has("Key", 1))
+
+    def test_reachability_is_independent(self) -> None:
+        """Updating the reachable regions of a copy does not leak into the original, in either direction."""
+        state = CollectionState(self.multiworld)
+        locked = self.multiworld.get_region("Locked", 1)
+        self.assertFalse(locked.can_reach(state))
+        copy = state.copy()
+        copy.collect(self.item, True)
+        self.assertTrue(locked.can_reach(copy))
+        self.assertFalse(locked.can_reach(state))
+
+        state.collect(self.item, True)
+        self.assertTrue(locked.can_reach(state))
+        copy = state.copy()
+        copy.remove(self.item)
+        self.assertFalse(locked.can_reach(copy))
+        self.assertTrue(locked.can_reach(state))
@@ -0,0 +1,77 @@
+# Tests for the NetworkItem fast path of NetUtils.encode, using _speedups.encode_network_items or its fallback
+import os
+import typing
+import unittest
+from unittest import mock
+
+import NetUtils
+from NetUtils import ClientStatus, Hint, NetworkItem, NetworkPlayer, NetworkSlot, SlotType, _encode_network_items
+
+ci = bool(os.environ.get("CI"))  # always set in GitHub actions
+
+items = [NetworkItem(1, 2, 3, 0), NetworkItem(-1, -2, 0, 7), NetworkItem(2 ** 60, 1, 1000, 1)]
+
+sample_msgs: typing.List[typing.Dict[str, typing.Any]] = [
+    {"cmd": "ReceivedItems", "index": 0, "items": items},
+    {"cmd": "ReceivedItems", "index": 3, "items": []},
+    {"cmd": "LocationInfo", "locations": items[:1]},
+    {"cmd": "RoomUpdate", "hint_points": 5, "checked_locations": {1, 2, 3}},
+    {"cmd": "PrintJSON", "data": [{"text": "Ünicode \"quoted\"\n"}, {"text": 2, "type": "player_id"}],
+     "type": "ItemSend", "receiving": 2, "item": items[0]},
+    {"cmd": "PrintJSON", "data": [{"text": "hint"}], "type": "Hint", "receiving": 1, "item": items[1],
+     "found": False},
+    {"cmd": "Connected", "team": 0, "slot": 1, "players": [NetworkPlayer(0, 1, "Alias", "Name")],
+     "missing_locations": [1, 2], "checked_locations": [], "slot_data": {"option": [1, {"nested": None}]},
+     "slot_info": {1: NetworkSlot("Name", "Game", SlotType.player)}, "hint_points": 0},
+    {"cmd": "Bounced", "data": {"items": items}},
+    {"cmd": "SetReply", "key": "_read_hints_0_1", "value": [Hint(1, 2, 3, 4, False)]},
+]
+
+
+class Base:
+    class TestEncode(unittest.TestCase):
+        """Test that the fast path encodes exactly like the generic encoder."""
+        encode_network_items: typing.Callable[[typing.Iterable[NetworkItem]], str]
+
+        def setUp(self) -> None:
+            patcher = mock.patch.object(NetUtils, "encode_network_items", self.encode_network_items)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        def assertEncodesLikeGeneric(self, obj: typing.Any) -> None:
+            self.assertEqual(NetUtils._encode(NetUtils._scan_for_TypedTuples(obj)), NetUtils.encode(obj))
+
+        def test_network_items(self) -> None:
+            self.assertEqual(NetUtils.encode(items), self.encode_network_items(items))
+
+        def test_messages(self) -> None:
+            for msg in sample_msgs:
+                with self.subTest(cmd=msg["cmd"]):
+                    self.assertEncodesLikeGeneric([msg])
+            self.assertEncodesLikeGeneric(sample_msgs)
+
+        def test_fallback(self) -> None:
+            """Fields that are not plain ints have to fall back to the generic encoder."""
+            with self.assertRaises(TypeError):
+                self.encode_network_items([NetworkItem(1, 2, True, 0)])
+            self.assertEncodesLikeGeneric([{"cmd": "ReceivedItems", "index": 0,
+                                            "items": [NetworkItem(1, 2, True, ClientStatus.CLIENT_GOAL)]}])
+            self.assertEncodesLikeGeneric([{"cmd": "ReceivedItems", "index": 0,
+                                            "items": [NetworkItem(2 ** 70, 2, 3, 0)]}])
+            self.assertEncodesLikeGeneric([{"cmd": "PrintJSON", "data": [], "item": NetworkItem(1, 2, 3, 0.5)}])
+            self.assertEncodesLikeGeneric([{"cmd": "RoomUpdate", 1: "not a str key"}])
+
+
+class TestPurePythonEncode(Base.TestEncode):
+    """Run encode tests for the pure python implementation."""
+    encode_network_items = staticmethod(_encode_network_items)
+
+
+@unittest.skipIf(NetUtils.encode_network_items is _encode_network_items and not ci, "_speedups not available")
+class TestSpeedupsEncode(Base.TestEncode):
+    """Run encode tests for the cython implementation."""
+    encode_network_items = staticmethod(NetUtils.encode_network_items)
+
+    def setUp(self) -> None:
+        self.assertFalse(NetUtils.encode_network_items is _encode_network_items, "Failed to load _speedups")
+        super().setUp()
@@ -1,15 +1,20 @@
 # Tests for Generate.py (ArchipelagoGenerate.exe)
 
+import json
+import multiprocessing
 import unittest
 import os
 import os.path
 import sys
+import zipfile
 
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest import mock
 
 import Generate
 import Main
+import Profiling
 
 
 class TestGenerateMain(unittest.TestCase):
@@ -93,6 +98,62 @@ class TestGenerateMain(unittest.TestCase):
 
         self.assertOutput(self.output_tempdir.name)
 
+    def test_generate_profile(self):
+        report_path = os.path.join(self.output_tempdir.name, "profile.json")
+        stacks_path = os.path.join(self.output_tempdir.name, "profile.stacks")
+        sys.argv = [sys.argv[0], '--seed', '0',
+                    '--player_files_path', str(self.abs_input_dir),
+                    '--outputpath', self.output_tempdir.name,
+                    '--profile', report_path, '--profile_flamegraph', stacks_path]
+        multiworld = Main.main(*Generate.main())
+
+        self.assertOutput(self.output_tempdir.name)
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        self.assertEqual(multiworld.seed_name, report["seed"])
+        for phase in ("generate", "fill", "output", "spoiler"):
+            self.assertIn(phase, report["phases"])
+        self.assertEqual(multiworld.game[1], report["players"]["1"]["game"])
+        self.assertIn("generate_early", report["players"]["1"]["stages"])
+        self.assertTrue(report["collection_state"]["fill"]["copies"])
+        self.assertTrue(any(rule["calls"] for rule in report["access_rules"]))
+        with open(stacks_path, encoding="utf-8") as f:
+            self.assertIn("generate;create_regions;", f.read())
+        self.assertIsNone(Profiling.get_active())
+        for location in multiworld.get_locations(1):
+            self.assertNotIn("timed_rule", repr(location.access_rule), "Access rules were not restored")
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "output processes require fork")
+    def test_generate_output_processes(self):
+        from settings import get_settings
+        from worlds.AutoWorld import AutoWorldRegister
+
+        def generate_output(world, output_directory: str) -> None:
+            world.process_id = os.getpid()
+            with open(os.path.join(output_directory, f"{world.player}.txt"), "w") as f:
+                f.write(str(world.process_id))
+
+        world_type = AutoWorldRegister.world_types["APQuest"]
+        settings = get_settings()
+        original_output_processes = settings.generator.output_processes
+        settings.generator.output_processes = settings.generator.OutputProcesses(1)
+        try:
+            with mock.patch.object(world_type, "generate_output", generate_output, create=True), \
+                    mock.patch.object(world_type, "process_output", ("process_id",)):
+                sys.argv = [sys.argv[0], '--seed', '0',
+                            '--player_files_path', str(self.abs_input_dir),
+                            '--outputpath', self.output_tempdir.name]
+                multiworld = Main.main(*Generate.main())
+        finally:
+            settings.generator.output_processes = original_output_processes
+
+        self.assertOutput(self.output_tempdir.name)
+        self.assertNotEqual(os.getpid(), multiworld.worlds[1].process_id)
+        self.assertIsNone(Main._forked_multiworld, "The multiworld was kept after generation")
+        output_file, = Path(self.output_tempdir.name).glob("*.zip")
+        with zipfile.ZipFile(output_file) as zf:
+            self.assertEqual(str(multiworld.worlds[1].process_id), zf.read("1.txt").decode())
+
 
 class TestGenerateWeights(TestGenerateMain):
     """Tests Generate.py using a weighted file to generate for multiple players."""
@@ -108,6 +169,8 @@ class TestGenerateWeights(TestGenerateMain):
     # don't need to run these tests
     test_generate_absolute = None
     test_generate_relative = None
+    test_generate_output_processes = None
+    test_generate_profile = None
 
     def test_generate_yaml(self):
         from settings import get_settings
@@ -137,3 +200,34 @@ class TestGenerateWeights(TestGenerateMain):
                     result, getattr(namespace, option_name)[player].value,
                     "Generated results from weights file did not match expected value."
                 )
+
+
+class TestGenerationProfile(unittest.TestCase):
+    def test_uninstrument_keeps_replaced_rules(self):
+        """Tests that uninstrument only restores the rules that still hold the instrumented version."""
+        from BaseClasses import CollectionState
+        from test.general import generate_locations, generate_test_multiworld
+        from worlds.generic.Rules import add_rule, set_rule
+
+        multiworld = generate_test_multiworld()
+        restored, combined, replaced = generate_locations(3, 1, multiworld.get_region("Menu", 1))
+        original_rule = restored.access_rule
+        copy, sweep = CollectionState.copy, CollectionState.sweep_for_advancements
+        profile = Profiling.GenerationProfile()
+        profile.instrument_state()
+        profile.instrument_rules(multiworld)
+        add_rule(combined, lambda state: True)
+        combined_rule = combined.access_rule
+        set_rule(replaced, lambda state: False)
+        replaced_rule = replaced.access_rule
+        replaced_copy = CollectionState.copy = lambda state: state
+        try:
+            profile.uninstrument()
+            self.assertIs(replaced_copy, CollectionState.copy, "A replaced method was restored")
+            self.assertIs(sweep, CollectionState.sweep_for_advancements)
+        finally:
+            CollectionState.copy = copy
+            CollectionState.sweep_for_advancements = sweep
+        self.assertIs(original_rule, restored.access_rule)
+        self.assertIs(combined_rule, combined.access_rule)
+        self.assertIs(replaced_rule, replaced.access_rule)
@@ -1,10 +1,29 @@
+import asyncio
+import json
+import os
+import tempfile
 import unittest
-from MultiServer import Context, ServerCommandProcessor
+from unittest import mock
+
+import ServerMetrics
+
+from MultiServer import (Client, Context, ServerCommandProcessor, collect_player, get_checked_checks,
+                         get_missing_checks, get_slot_points, process_client_cmds, send_items_to, send_new_items,
+                         update_aliases)
+from NetUtils import Hint, HintStatus, LocationStore, NetworkItem, NetworkSlot, SlotType, encode
+
+
+def new_context() -> Context:
+    """Context strips the groups from the shared data package, so each test's context strips them from a copy."""
+    import worlds
+    games = {game: dict(game_package) for game, game_package in worlds.network_data_package["games"].items()}
+    with mock.patch.dict(worlds.network_data_package, {"games": games}):
+        return Context("", 0, "", "", 0, 0, False)
 
 
 class TestResolvePlayerName(unittest.TestCase):
     def test_resolve(self) -> None:
-        p = ServerCommandProcessor(Context("", 0, "", "", 0, 0, False))
+        p = ServerCommandProcessor(new_context())
         p.ctx.player_names = {
             (1, 1): "AAA",
             (1, 2): "aBc",
@@ -38,3 +57,383 @@ class TestResolvePlayerName(unittest.TestCase):
         assert p.resolve_player("ABC") == (1, 2, "abc"), "case insensitive resolves when 1 match"
         assert p.resolve_player("abcd") == (1, 3, "abCD"), "case insensitive resolves when 1 match"
         assert not p.resolve_player("aB"), "partial name shouldn't resolve to player"
+
+
+class TestHints(unittest.TestCase):
+    def test_recheck_location_hints(self) -> None:
+        ctx = new_context()
+        ctx.groups = {3: {2, 4}}
+        hint = Hint(3, 1, 10, 100, False)
+        other_hint = Hint(1, 2, 20, 200, False)
+        for slot in (1, 2, 4):
+            ctx.hints[0, slot].add(hint)
+        ctx.hints[0, 1].add(other_hint)
+        ctx.hints[0, 2].add(other_hint)
+        ctx.index_hints()
+        self.assertIs(ctx.get_hint(0, 1, 10), hint)
+        self.assertIs(ctx.get_hint(0, 2, 20), other_hint)
+        self.assertIsNone(ctx.get_hint(0, 2, 10))
+
+        ctx.location_checks[0, 1] |= {10}
+        ctx.location_checks[0, 2] |= {20}
+        changed = set()
+        ctx.recheck_location_hints(0, 1, [10], changed)
+        found_hint = hint._replace(found=True, status=HintStatus.HINT_FOUND)
+        self.assertEqual({(0, 1), (0, 2), (0, 4)}, changed)
+        self.assertEqual(found_hint, ctx.get_hint(0, 1, 10))
+        for slot in (1, 2, 4):
+            self.assertIn(found_hint, ctx.hints[0, slot])
+            self.assertNotIn(hint, ctx.hints[0, slot])
+        self.assertEqual(other_hint, ctx.get_hint(0, 2, 20), "hints of other locations should not be rechecked")
+
+        ctx.recheck_hints(0, 1, changed)
+        self.assertTrue(ctx.get_hint(0, 2, 20).found)
+        self.assertEqual({found_hint, ctx.get_hint(0, 2, 20)}, ctx.hints[0, 1])
+
+
+class TestDataPackage(unittest.TestCase):
+    def test_data_package_msg(self) -> None:
+        ctx = new_context()
+        games = list(ctx.gamespackage)
+        self.assertEqual(encode([{"cmd": "DataPackage", "data": {"games": ctx.gamespackage}}]),
+                         ctx.get_data_package_msg(games))
+        self.assertEqual(encode([{"cmd": "DataPackage", "data": {"games": {games[0]: ctx.gamespackage[games[0]]}}}]),
+                         ctx.get_data_package_msg(games[:1]))
+        self.assertEqual(encode([{"cmd": "DataPackage", "data": {"games": {}}}]), ctx.get_data_package_msg([]))
+
+        other_ctx = new_context()
+        self.assertIs(ctx.get_encoded_game_package(games[0]), other_ctx.get_encoded_game_package(games[0]),
+                      "data packages with the same checksum should only be encoded once")
+
+
+class TestConnectedMsg(unittest.TestCase):
+    def assertConnectedMsg(self, ctx: Context, team: int, slot: int) -> None:
+        expected = {
+            "cmd": "Connected",
+            "team": team, "slot": slot,
+            "players": ctx.get_players_package(),
+            "missing_locations": get_missing_checks(ctx, team, slot),
+            "checked_locations": get_checked_checks(ctx, team, slot),
+            "slot_info": ctx.slot_info,
+            "hint_points": get_slot_points(ctx, team, slot),
+        }
+        self.assertEqual(encode([expected])[1:-1], ctx.get_connected_msg(team, slot, False))
+        expected["slot_data"] = ctx.slot_data[slot]
+        self.assertEqual(encode([expected])[1:-1], ctx.get_connected_msg(team, slot))
+
+    def test_connected_msg(self) -> None:
+        ctx = new_context()
+        ctx.player_names = {(0, 1): "Player1", (0, 2): "Player2"}
+        ctx.slot_info = {slot: NetworkSlot(name, "Archipelago", SlotType.player)
+                         for (_, slot), name in ctx.player_names.items()}
+        ctx.slot_data = {1: {"option": [1, 2]}, 2: {}}
+        ctx.locations = LocationStore({1: {10: (100, 2, 0), 11: (101, 1, 0)}, 2: {20: (200, 1, 0)}})
+        ctx.clients = {0: {1: [], 2: []}}
+        for slot in (1, 2):
+            self.assertConnectedMsg(ctx, 0, slot)
+
+        ctx.location_checks[0, 1] |= {10}
+        self.assertConnectedMsg(ctx, 0, 1)
+        ctx.name_aliases[0, 2] = "Alias"
+        update_aliases(ctx, 0)
+        self.assertConnectedMsg(ctx, 0, 1)
+
+
+class TestSendNewItems(unittest.TestCase):
+    def test_only_sends_to_new_items_slots(self) -> None:
+        ctx = new_context()
+        clients = {slot: [Client(mock.MagicMock(), ctx) for _ in range(3)] for slot in (1, 2)}
+        ctx.clients = {0: clients}
+        for slot, slot_clients in clients.items():
+            for client in slot_clients:
+                client.team, client.slot = 0, slot
+        clients[1][2].remote_items = True
+        item = NetworkItem(1, 10, 2)
+
+        with mock.patch.object(ctx, "broadcast") as broadcast:
+            send_items_to(ctx, 0, 1, item)
+            send_new_items(ctx)
+            self.assertEqual(2, broadcast.call_count, "clients of a slot in sync should share their message")
+            (local_clients, local_msgs), (remote_clients, remote_msgs) = \
+                sorted((call.args for call in broadcast.call_args_list), key=lambda args: len(args[0]), reverse=True)
+            self.assertEqual(clients[1][:2], local_clients)
+            self.assertEqual(clients[1][2:], remote_clients)
+            for msgs in (local_msgs, remote_msgs):
+                self.assertEqual([{"cmd": "ReceivedItems", "index": 0, "items": [item]}], msgs)
+            self.assertEqual([1, 1, 1], [client.send_index for client in clients[1]])
+            self.assertEqual([0, 0, 0], [client.send_index for client in clients[2]])
+
+            broadcast.reset_mock()
+            send_new_items(ctx)
+            broadcast.assert_not_called()
+
+
+class TestCollect(unittest.TestCase):
+    def test_collect_broadcasts_once(self) -> None:
+        ctx = new_context()
+        slots = range(1, 5)
+        ctx.player_names = {(0, slot): f"Player{slot}" for slot in slots}
+        ctx.slot_info = {slot: NetworkSlot(name, "Archipelago", SlotType.player)
+                         for (_, slot), name in ctx.player_names.items()}
+        # every slot has one item for slot 1 and one for itself
+        ctx.locations = LocationStore({slot: {slot * 10: (100 + slot, 1, 0), slot * 10 + 1: (200 + slot, slot, 0)}
+                                       for slot in slots})
+        ctx.clients = {0: {slot: [Client(mock.MagicMock(), ctx)] for slot in slots}}
+        for slot, (client,) in ctx.clients[0].items():
+            client.team, client.slot = 0, slot
+        ctx.location_checks[0, 2] |= {20}
+
+        with mock.patch.object(ctx, "broadcast_text_all"), \
+                mock.patch.object(ctx, "broadcast_team") as broadcast_team, \
+                mock.patch.object(ctx, "broadcast") as broadcast, \
+                mock.patch.object(ctx, "save") as save, \
+                mock.patch.object(ctx, "on_new_location_checks") as on_new_location_checks, \
+                mock.patch.object(ctx, "on_new_received_items") as on_new_received_items:
+            collect_player(ctx, 0, 1)
+        self.assertEqual({10, 11}, ctx.location_checks[0, 1])
+        self.assertEqual({20}, ctx.location_checks[0, 2])
+        self.assertEqual({30}, ctx.location_checks[0, 3])
+        self.assertEqual({40}, ctx.location_checks[0, 4])
+        broadcast_team.assert_called_once()
+        save.assert_called_once()
+        (info_texts,) = broadcast_team.call_args.args[1:]
+        self.assertEqual(4, len(info_texts))
+
+        room_updates = {}
+        for clients, msgs in (call.args for call in broadcast.call_args_list):
+            for msg in msgs:
+                if msg["cmd"] == "RoomUpdate":
+                    (client,) = clients
+                    self.assertNotIn(client.slot, room_updates, "each slot should get a single RoomUpdate")
+                    room_updates[client.slot] = msg
+        self.assertEqual(set(slots), room_updates.keys())
+        self.assertEqual([10, 11], sorted(room_updates[1]["checked_locations"]))
+        self.assertEqual([20], room_updates[2]["checked_locations"])
+        self.assertNotIn("hint_points", room_updates[2], "slot 2 had no new checks")
+        self.assertIn("hint_points", room_updates[3])
+        self.assertEqual([101, 103, 104, 201], sorted(item.item for item in ctx.received_items[0, 1, True]))
+
+        on_new_location_checks.assert_has_calls([mock.call(0, 1, {10, 11}), mock.call(0, 3, {30}),
+                                                 mock.call(0, 4, {40})], any_order=True)
+        self.assertEqual(3, on_new_location_checks.call_count)
+        new_items = [item.item for call in on_new_received_items.call_args_list
+                     if call.args[:3] == (0, 1, True) for item in call.args[4]]
+        self.assertEqual([101, 103, 104, 201], sorted(new_items))
+
+
+class TestDataStorage(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.ctx = new_context()
+        self.clients = [Client(mock.MagicMock(), self.ctx) for _ in range(3)]
+        for slot, client in enumerate(self.clients, 1):
+            client.auth = True
+            client.team, client.slot = 0, slot
+        patcher = mock.patch.object(self.ctx, "save")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_notifications(self) -> None:
+        prefix_client, key_client, setter = self.clients
+        await process_client_cmds(self.ctx, prefix_client, [{"cmd": "SetNotify", "keys": ["progress_*"]}])
+        await process_client_cmds(self.ctx, key_client, [{"cmd": "SetNotify", "keys": ["progress_2"]}])
+
+        with mock.patch.object(self.ctx, "broadcast") as broadcast:
+            await process_client_cmds(self.ctx, setter, [
+                {"cmd": "Set", "key": "progress_1", "default": [], "operations": [{"operation": "add", "value": [1]}]},
+                {"cmd": "Set", "key": "progress_2", "operations": [{"operation": "replace", "value": 5}]},
+                {"cmd": "Set", "key": "other", "want_reply": True, "operations": [{"operation": "add", "value": 1}]},
+            ])
+        replies = {}
+        for call in broadcast.call_args_list:
+            for client in call.args[0]:
+                self.assertNotIn(client, replies, "each client should get all of its replies in one message")
+                replies[client] = [(reply["key"], reply["original_value"], reply["value"]) for reply in call.args[1]]
+        self.assertEqual({
+            prefix_client: [("progress_1", [], [1]), ("progress_2", 0, 5)],
+            key_client: [("progress_2", 0, 5)],
+            setter: [("other", 0, 1)],
+        }, replies)
+        self.assertEqual({"progress_1": [1], "progress_2": 5, "other": 1}, self.ctx.stored_data)
+
+    async def test_in_place(self) -> None:
+        setter = self.clients[0]
+        default = []
+        await process_client_cmds(self.ctx, setter, [
+            {"cmd": "Set", "key": "list", "default": default, "operations": [{"operation": "add", "value": [1]}]}])
+        self.assertEqual([], default, "the default argument should not be modified")
+        stored = self.ctx.stored_data["list"]
+        await process_client_cmds(self.ctx, setter, [
+            {"cmd": "Set", "key": "list", "operations": [{"operation": "add", "value": [2]}]},
+            {"cmd": "Set", "key": "list", "operations": [{"operation": "update", "value": [2, 3]}]}])
+        self.assertEqual([1], stored, "values stored before the batch should not be modified")
+        stored = self.ctx.stored_data["list"]
+        self.assertEqual([1, 2, 3], stored)
+
+        with mock.patch.object(self.ctx, "broadcast") as broadcast:
+            await process_client_cmds(self.ctx, setter, [
+                {"cmd": "Set", "key": "list", "want_reply": True, "operations": [{"operation": "remove", "value": 1}]}])
+        (reply,) = broadcast.call_args.args[1]
+        self.assertEqual([1, 2, 3], reply["original_value"])
+        self.assertEqual([2, 3], reply["value"])
+        self.assertEqual([1, 2, 3], stored, "the original value should not be modified when it is replied")
+
+    async def test_replies_in_batch(self) -> None:
+        """Later sets of a batch must not modify the values of earlier replies, which are sent after the batch."""
+        setter = self.clients[0]
+        self.ctx.stored_data["list"] = [0]
+        with mock.patch.object(self.ctx, "broadcast") as broadcast:
+            await process_client_cmds(self.ctx, setter, [
+                {"cmd": "Set", "key": "list", "want_reply": True, "operations": [{"operation": "add", "value": [1]}]},
+                {"cmd": "Set", "key": "list", "operations": [{"operation": "add", "value": [2]}]},
+                {"cmd": "Set", "key": "replaced", "want_reply": True,
+                 "operations": [{"operation": "replace", "value": [1]}, {"operation": "add", "value": [2]}]}])
+        first_reply, replaced_reply = broadcast.call_args.args[1]
+        self.assertEqual([0], first_reply["original_value"])
+        self.assertEqual([0, 1], first_reply["value"])
+        self.assertEqual([0, 1, 2], self.ctx.stored_data["list"])
+        self.assertEqual([1], replaced_reply["operations"][0]["value"], "the operations should be echoed unmodified")
+        self.assertEqual([1, 2], replaced_reply["value"])
+
+
+class TestBounce(unittest.IsolatedAsyncioTestCase):
+    async def test_bounce_targets(self) -> None:
+        ctx = new_context()
+        ctx.games = {1: "Game A", 2: "Game B", 3: "Game B"}
+        ctx.game_slots = {"Game A": [1], "Game B": [2, 3]}
+        ctx.clients = {0: {slot: [] for slot in ctx.games}, 1: {slot: [] for slot in ctx.games}}
+        clients = {}
+        for team, slot, tags in ((0, 1, ["DeathLink"]), (0, 2, []), (0, 3, ["Tracker"]), (1, 1, ["DeathLink"])):
+            client = clients[team, slot] = Client(mock.MagicMock(), ctx)
+            client.auth = True
+            client.team, client.slot, client.tags = team, slot, tags
+            ctx.clients[team][slot].append(client)
+            ctx.index_client_tags(client)
+        sender = clients[0, 2]
+
+        async def bounce(**args) -> set:
+            with mock.patch.object(ctx, "broadcast_send_encoded_msgs") as broadcast:
+                await process_client_cmds(ctx, sender, [{"cmd": "Bounce", **args}])
+            return set().union(*(call.args[0] for call in broadcast.call_args_list))
+
+        self.assertEqual({clients[0, 1]}, await bounce(tags=["DeathLink"]))
+        self.assertEqual({clients[0, 2], clients[0, 3]}, await bounce(games=["Game B"]))
+        self.assertEqual({clients[0, 1], clients[0, 3]}, await bounce(slots=[3], tags=["DeathLink"]))
+        self.assertEqual(set(), await bounce(games=["Game C"], slots=[4]))
+
+        ctx.player_names = {(0, 2): "Sender"}
+        with mock.patch.object(ctx, "broadcast_text_all"):
+            await process_client_cmds(ctx, sender, [{"cmd": "ConnectUpdate", "tags": ["DeathLink"]}])
+        self.assertEqual({clients[0, 1], sender}, await bounce(tags=["DeathLink"]))
+        with mock.patch("MultiServer.on_client_disconnected"):
+            await ctx.disconnect(clients[0, 1])
+        self.assertEqual({sender}, await bounce(tags=["DeathLink"]))
+
+
+class TestServerMetrics(unittest.IsolatedAsyncioTestCase):
+    def test_histogram(self) -> None:
+        histogram = ServerMetrics.Histogram((1, 10))
+        for value in (0.5, 1, 5, 20):
+            histogram.observe(value)
+        self.assertEqual([("1", 2), ("10", 3), ("+Inf", 4)], histogram.cumulative_counts())
+        self.assertEqual(26.5, histogram.sum)
+        self.assertEqual(20, histogram.max)
+
+    async def test_metrics(self) -> None:
+        ctx = new_context()
+        ctx.metrics = ServerMetrics.ServerMetrics()
+        client = Client(mock.MagicMock(send=mock.AsyncMock()), ctx)
+        client.auth = True
+        client.team, client.slot = 0, 1
+        with mock.patch.object(ctx, "save"), mock.patch("websockets.broadcast"):
+            await process_client_cmds(ctx, client, [
+                {"cmd": "Set", "key": "a", "want_reply": True, "operations": [{"operation": "add", "value": 1}]},
+                {"cmd": "Set", "key": "b", "operations": [{"operation": "add", "value": 1}]},
+                {"cmd": "Get", "keys": ["a"]},
+                {"cmd": ["not", "a", "str"]},
+            ])
+            await asyncio.sleep(0)  # let the broadcast task run
+        for cmd in range(ServerMetrics.max_commands):
+            ctx.metrics.record_command(str(cmd), 0)
+
+        report = ctx.metrics.report(ctx)
+        self.assertEqual(2, report["commands"]["Set"]["count"])
+        self.assertEqual(1, report["commands"]["Get"]["count"])
+        self.assertLessEqual(len(report["commands"]), ServerMetrics.max_commands + 1,
+                             "clients should not be able to create arbitrarily many metrics")
+        self.assertIn("Other", report["commands"])
+        self.assertEqual(3, report["sends"]["recipients"]["count"], "expected SetReply, Retrieved and InvalidPacket")
+        self.assertEqual(2, report["state"]["stored_data_keys"])
+        json.dumps(report)
+
+        prometheus = ctx.metrics.prometheus(ctx)
+        self.assertIn('archipelago_command_seconds_count{cmd="Get"} 1\n', prometheus)
+        self.assertIn('archipelago_message_recipients_bucket{le="+Inf"} 3\n', prometheus)
+        self.assertIn("archipelago_stored_data_keys 2\n", prometheus)
+
+    async def test_serve_prometheus(self) -> None:
+        ctx = new_context()
+        ctx.metrics = ServerMetrics.ServerMetrics()
+        server = await ServerMetrics.serve_prometheus(ctx, "127.0.0.1", 0)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+        head, _, body = response.partition(b"\r\n\r\n")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 OK"))
+        self.assertEqual(ctx.metrics.prometheus(ctx).split("archipelago_uptime_seconds")[0],
+                         body.decode().split("archipelago_uptime_seconds")[0])
+
+
+class TestJournalSave(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.save_filename = os.path.join(self.temp_dir.name, "test.apsave")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def load(self) -> Context:
+        ctx = new_context()
+        ctx.save_filename = self.save_filename
+        with mock.patch.object(ctx, "_start_async_saving"):
+            ctx.init_save(True, journal=True)
+        return ctx
+
+    def test_replay(self) -> None:
+        ctx = self.load()
+        self.assertTrue(ctx._save())
+        snapshot = os.path.getmtime(self.save_filename), os.path.getsize(self.save_filename)
+
+        item = NetworkItem(1, 10, 2)
+        send_items_to(ctx, 0, 1, item)
+        ctx.location_checks[0, 2] |= {10}
+        ctx.journal("location_checks", (0, 2), {10})
+        ctx.add_hint(0, Hint(1, 2, 10, 1, True, status=HintStatus.HINT_FOUND))
+        ctx.stored_data["key"] = [1]
+        ctx.journal("stored_data", "key", [1])
+        ctx.name_aliases[0, 1] = "alias"
+        ctx.journal("name_aliases", (0, 1), "alias")
+        ctx.name_aliases.pop((0, 1))
+        ctx.journal("name_aliases", (0, 1), None)
+        self.assertTrue(ctx._save())
+        self.assertEqual(snapshot, (os.path.getmtime(self.save_filename), os.path.getsize(self.save_filename)),
+                         "changes should only be appended to the journal")
+
+        loaded = self.load()
+        self.assertEqual(ctx.received_items, loaded.received_items)
+        self.assertEqual({(0, 2): {10}}, dict(loaded.location_checks))
+        self.assertEqual(ctx.location_hints, loaded.location_hints)
+        self.assertEqual(ctx.hints[0, 1], loaded.hints[0, 1])
+        self.assertEqual({"key": [1]}, loaded.stored_data)
+        self.assertEqual({}, loaded.name_aliases)
+
+        # a full save starts a new journal, so the old one can't be replayed on top of it again
+        send_items_to(loaded, 0, 1, item)
+        self.assertTrue(loaded.save(True))
+        reloaded = self.load()
+        self.assertEqual([item, item], reloaded.received_items[0, 1, True])
@@ -0,0 +1,29 @@
+import unittest
+from uuid import uuid4
+
+
+class TestRoomPlacement(unittest.TestCase):
+    def test_place_room(self) -> None:
+        """Verify that rooms are placed on the least loaded hoster and only once."""
+        from WebHostLib.autolauncher import HosterLoad, MultiworldInstance, place_room
+
+        config = {"PONY": {}, "SELFLAUNCHCERT": None, "SELFLAUNCHKEY": None, "HOST_ADDRESS": "",
+                  "ROOM_METRICS_INTERVAL": 0, "TRACKER_EVENT_INTERVAL": 0}
+        hosters = [MultiworldInstance(config, hoster_id) for hoster_id in range(3)]
+        big_rooms = [uuid4() for _ in range(3)]
+        for room_id in big_rooms:
+            place_room(hosters, room_id, 300)
+        self.assertEqual([[room_id] for room_id in big_rooms], [list(hoster.room_slots) for hoster in hosters],
+                         "big rooms should be spread over all hosters")
+
+        place_room(hosters, big_rooms[0], 300)
+        self.assertEqual(1, len(hosters[0].room_slots), "a hosted room should not be placed again")
+
+        hosters[0].load_report[:] = HosterLoad(rooms=1, clients=300, extra_clients=0, loop_lag=0.0, rss=0)
+        self.assertEqual(300, hosters[0].get_placement_key()[1], "a room's clients should not add to its slots")
+        hosters[1].load_report[:] = HosterLoad(rooms=1, clients=0, extra_clients=0, loop_lag=1.0, rss=0)
+        hosters[2].load_report[:] = HosterLoad(rooms=1, clients=350, extra_clients=50, loop_lag=0.0, rss=0)
+        small_room = uuid4()
+        place_room(hosters, small_room, 10)
+        self.assertIn(small_room, hosters[0].room_slots,
+                      "should avoid the lagging hoster and the one with more clients than slots")
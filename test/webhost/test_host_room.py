@@ -53,6 +53,35 @@ class TestHostFakeRoom(TestBase):
         except OSError:
             pass
 
+    def test_save_ignores_journal(self) -> None:
+        """Verify that rooms keep saving full snapshots to the database when journaled saves are requested."""
+        import asyncio
+        import pickle
+        from unittest import mock
+        from pony.orm import db_session
+        from NetUtils import ClientStatus
+        from WebHostLib.customserver import WebHostContext, get_static_server_data
+        from WebHostLib.models import Room
+
+        async def save() -> WebHostContext:
+            ctx = WebHostContext(get_static_server_data(), logging.getLogger("test"))
+            ctx.room_id = self.room_id
+            with mock.patch.object(ctx, "_start_async_saving"), \
+                    mock.patch.object(ctx, "listen_to_db_commands", mock.AsyncMock()):
+                ctx.init_save(True, journal=True)
+            ctx.client_game_state[0, 1] = ClientStatus.CLIENT_GOAL
+            ctx.journal("client_game_state", (0, 1), ClientStatus.CLIENT_GOAL)
+            self.assertTrue(ctx.save(now=True))
+            return ctx
+
+        ctx = asyncio.run(save())
+        self.assertFalse(ctx.journaling)
+        self.assertFalse(ctx.journal_records, "changes should not be kept for a journal that is never written")
+        self.assertIsNone(ctx.journal_filename)
+        with db_session:
+            multisave = Room.get(id=self.room_id).multisave
+        self.assertEqual({(0, 1): ClientStatus.CLIENT_GOAL}, pickle.loads(multisave)["client_game_state"])
+
     def test_display_log_missing_full(self) -> None:
         """
         Verify that we get a 200 response even if log is missing.
@@ -0,0 +1,38 @@
+from unittest import mock
+from uuid import uuid4
+
+from . import TestBase
+
+
+class TestStats(TestBase):
+    def test_games_played(self) -> None:
+        """Verify that created rooms are counted in the games played rollup read by the stats page."""
+        from pony.orm import commit, db_session, select
+        from WebHostLib.models import GamesPlayed, Room, Seed, Slot, db
+        from WebHostLib.stats import get_db_data, record_games_played
+
+        owner = uuid4()
+        with db_session:
+            select(games for games in GamesPlayed).delete(bulk=True)
+            slots = {Slot(player_id=player, player_name=f"Player{player}", game=game)
+                     for player, game in enumerate(("Known", "Known", "Unknown"), 1)}
+            seed = Seed(multidata=b"", owner=owner, slots=slots)
+            rooms = [Room(seed=seed, owner=owner, tracker=uuid4()) for _ in range(3)]
+            commit()
+            for room in rooms[:2]:
+                record_games_played(room)
+
+            # the rollup failing must not fail the room's creation
+            with mock.patch.object(db, "execute", side_effect=RuntimeError("database is locked")), \
+                    self.assertLogs(level="ERROR"):
+                record_games_played(rooms[2])
+
+        with db_session:
+            total_games, games_played = get_db_data({"Known"})
+            self.assertEqual({"Known": 4, "Other": 2}, total_games)
+            self.assertEqual([{"Known": 4, "Other": 2}], list(games_played.values()))
+            self.assertEqual(3, select(room for room in Room if room.owner == owner).count())
+
+            select(room for room in Room if room.owner == owner).delete(bulk=True)
+            select(seed for seed in Seed if seed.owner == owner).delete()
+            select(games for games in GamesPlayed).delete(bulk=True)
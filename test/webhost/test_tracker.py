@@ -103,3 +103,79 @@ class TestTracker(TestBase):
                 self.assertEqual(response.status_code, 200)
             with self.client.open(url_for("api.tracker_slot_data", tracker=self.tracker_uuid)) as response:
                 self.assertEqual(response.status_code, 200)
+
+    def test_tracker_delta(self) -> None:
+        """Verify that the tracker delta api only returns what changed since the cursor."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        with self.app.test_request_context():
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid)) as response:
+                self.assertEqual(response.status_code, 200)
+                etag = response.get_etag()[0]
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid),
+                                  headers={"If-None-Match": f'"{etag}"'}) as response:
+                self.assertEqual(response.status_code, 304)
+            with self.client.open(url_for("api.tracker_delta", tracker=self.tracker_uuid)) as response:
+                self.assertTrue(response.json["full"])
+                self.assertEqual(etag, response.json["cursor"])
+                self.assertEqual(1, len(response.json["player_checks_done"]))
+            with self.client.open(url_for("api.tracker_delta", tracker=self.tracker_uuid, cursor=etag)) as response:
+                self.assertFalse(response.json["full"])
+                self.assertEqual([], response.json["player_checks_done"])
+
+            with db_session:
+                room = Room.get(id=self.room_id)
+                # like the save on shutdown, which doesn't update last_activity
+                room.multisave = pickle.dumps({"location_checks": {(0, 1): {1, 2}}})
+            with self.client.open(url_for("api.tracker_data", tracker=self.tracker_uuid),
+                                  headers={"If-None-Match": f'"{etag}"'}) as response:
+                self.assertEqual(response.status_code, 200)
+            with self.client.open(url_for("api.tracker_delta", tracker=self.tracker_uuid, cursor=etag)) as response:
+                self.assertFalse(response.json["full"])
+                self.assertNotEqual(etag, response.json["cursor"])
+                self.assertEqual([{"team": 0, "player": 1, "locations": [1, 2]}],
+                                 response.json["player_checks_done"])
+                self.assertEqual([], response.json["player_items_received"])
+
+    def test_seed_data_cache(self) -> None:
+        """Verify that trackers decode a seed once and reuse it for later requests."""
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+        from WebHostLib.tracker import TrackerData, seed_data_cache
+
+        seed_data_cache.clear()
+        with db_session:
+            room = Room.get(id=self.room_id)
+            first = TrackerData(room)
+            stats = seed_data_cache.stats()
+            second = TrackerData(room)
+        self.assertIs(first._multidata, second._multidata)
+        item_names = first.item_id_to_name["Archipelago"]
+        self.assertIs(item_names.maps[-1], second.item_id_to_name["Archipelago"].maps[-1])
+        self.assertEqual(stats["misses"], seed_data_cache.stats()["misses"])
+        self.assertEqual(stats["hits"] + 1, seed_data_cache.stats()["hits"])
+
+        self.assertEqual("Unknown Item (ID: -1337)", item_names[-1337])
+        self.assertNotIn(-1337, item_names.maps[-1], "unknown ids should not be added to the shared table")
+        item_names[-1337] = "Written"
+        self.assertNotIn(-1337, second.item_id_to_name["Archipelago"], "writes should not reach the shared table")
+
+        with self.client.open(url_for("api.tracker_cache_stats")) as response:
+            self.assertEqual(seed_data_cache.stats(), response.json["seeds"])
+            self.assertIn("evictions", response.json["games"])
+
+    def test_lru_cache(self) -> None:
+        """Verify that the tracker cache evicts the least recently used entries beyond its max weight."""
+        from WebHostLib.tracker import LRUCache
+
+        lru_cache: LRUCache[str] = LRUCache(3)
+        for key in "abc":
+            lru_cache.get(key, lambda key=key: (key, 1))
+        lru_cache.get("a", lambda: self.fail("a should be cached"))
+        self.assertEqual("d", lru_cache.get("d", lambda: ("d", 2)))
+        self.assertEqual({"entries": 2, "weight": 3, "max_weight": 3, "hits": 1, "misses": 4, "evictions": 2},
+                         lru_cache.stats())
+        self.assertEqual("a", lru_cache.get("a", lambda: self.fail("a should still be cached")))
+        self.assertEqual("too heavy", lru_cache.get("e", lambda: ("too heavy", 4)))
+        self.assertEqual(2, lru_cache.stats()["entries"], "entries heavier than the cache should not evict others")
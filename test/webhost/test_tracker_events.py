@@ -0,0 +1,153 @@
+import asyncio
+import datetime
+import json
+import logging
+from uuid import UUID, uuid4
+
+from flask import url_for
+
+from . import TestBase
+
+
+class TestTrackerEvents(TestBase):
+    room_id: UUID
+    tracker_uuid: UUID
+
+    def setUp(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room, Seed
+
+        super().setUp()
+
+        with self.client.session_transaction() as session:
+            session["_id"] = uuid4()
+            self.tracker_uuid = uuid4()
+            with db_session:
+                # create an empty seed and a room from it
+                seed = Seed(multidata=b"", owner=session["_id"])
+                room = Room(seed=seed, owner=session["_id"], tracker=self.tracker_uuid)
+                self.room_id = room.id
+
+    def tearDown(self) -> None:
+        from pony.orm import db_session
+        from WebHostLib.models import Room
+
+        with db_session:
+            room: Room = Room.get(id=self.room_id)
+            room.seed.delete()
+            room.delete()
+
+    def _add_events(self, *changes: dict) -> list[int]:
+        from pony.orm import db_session, flush
+        from WebHostLib.models import Room, TrackerEvent
+
+        with db_session:
+            room = Room.get(id=self.room_id)
+            events = [TrackerEvent(room=room, data=json.dumps(change)) for change in changes]
+            flush()
+            return [event.id for event in events]
+
+    def _get_events(self, after: int | None = None) -> dict:
+        from WebHostLib import cache
+        from WebHostLib.api.tracker import get_tracker_events
+
+        cache.delete_memoized(get_tracker_events)
+        with self.app.app_context(), self.app.test_request_context():
+            response = self.client.get(url_for("api.tracker_events", tracker=self.tracker_uuid, after=after))
+        self.assertEqual(response.status_code, 200)
+        return response.json
+
+    def test_pop_tracker_event(self) -> None:
+        """Verify that the changes of a room are collected into one event, which is only returned once."""
+        from NetUtils import ClientStatus, NetworkItem
+        from WebHostLib.customserver import WebHostContext, get_static_server_data
+
+        async def pop() -> tuple[str | None, str | None]:
+            ctx = WebHostContext(get_static_server_data(), logging.getLogger("test"))
+            ctx.tracker_event_interval = 1
+            ctx.location_checks[0, 1] = {1, 2, 3}
+            ctx.on_new_location_checks(0, 1, {3, 2})
+            item = NetworkItem(10, 4, 2, 0)
+            ctx.on_new_received_items(0, 1, False, 0, [item])  # found in the own world, not sent to trackers
+            ctx.on_new_received_items(0, 1, True, 5, [item])
+            ctx.on_new_received_items(0, 1, True, 6, [item])
+            ctx.client_game_state[0, 2] = ClientStatus.CLIENT_GOAL
+            ctx.on_client_status_change(0, 2)
+            return ctx.pop_tracker_event(), ctx.pop_tracker_event()
+
+        data, second = asyncio.run(pop())
+        self.assertIsNotNone(data)
+        self.assertEqual(json.loads(data), {
+            "player_checks_done": [{"team": 0, "player": 1, "locations": [2, 3], "checks_done": 3}],
+            "player_items_received": [{"team": 0, "player": 1, "index": 5, "items": [[10, 4, 2, 0], [10, 4, 2, 0]]}],
+            "player_status": [{"team": 0, "player": 2, "status": ClientStatus.CLIENT_GOAL}],
+        })
+        self.assertIsNone(second, "changes should only be published once")
+
+    def test_store_tracker_event(self) -> None:
+        """Verify that stored events are added to the room and events older than the retention are removed."""
+        from pony.orm import db_session, select
+        from WebHostLib.customserver import WebHostContext, get_static_server_data, tracker_event_retention
+        from WebHostLib.models import TrackerEvent
+
+        old_id, = self._add_events({"hints": []})
+        with db_session:
+            TrackerEvent[old_id].time -= tracker_event_retention + datetime.timedelta(minutes=1)
+
+        async def store() -> WebHostContext:
+            ctx = WebHostContext(get_static_server_data(), logging.getLogger("test"))
+            ctx.room_id = self.room_id
+            ctx._store_tracker_event('{"hints":[]}')
+            return ctx
+
+        ctx = asyncio.run(store())
+        with db_session:
+            data = select(event.data for event in TrackerEvent if event.room.id == self.room_id)[:]
+        self.assertEqual(data, ['{"hints":[]}'], "the old event should have been removed")
+
+        # cleanups happen at most once a minute
+        old_id, = self._add_events({"hints": []})
+        with db_session:
+            TrackerEvent[old_id].time -= tracker_event_retention + datetime.timedelta(minutes=1)
+        ctx._store_tracker_event('{"hints":[]}')
+        with db_session:
+            self.assertTrue(TrackerEvent.exists(id=old_id))
+
+    def test_tracker_events(self) -> None:
+        """Verify that clients can follow the events of a room and are told when they missed some."""
+        from pony.orm import db_session
+        from WebHostLib.models import TrackerEvent
+
+        old_interval = self.app.config["TRACKER_EVENT_INTERVAL"]
+        self.app.config["TRACKER_EVENT_INTERVAL"] = 1
+        try:
+            changes = {"player_checks_done": [{"team": 0, "player": 1, "locations": [5], "checks_done": 1}]}
+            first_id, second_id, third_id = self._add_events({"hints": []}, changes, {"hints": []})
+
+            data = self._get_events()
+            self.assertEqual(data["last_id"], third_id)
+            self.assertEqual(data["events"], [])
+            self.assertFalse(data["reset"])
+
+            data = self._get_events(first_id)
+            self.assertEqual([event["id"] for event in data["events"]], [second_id, third_id])
+            self.assertEqual(data["events"][0]["changes"], changes)
+            self.assertEqual(data["last_id"], third_id)
+            self.assertFalse(data["reset"])
+
+            data = self._get_events(third_id)
+            self.assertEqual(data["events"], [])
+            self.assertEqual(data["last_id"], third_id)
+
+            with db_session:
+                TrackerEvent[first_id].delete()
+            data = self._get_events(first_id)
+            self.assertTrue(data["reset"], "events after a removed one may be missing")
+            self.assertEqual([event["id"] for event in data["events"]], [second_id, third_id])
+
+            self.app.config["TRACKER_EVENT_INTERVAL"] = 0
+            with self.app.app_context(), self.app.test_request_context():
+                response = self.client.get(url_for("api.tracker_events", tracker=self.tracker_uuid))
+            self.assertEqual(response.status_code, 404)
+        finally:
+            self.app.config["TRACKER_EVENT_INTERVAL"] = old_interval
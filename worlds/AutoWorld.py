@@ -13,6 +13,7 @@ from typing import (Any, ClassVar, Dict, FrozenSet, List, Optional, Self, Set, T
 from Options import item_and_loc_options, ItemsAccessibility, OptionGroup, PerGameCommonOptions
 from BaseClasses import CollectionState, Entrance
 from rule_builder.rules import CustomRuleRegister, Rule
+import Profiling
 from Utils import Version
 
 if TYPE_CHECKING:
@@ -168,6 +169,9 @@ def _timed_call(method: Callable[..., Any], *args: Any,
     start = time.perf_counter()
     ret = method(*args)
     taken = time.perf_counter() - start
+    profile = Profiling.get_active()
+    if profile:
+        profile.record_call(method, taken, multiworld, player)
     if taken > 1.0:
         if player and multiworld:
             perf_logger.info(f"Took {taken:.4f} seconds in {method.__qualname__} for player {player}, "
@@ -324,6 +328,11 @@ class World(metaclass=AutoWorldRegister):
     If False, everything is rechecked at every step, which is slower computationally, 
     but may be desirable in complex/dynamic worlds."""
 
+    process_output: ClassVar[Optional[Tuple[str, ...]]] = None
+    """Set to allow generate_output to run in a forked process, if the generator is set up to use output processes.
+    Only files written to the output directory and the instance attributes named here are handed back, after which
+    a rom_name_available_event of the world is set."""
+
     multiworld: "MultiWorld"
     """autoset on creation. The MultiWorld object for the currently generating multiworld."""
     player: int
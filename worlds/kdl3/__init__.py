@@ -68,6 +68,7 @@ class KDL3World(World):
     location_name_to_id = {location_table[location]: location for location in location_table}
     item_name_groups = item_names
     web = KDL3WebWorld()
+    process_output = ("rom_name",)
     settings: ClassVar[KDL3Settings]
 
     def __init__(self, multiworld: MultiWorld, player: int):
@@ -95,6 +95,7 @@ class MM2World(World):
     item_name_groups = item_names
     location_name_groups = location_groups
     web = MM2WebWorld()
+    process_output = ("rom_name",)
     rom_name: bytearray
     wily_5_weapons: Dict[int, List[int]]
 
@@ -0,0 +1,112 @@
+import functools
+from typing import Dict, List, NamedTuple, Tuple
+
+from .data import POKEMON_DATA, GEN_1_TYPES
+from .Locations import location_table, milestones, milestone_steps
+
+# Highest national dex number included by each pokemon_generations option value.
+GENERATION_LIMITS = {0: 151, 1: 251, 2: 386}
+
+# All three starters are precollected, so they count towards every milestone from the start.
+STARTER_NAMES = ("Bulbasaur", "Charmander", "Squirtle")
+
+# Counters maintained in state by PokepelagoWorld.collect/remove. A Pokémon counts as unlocked once its
+# Unlock item and, with Type Locks enabled, all of its Type Keys have been collected.
+UNLOCKED_POKEMON = "Unlocked Pokemon"
+
+
+def unlocked_type_counter(p_type: str) -> str:
+    return f"Unlocked {p_type} Pokemon"
+
+
+class PokemonRegionData(NamedTuple):
+    region_name: str
+    entrance_name: str
+    location_name: str
+    location_id: int
+    unlock_item: str
+    requirements: Tuple[str, ...]
+    """The Unlock item plus, with Type Locks enabled, the Pokémon's Type Keys."""
+    counters: Tuple[str, ...]
+    """The unlocked counters to bump once all requirements are collected."""
+
+
+class PokepelagoBlueprint(NamedTuple):
+    active_pokemon: Tuple[dict, ...]
+    menu_locations: Tuple[Tuple[str, int], ...]
+    pokemon: Tuple[PokemonRegionData, ...]
+    global_milestones: Tuple[Tuple[str, int], ...]
+    """Location name and the required value of UNLOCKED_POKEMON, starters included."""
+    type_milestones: Tuple[Tuple[str, str, int], ...]
+    """Location name, type and the required value of that type's unlocked counter, starters included."""
+    unlock_dependents: Dict[str, Tuple[str, ...]]
+    """Unlock or Type Key item -> Unlock items whose unlocked status it can change."""
+    unlock_data: Dict[str, PokemonRegionData]
+
+
+@functools.lru_cache(maxsize=None)
+def get_blueprint(pokemon_generations: int, type_locks: bool) -> PokepelagoBlueprint:
+    """
+    Builds the region, location and rule layout shared by every slot with the same generation and Type Locks
+    settings. The result is cached for the whole process and must be treated as read-only.
+    """
+    limit = GENERATION_LIMITS.get(pokemon_generations, 151)
+    active_pokemon = tuple(mon for mon in POKEMON_DATA if mon["id"] <= limit)
+    total_guessable = len(active_pokemon) - len(STARTER_NAMES)
+
+    type_max = {p_type: 0 for p_type in GEN_1_TYPES}
+    starters_of_type = {p_type: 0 for p_type in GEN_1_TYPES}
+    for mon in active_pokemon:
+        for p_type in mon["types"]:
+            type_max[p_type] += 1
+            if mon["name"] in STARTER_NAMES:
+                starters_of_type[p_type] += 1
+
+    global_milestones: List[Tuple[str, int]] = []
+    for count in milestones:
+        if count <= total_guessable:
+            global_milestones.append((f"Guessed {count} Pokemon", count + len(STARTER_NAMES)))
+
+    type_milestones: List[Tuple[str, str, int]] = []
+    for p_type in GEN_1_TYPES:
+        for count in milestone_steps:
+            loc_name = f"Caught {count} {p_type} Pokemon"
+            if loc_name in location_table and count <= type_max[p_type] - starters_of_type[p_type]:
+                type_milestones.append((loc_name, p_type, count + starters_of_type[p_type]))
+
+    # All non-guess locations (Milestones, Oak's Lab, etc.) are in Menu, in location table order.
+    included_milestones = {loc_name for loc_name, _ in global_milestones}
+    included_milestones.update(loc_name for loc_name, _, _ in type_milestones)
+    menu_locations = tuple(
+        (loc_name, loc_id) for loc_name, loc_id in location_table.items()
+        if not loc_name.startswith(("Guess ", "Guessed ", "Caught ")) or loc_name in included_milestones
+    )
+
+    pokemon: List[PokemonRegionData] = []
+    unlock_dependents: Dict[str, List[str]] = {}
+    for mon in active_pokemon:
+        mon_name = mon["name"]
+        unlock_item = f"{mon_name} Unlock"
+        type_keys = tuple(f"{p_type} Type Key" for p_type in mon["types"]) if type_locks else ()
+        data = PokemonRegionData(
+            f"Region {mon_name}",
+            f"Catch {mon_name}",
+            f"Guess {mon_name}",
+            location_table[f"Guess {mon_name}"],
+            unlock_item,
+            (unlock_item, *type_keys),
+            (UNLOCKED_POKEMON, *(unlocked_type_counter(p_type) for p_type in mon["types"])),
+        )
+        pokemon.append(data)
+        for requirement in data.requirements:
+            unlock_dependents.setdefault(requirement, []).append(unlock_item)
+
+    return PokepelagoBlueprint(
+        active_pokemon,
+        menu_locations,
+        tuple(pokemon),
+        tuple(global_milestones),
+        tuple(type_milestones),
+        {item_name: tuple(unlock_items) for item_name, unlock_items in unlock_dependents.items()},
+        {data.unlock_item: data for data in pokemon},
+    )
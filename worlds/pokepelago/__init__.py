@@ -1,8 +1,11 @@
-from BaseClasses import Region, Entrance, ItemClassification, Tutorial
+from typing import List
+
+from BaseClasses import CollectionState, Item, Region, Entrance, ItemClassification, Tutorial
 from worlds.AutoWorld import World, WebWorld
 from .Items import PokepelagoItem, item_table, pokemon_names, GEN_1_TYPES, item_data_table
 from .Locations import PokepelagoLocation, location_table, milestones
 from .Options import PokepelagoOptions
+from .Regions import UNLOCKED_POKEMON, get_blueprint
 from .data import POKEMON_DATA
 from . import Rules
 
@@ -39,9 +42,9 @@ class PokepelagoWorld(World):
     }
 
     def generate_early(self):
-        gen_option = self.options.pokemon_generations.value
-        limit = {0: 151, 1: 251, 2: 386}.get(gen_option, 151)
-        self.active_pokemon = [mon for mon in POKEMON_DATA if mon["id"] <= limit]
+        # The layout only depends on these two options, so slots sharing them share one read-only blueprint.
+        self.blueprint = get_blueprint(self.options.pokemon_generations.value, bool(self.options.type_locks.value))
+        self.active_pokemon = self.blueprint.active_pokemon
         self.active_pokemon_names = [mon["name"] for mon in self.active_pokemon]
 
         # Total new Pokémon guessable (all active minus the 3 precollected starters)
@@ -73,6 +76,34 @@ class PokepelagoWorld(World):
             
         return PokepelagoItem(name, classification, item_id, self.player)
 
+    def _fully_unlocked(self, state: CollectionState, item_name: str) -> List[str]:
+        """Returns the Unlock items depending on item_name whose Pokémon are fully unlocked in state."""
+        player_prog_items = state.prog_items[self.player]
+        unlock_data = self.blueprint.unlock_data
+        return [unlock_item for unlock_item in self.blueprint.unlock_dependents[item_name]
+                if all(player_prog_items[requirement] for requirement in unlock_data[unlock_item].requirements)]
+
+    def collect(self, state: CollectionState, item: Item) -> bool:
+        change = super().collect(state, item)
+        # Only the first copy of an Unlock or Type Key can change which Pokémon are fully unlocked.
+        if change and item.name in self.blueprint.unlock_dependents \
+                and state.prog_items[self.player][item.name] == 1:
+            for unlock_item in self._fully_unlocked(state, item.name):
+                for counter in self.blueprint.unlock_data[unlock_item].counters:
+                    state.add_item(counter, self.player)
+        return change
+
+    def remove(self, state: CollectionState, item: Item) -> bool:
+        lost: List[str] = []
+        if item.name in self.blueprint.unlock_dependents and state.prog_items[self.player][item.name] == 1:
+            lost = self._fully_unlocked(state, item.name)
+        change = super().remove(state, item)
+        if change:
+            for unlock_item in lost:
+                for counter in self.blueprint.unlock_data[unlock_item].counters:
+                    state.remove_item(counter, self.player)
+        return change
+
     def create_event_item(self, name: str) -> PokepelagoItem:
         """Create an event item (ID=None) for server-side goal/release tracking."""
         return PokepelagoItem(name, ItemClassification.progression, None, self.player)
@@ -132,39 +163,17 @@ class PokepelagoWorld(World):
         self.multiworld.regions.append(menu_region)
 
         # All non-guess locations (Milestones, Oak's Lab, etc.) are in Menu
-        for loc_name, loc_id in self.location_name_to_id.items():
-            if loc_name.startswith("Guess "):
-                continue
-                
-            if loc_name.startswith("Guessed "):
-                count = int(loc_name.split(" ")[1])
-                if count > len(self.active_pokemon) - 3:
-                    continue
-                    
-            if loc_name.startswith("Caught "):
-                parts = loc_name.split(" ")
-                count = int(parts[1])
-                p_type = parts[2]
-                type_max = sum(1 for m in self.active_pokemon if p_type in m["types"])
-                STARTER_NAMES = {"Bulbasaur", "Charmander", "Squirtle"}
-                starters_of_type = sum(1 for m in self.active_pokemon if m["name"] in STARTER_NAMES and p_type in m["types"])
-                if count > (type_max - starters_of_type):
-                    continue
-
-            location = PokepelagoLocation(self.player, loc_name, loc_id, menu_region)
-            menu_region.locations.append(location)
-
-        for mon in self.active_pokemon:
-            mon_name = mon["name"]
-            mon_region = Region(f"Region {mon_name}", self.player, self.multiworld)
+        for loc_name, loc_id in self.blueprint.menu_locations:
+            menu_region.locations.append(PokepelagoLocation(self.player, loc_name, loc_id, menu_region))
+
+        for data in self.blueprint.pokemon:
+            mon_region = Region(data.region_name, self.player, self.multiworld)
             self.multiworld.regions.append(mon_region)
 
-            loc_name = f"Guess {mon_name}"
-            loc_id = self.location_name_to_id[loc_name]
-            location = PokepelagoLocation(self.player, loc_name, loc_id, mon_region)
+            location = PokepelagoLocation(self.player, data.location_name, data.location_id, mon_region)
             mon_region.locations.append(location)
 
-            entrance = Entrance(self.player, f"Catch {mon_name}", menu_region)
+            entrance = Entrance(self.player, data.entrance_name, menu_region)
             menu_region.exits.append(entrance)
             entrance.connect(mon_region)
 
@@ -179,17 +188,8 @@ class PokepelagoWorld(World):
         # Canonical Archipelago goal pattern: place a locked "Victory" event item at an event
         # location whose access rule enforces the goal. The server's release/completion mechanism
         # triggers when state.has("Victory") becomes true — can_reach() alone doesn't do this.
-        use_type_locks = self.options.type_locks.value
         goal = self.goal_count + 3  # +3 because starters are pre-collected and also count
-
-        if use_type_locks:
-            goal_rule = lambda state: sum(
-                1 for mon in self.active_pokemon
-                if state.has(f"{mon['name']} Unlock", self.player)
-                and all(state.has(f"{t} Type Key", self.player) for t in mon["types"])
-            ) >= goal
-        else:
-            goal_rule = lambda state: state.has_group("Pokemon Unlocks", self.player, goal)
+        goal_rule = lambda state: state.has(UNLOCKED_POKEMON, self.player, goal)
 
         victory_location = self.multiworld.get_location("Pokepelago Victory", self.player)
         victory_location.access_rule = goal_rule
@@ -0,0 +1,7 @@
+from test.bases import WorldTestBase
+from .. import PokepelagoWorld
+
+
+class PokepelagoTestBase(WorldTestBase):
+    game = "Pokepelago"
+    world: PokepelagoWorld
@@ -0,0 +1,65 @@
+from BaseClasses import CollectionState
+from . import PokepelagoTestBase
+from ..Regions import UNLOCKED_POKEMON, unlocked_type_counter
+
+
+class TestUnlockedCounters(PokepelagoTestBase):
+    options = {
+        "pokemon_generations": "gen2",
+        "type_locks": "true",
+    }
+
+    def count_unlocked(self, state: CollectionState, p_type: str = "") -> int:
+        """Counts the fully unlocked Pokémon the slow way, to compare against the counters kept in state."""
+        return sum(
+            1 for mon in self.world.active_pokemon
+            if (not p_type or p_type in mon["types"])
+            and state.has(f"{mon['name']} Unlock", self.player)
+            and all(state.has(f"{t} Type Key", self.player) for t in mon["types"])
+        )
+
+    def assertCountersMatch(self) -> None:
+        self.assertEqual(self.count(UNLOCKED_POKEMON), self.count_unlocked(self.multiworld.state))
+        for p_type in ("Fire", "Flying", "Psychic"):
+            self.assertEqual(self.count(unlocked_type_counter(p_type)),
+                             self.count_unlocked(self.multiworld.state, p_type))
+
+    def test_starters(self) -> None:
+        """The precollected starters and their Type Keys count as unlocked."""
+        self.assertEqual(self.count(UNLOCKED_POKEMON), 3)
+        self.assertEqual(self.count(unlocked_type_counter("Fire")), 1)
+
+    def test_unlock_and_key_order(self) -> None:
+        """The counters only change once both the Unlock and every Type Key are held, in either order."""
+        self.collect_by_name("Charizard Unlock")
+        self.assertCountersMatch()
+        self.assertEqual(self.count(unlocked_type_counter("Flying")), 0)
+        self.collect_by_name("Flying Type Key")
+        self.assertCountersMatch()
+        self.assertEqual(self.count(unlocked_type_counter("Flying")), 1)
+
+        self.collect_by_name(["Psychic Type Key", "Abra Unlock", "Natu Unlock"])
+        self.assertCountersMatch()
+        self.remove_by_name("Flying Type Key")
+        self.assertCountersMatch()
+        self.remove_by_name("Abra Unlock")
+        self.assertCountersMatch()
+
+    def test_copy(self) -> None:
+        """Counters are carried over into copies of the state."""
+        self.collect_by_name(["Pikachu Unlock", "Electric Type Key"])
+        copied = self.multiworld.state.copy()
+        self.assertEqual(copied.count(UNLOCKED_POKEMON, self.player), self.count_unlocked(copied))
+
+
+class TestUnlockedCountersNoTypeLocks(PokepelagoTestBase):
+    options = {
+        "type_locks": "false",
+    }
+
+    def test_unlock_only(self) -> None:
+        """Without Type Locks, an Unlock alone counts the Pokémon as unlocked."""
+        self.collect_by_name("Pikachu Unlock")
+        self.assertEqual(self.count(UNLOCKED_POKEMON), 4)
+        self.assertEqual(self.count(unlocked_type_counter("Electric")), 1)
+        self.assertTrue(self.can_reach_location("Guessed 1 Pokemon"))
@@ -0,0 +1,22 @@
+from . import PokepelagoTestBase
+from ..Regions import get_blueprint
+
+
+class TestBlueprint(PokepelagoTestBase):
+    options = {
+        "pokemon_generations": "gen3",
+    }
+
+    def test_shared(self) -> None:
+        """Slots with the same generation and Type Locks settings share one blueprint."""
+        self.assertIs(self.world.blueprint, get_blueprint(2, True))
+        self.assertIsNot(self.world.blueprint, get_blueprint(2, False))
+
+    def test_layout(self) -> None:
+        """Every location in the blueprint is created, plus the Victory event."""
+        blueprint = self.world.blueprint
+        expected = {loc_name for loc_name, _ in blueprint.menu_locations}
+        expected.update(data.location_name for data in blueprint.pokemon)
+        expected.add("Pokepelago Victory")
+        self.assertEqual(expected, {location.name for location in self.multiworld.get_locations(self.player)})
+        self.assertEqual(len(blueprint.pokemon), 386)